@@ -0,0 +1,42 @@
+import threading
+from collections import deque
+
+# ===== Стрічка останніх подій оренд =====
+
+ACTIVITY_LABELS = {"create": "Створено", "extend": "Продовжено", "complete": "Завершено"}
+
+
+class RecentActivity:
+    """
+    Кільцевий буфер останніх size подій оренд для панелі «Останні оренди».
+    Заповнюється один раз запитом до бази (seed), далі модель додає події після успішних записів,
+    тож панель показує стрічку без повторних запитів. Подія – кортеж
+    (rental_id, kind, client_name, bike_model, moment), де kind – ключ ACTIVITY_LABELS.
+    version збільшується з кожною подією: за ним панель визначає, чи треба перемальовуватися.
+    """
+
+    def __init__(self, size=20):
+        self.events = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.version = 0
+
+    @property
+    def size(self):
+        return self.events.maxlen
+
+    def seed(self, events):
+        """Початкові події від найновішої до найстарішої (як повертає ORDER BY id DESC)."""
+        with self.lock:
+            self.events.clear()
+            self.events.extend(reversed(list(events)))
+            self.version += 1
+
+    def record(self, events):
+        with self.lock:
+            self.events.extend(events)
+            self.version += 1
+
+    def snapshot(self):
+        """Події від найновішої до найстарішої та версія буфера."""
+        with self.lock:
+            return list(reversed(self.events)), self.version
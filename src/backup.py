@@ -0,0 +1,108 @@
+import gzip
+import os
+import shutil
+import threading
+from datetime import datetime
+
+# ===== Резервне копіювання бази =====
+
+
+class BackupManager:
+    """
+    Ротовані онлайн-копії бази. Знімок робить Database.backup (покроково, з паузами),
+    копія перевіряється PRAGMA integrity_check, за потреби стискається gzip,
+    і в каталозі backup_dir залишаються лише keep найновіших копій.
+    """
+
+    def __init__(self, db, backup_dir=None, keep=7, compress=True, pages=256, sleep=0.01):
+        self.db = db
+        base_dir = os.path.dirname(os.path.abspath(db.db_path))
+        self.backup_dir = backup_dir or os.path.join(base_dir, "backups")
+        self.keep = keep
+        self.compress = compress
+        self.pages = pages
+        self.sleep = sleep
+        self.prefix = os.path.splitext(os.path.basename(db.db_path))[0] + "_"
+        self.progress = (0, 0)
+        self.result = None
+        self.thread = None
+
+    def snapshot_path(self, moment):
+        name = f"{self.prefix}{moment.strftime('%Y%m%d_%H%M%S_%f')}.db"
+        return os.path.join(self.backup_dir, name + ".gz" if self.compress else name)
+
+    def list_snapshots(self):
+        """Наявні копії від найновішої до найстарішої (час закодовано в імені файлу)."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = [name for name in os.listdir(self.backup_dir)
+                 if name.startswith(self.prefix) and name.endswith((".db", ".db.gz"))]
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def last_backup_time(self):
+        snapshots = self.list_snapshots()
+        return datetime.fromtimestamp(os.path.getmtime(snapshots[0])) if snapshots else None
+
+    def is_due(self, interval):
+        """Чи минуло від останньої копії більше interval (timedelta)."""
+        last = self.last_backup_time()
+        return last is None or datetime.now() - last >= interval
+
+    def rotate(self):
+        """Видаляє копії, старші за keep найновіших; повертає список видалених файлів."""
+        removed = self.list_snapshots()[self.keep:]
+        for path in removed:
+            os.remove(path)
+        return removed
+
+    def set_progress(self, copied, total):
+        self.progress = (copied, total)
+
+    def run(self):
+        """Робить одну копію в поточному потоці; повертає (шлях до копії або None, повідомлення)."""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        path = self.snapshot_path(datetime.now())
+        # Незавершені файли мають суфікс .part і не потрапляють до списку копій
+        copy_path = path[:-len(".gz")] + ".part" if self.compress else path + ".part"
+        packed_path = path + ".part"
+        try:
+            status = self.db.backup(copy_path, self.pages, self.sleep, self.set_progress)
+            if status != "ok":
+                return None, "Копія не пройшла перевірку цілісності: " + status
+            if self.compress:
+                with open(copy_path, "rb") as source, gzip.open(packed_path, "wb", compresslevel=6) as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                os.replace(packed_path, path)
+            else:
+                os.replace(copy_path, path)
+            self.rotate()
+            return path, f"Резервну копію збережено: {path}"
+        except Exception as e:
+            print("Error creating backup:", e)
+            return None, "Помилка резервного копіювання: " + str(e)
+        finally:
+            for leftover in (copy_path, packed_path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    def start(self):
+        """
+        Запускає копіювання у фоновому потоці; False, якщо попереднє ще не завершилося.
+        Базу ":memory:" бачить лише її з'єднання в потоці, що її відкрив, тому її копія робиться одразу.
+        """
+        if self.is_running():
+            return False
+        self.progress = (0, 0)
+        self.result = None
+        if self.db.db_path == ":memory:":
+            self.result = self.run()
+            return True
+        self.thread = threading.Thread(target=self.run_in_background, daemon=True)
+        self.thread.start()
+        return True
+
+    def run_in_background(self):
+        self.result = self.run()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
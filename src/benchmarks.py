@@ -0,0 +1,970 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+# ===== Бенчмарки продуктивності =====
+# Запуск: python benchmarks.py <назва> [кількість рядків]
+
+
+def report_result(name, seconds, **values):
+    details = ", ".join(f"{key}={value}" for key, value in values.items())
+    print(f"{name}: {seconds:.3f} с ({details})")
+
+
+def synthetic_rental_rows(count, seed=42):
+    """Рядки у форматі звіту "Оренди за період" для навантажувальних тестів."""
+    rnd = random.Random(seed)
+    names = ["Іван Іваненко", "Марія Петренко", "Олександр Коваль-Шевчук", "ТОВ «Велотур Карпати»"]
+    models = ["Giant Talon", "Trek Marlin 7", "Cube Aim Race", "Pride Rocksteady 7.2"]
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        start_time = start + timedelta(minutes=17 * i)
+        yield [i + 1, rnd.choice(names), rnd.choice(models), start_time.strftime("%Y-%m-%d %H:%M:%S"),
+               rnd.randint(1, 8), round(rnd.uniform(50, 900), 2), rnd.choice(["Активна", "Завершена"])]
+
+
+def bench_pdf_table(rows=100000):
+    """Швидкість табличного рендерера PDF: сторінок за секунду."""
+    from fpdf import FPDF
+    from pdf_table import PDFTable
+    columns = ["ID оренди", "Клієнт", "Велосипед", "Час початку", "Тривалість (год)", "Вартість", "Статус"]
+    data = list(synthetic_rental_rows(rows))
+    started = time.perf_counter()
+    pdf = FPDF(orientation="L")
+    table = PDFTable(pdf)
+    pdf.add_page()
+    table.render(columns, data)
+    layout_done = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf.output(os.path.join(tmp, "bench.pdf"))
+    elapsed = time.perf_counter() - started
+    report_result("pdf_table", elapsed, rows=rows, pages=pdf.page,
+                  layout_s=f"{layout_done - started:.3f}",
+                  pages_per_s=f"{pdf.page / elapsed:.1f}")
+
+
+def bench_reservations(bookings=50000, bikes=200):
+    """Перевірка конфліктів та пошук вільних велосипедів: індекс у пам'яті проти SQL-запиту."""
+    from model import BikeRentalModel
+    model = BikeRentalModel(":memory:")
+    cursor = model.db.get_cursor()
+    cursor.executemany("INSERT INTO bikes (model, serial_number, type, status, price_per_hour) VALUES (?, ?, ?, ?, ?)",
+                       [(f"Bike {i}", f"SN{i}", "Міський", "Доступний", 100.0) for i in range(bikes)])
+    rnd = random.Random(7)
+    start = datetime.now() + timedelta(days=1)
+    rows = []
+    per_bike = bookings // bikes
+    for bike_id in range(1, bikes + 1):
+        moment = start
+        for _ in range(per_bike):
+            moment += timedelta(hours=rnd.randint(1, 6))
+            end = moment + timedelta(hours=rnd.randint(1, 4))
+            rows.append((1, bike_id, moment.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")))
+            moment = end
+    cursor.executemany("INSERT INTO reservations (client_id, bike_id, start_time, end_time) VALUES (?, ?, ?, ?)", rows)
+    model.db.commit()
+
+    started = time.perf_counter()
+    model.rebuild_reservation_index()
+    report_result("reservations_rebuild", time.perf_counter() - started, intervals=len(model.reservation_index))
+
+    queries = []
+    for _ in range(2000):
+        moment = start + timedelta(hours=rnd.randint(0, per_bike * 5))
+        queries.append((rnd.randint(1, bikes), moment, moment + timedelta(hours=rnd.randint(1, 4))))
+    started = time.perf_counter()
+    for bike_id, q_start, q_end in queries:
+        model.reservation_index.has_conflict(bike_id, q_start, q_end)
+    elapsed = time.perf_counter() - started
+    report_result("reservations_conflict_index", elapsed, queries=len(queries),
+                  per_query_us=f"{elapsed / len(queries) * 1e6:.1f}")
+    started = time.perf_counter()
+    for bike_id, q_start, q_end in queries:
+        cursor.execute("SELECT 1 FROM reservations WHERE bike_id = ? AND status = 'Активна' "
+                       "AND start_time < ? AND end_time > ? LIMIT 1",
+                       (bike_id, q_end.strftime("%Y-%m-%d %H:%M:%S"), q_start.strftime("%Y-%m-%d %H:%M:%S")))
+        cursor.fetchone()
+    elapsed = time.perf_counter() - started
+    report_result("reservations_conflict_sql", elapsed, queries=len(queries),
+                  per_query_us=f"{elapsed / len(queries) * 1e6:.1f}")
+
+    bike_ids = list(range(1, bikes + 1))
+    started = time.perf_counter()
+    for _, q_start, q_end in queries[:200]:
+        model.reservation_index.free_bikes(bike_ids, q_start, q_end)
+    elapsed = time.perf_counter() - started
+    report_result("reservations_free_bikes", elapsed, queries=200, bikes=bikes,
+                  per_query_ms=f"{elapsed / 200 * 1e3:.2f}")
+
+
+def bench_timestamps(rows=2000000):
+    """
+    Звіт за місяць і перевірка прострочених оренд: стара схема з TEXT-часом і DATE(...) в умовах
+    проти схеми з секундами Unix після міграції (діапазони по індексу, частковий індекс активних оренд).
+    """
+    import sqlite3
+    from model import BikeRentalModel, day_bounds
+    rnd = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "timestamps.db")
+        connection = sqlite3.connect(path)
+        connection.execute("""
+            CREATE TABLE rentals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, client_id INTEGER NOT NULL, bike_id INTEGER NOT NULL,
+                start_time DATETIME NOT NULL, duration INTEGER, end_time DATETIME, status TEXT,
+                total_cost REAL, discount REAL DEFAULT 0, is_paid INTEGER DEFAULT 0,
+                created_at DATETIME DEFAULT (datetime('now','localtime')))
+        """)
+        connection.execute("CREATE INDEX idx_rentals_start_time ON rentals(start_time)")
+        connection.execute("CREATE INDEX idx_rentals_end_time ON rentals(end_time)")
+        now = datetime.now().replace(microsecond=0)
+        first = now - timedelta(days=730)
+        step = 730 * 86400 / rows
+
+        def legacy_rows():
+            for i in range(rows):
+                start = first + timedelta(seconds=int(i * step))
+                duration = rnd.randint(1, 8)
+                # Приблизно 0,1% оренд активні, решта завершені
+                if rnd.random() < 0.001:
+                    yield (rnd.randint(1, 5000), rnd.randint(1, 300), start.strftime("%Y-%m-%d %H:%M:%S"),
+                           duration, None, "Активна", duration * 50.0, start.strftime("%Y-%m-%d %H:%M:%S"))
+                else:
+                    end = (start + timedelta(hours=duration)).strftime("%Y-%m-%d %H:%M:%S")
+                    yield (rnd.randint(1, 5000), rnd.randint(1, 300), start.strftime("%Y-%m-%d %H:%M:%S"),
+                           duration, end, "Завершена", duration * 50.0, start.strftime("%Y-%m-%d %H:%M:%S"))
+        started = time.perf_counter()
+        connection.executemany("INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, "
+                               "total_cost, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", legacy_rows())
+        connection.commit()
+        report_result("timestamps_fill", time.perf_counter() - started, rows=rows)
+
+        month_start = (now - timedelta(days=60)).strftime("%Y-%m-%d")
+        month_end = (now - timedelta(days=31)).strftime("%Y-%m-%d")
+        started = time.perf_counter()
+        report_rows = connection.execute("""
+            SELECT id, start_time, duration, total_cost, status FROM rentals
+            WHERE DATE(start_time) BETWEEN ? AND ? ORDER BY start_time
+        """, (month_start, month_end)).fetchall()
+        income_rows = connection.execute("""
+            SELECT DATE(end_time) AS day, SUM(total_cost) FROM rentals
+            WHERE status = 'Завершена' AND DATE(end_time) BETWEEN ? AND ? GROUP BY day
+        """, (month_start, month_end)).fetchall()
+        report_result("timestamps_report_text", time.perf_counter() - started,
+                      rows=len(report_rows), days=len(income_rows))
+
+        started = time.perf_counter()
+        due = 0
+        for row in connection.execute("SELECT start_time, duration FROM rentals WHERE status = 'Активна'"):
+            if datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") + timedelta(hours=row[1]) <= now:
+                due += 1
+        report_result("timestamps_overdue_text", time.perf_counter() - started, due=due)
+        connection.close()
+
+        started = time.perf_counter()
+        model = BikeRentalModel(path)
+        report_result("timestamps_migration", time.perf_counter() - started, rows=rows)
+        cursor = model.db.get_cursor()
+        bounds = day_bounds(month_start, month_end)
+        started = time.perf_counter()
+        report_rows = cursor.execute("""
+            SELECT id, start_time, duration, total_cost, status FROM rentals
+            WHERE start_time >= ? AND start_time < ? ORDER BY start_time
+        """, bounds).fetchall()
+        income_rows = cursor.execute("""
+            SELECT DATE(end_time, 'unixepoch', 'localtime') AS day, SUM(total_cost) FROM rentals
+            WHERE status = 'Завершена' AND end_time >= ? AND end_time < ? GROUP BY day
+        """, bounds).fetchall()
+        report_result("timestamps_report_epoch", time.perf_counter() - started,
+                      rows=len(report_rows), days=len(income_rows))
+
+        started = time.perf_counter()
+        due = len(model.get_due_rentals(now))
+        report_result("timestamps_overdue_epoch", time.perf_counter() - started, due=due)
+        model.db.close()
+
+
+def bench_group_rentals(bikes=50, rounds=5):
+    """Оформлення, продовження та завершення bikes оренд: послідовні виклики проти групової транзакції."""
+    from model import BikeRentalModel
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "group.db"))
+        model.add_client("ТОВ «Велотур Карпати»", "+380501234567", "tour@example.com", "EDRPOU123")
+        for i in range(bikes):
+            model.add_bike(f"Giant {i}", f"SN{i}", "Гірський", 100.0)
+        bike_ids = [bike.id for bike in model.get_all_bikes()]
+        sequential = grouped = 0.0
+        for _ in range(rounds):
+            start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            started = time.perf_counter()
+            rental_ids = []
+            for bike_id in bike_ids:
+                rental_id, _ = model.create_rental(1, bike_id, start_time, 2, 0)
+                invoice_id, _ = model.generate_invoice(rental_id)
+                model.add_payment(invoice_id, rental_id, model.calculate_rental_price(bike_id, 2, 0), "Карткою")
+                rental_ids.append(rental_id)
+            for rental_id in rental_ids:
+                model.extend_rental(rental_id, 1)
+            for rental_id in rental_ids:
+                model.complete_rental(rental_id)
+            sequential += time.perf_counter() - started
+
+            started = time.perf_counter()
+            group_id, _ = model.create_group_rental(1, bike_ids, start_time, 2, 0, "Карткою")
+            rental_ids = [rental.id for rental in model.get_group_rentals(group_id)]
+            model.extend_rentals(rental_ids, 1)
+            model.complete_rentals(rental_ids)
+            grouped += time.perf_counter() - started
+        report_result("group_rentals_sequential", sequential / rounds, bikes=bikes,
+                      per_bike_ms=f"{sequential / rounds / bikes * 1e3:.2f}")
+        report_result("group_rentals_grouped", grouped / rounds, bikes=bikes,
+                      per_bike_ms=f"{grouped / rounds / bikes * 1e3:.2f}",
+                      speedup=f"{sequential / grouped:.1f}x")
+        model.db.close()
+
+
+def bench_invoices(invoices=2000, workers=0):
+    """Друк рахунків за місяць: рахунків за секунду в одному процесі, у пулі процесів та одним PDF."""
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "invoices.db"))
+        for i in range(50):
+            model.add_client(f"Клієнт {i}", f"+38050{i:07d}", f"client{i}@example.com", f"ID{i}")
+            model.add_bike(f"Giant Talon {i}", f"SN{i}", "Гірський", 100.0)
+        client_ids = [client.id for client in model.get_all_clients()]
+        bike_ids = [bike.id for bike in model.get_all_bikes()]
+        month = datetime(2025, 4, 1)
+        step = 29 * 86400 / invoices
+        cursor = model.db.get_cursor()
+        for i in range(invoices):
+            start = month + timedelta(seconds=int(i * step))
+            cursor.execute('''
+                INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount)
+                VALUES (?, ?, ?, 2, ?, 'Завершена', 200.0, 0)
+            ''', (rnd.choice(client_ids), rnd.choice(bike_ids), to_epoch(start), to_epoch(start + timedelta(hours=2))))
+            cursor.execute("INSERT INTO invoices (Rentals, invoice_date, amount) VALUES (?, ?, 200.0)",
+                           (cursor.lastrowid, start.strftime("%Y-%m-%d %H:%M:%S")))
+        model.db.commit()
+
+        for name, options in (("invoices_single_process", {"workers": 1}),
+                              ("invoices_pool", {"workers": workers or None}),
+                              ("invoices_merged", {"merged": True})):
+            started = time.perf_counter()
+            message = model.render_invoices("2025-04-01", "2025-04-30", os.path.join(tmp, name), **options)
+            elapsed = time.perf_counter() - started
+            report_result(name, elapsed, invoices=invoices, per_second=f"{invoices / elapsed:.0f}",
+                          workers=options.get("workers") or os.cpu_count(), result=message)
+        model.db.close()
+
+
+def bench_backup(rows=500000, pages=256):
+    """
+    Затримка запису (додавання клієнта з комітом) без копіювання, під час покрокового
+    онлайн-копіювання та під час копіювання одним кроком (pages=-1).
+    """
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(3)
+
+    def percentile(values, share):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * share))] * 1e3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "backup.db"))
+        first = datetime.now() - timedelta(days=730)
+        cursor = model.db.get_cursor()
+        cursor.executemany('''
+            INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount)
+            VALUES (?, ?, ?, 2, ?, 'Завершена', ?, 0)
+        ''', ((rnd.randint(1, 5000), rnd.randint(1, 300), to_epoch(first) + i * 60, to_epoch(first) + i * 60 + 7200,
+               rnd.uniform(50, 500)) for i in range(rows)))
+        model.db.commit()
+        size_mb = os.path.getsize(model.db.db_path) / 2 ** 20
+
+        def write_latencies(seconds=None, until=None):
+            latencies = []
+            deadline = time.perf_counter() + (seconds or 0)
+            while (until() if until else time.perf_counter() < deadline):
+                started = time.perf_counter()
+                model.add_client("Клієнт", "+380500000000", "client@example.com", "ID")
+                latencies.append(time.perf_counter() - started)
+                time.sleep(0.002)
+            return latencies
+
+        latencies = write_latencies(seconds=2)
+        report_result("backup_baseline_writes", 2, writes=len(latencies), p50_ms=f"{percentile(latencies, 0.5):.2f}",
+                      p99_ms=f"{percentile(latencies, 0.99):.2f}", max_ms=f"{max(latencies) * 1e3:.2f}")
+        for name, step in (("backup_stepped", pages), ("backup_single_step", -1)):
+            model.backups.pages = step
+            started = time.perf_counter()
+            model.backups.start()
+            latencies = write_latencies(until=model.backups.is_running)
+            elapsed = time.perf_counter() - started
+            report_result(name, elapsed, db_mb=f"{size_mb:.0f}", writes=len(latencies),
+                          p50_ms=f"{percentile(latencies, 0.5):.2f}", p99_ms=f"{percentile(latencies, 0.99):.2f}",
+                          max_ms=f"{max(latencies) * 1e3:.2f}", result=model.backups.result[1])
+        model.db.close()
+
+
+def bench_read_pool(rows=300000, readers=2, seconds=3):
+    """
+    Затримка запису на стійці, поки звіти читають базу: звіти через основне з'єднання в тому ж
+    потоці (як до пулу) проти звітів у readers потоках через з'єднання лише для читання.
+    """
+    import threading
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(9)
+
+    def percentile(values, share):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * share))] * 1e3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "pool.db"))
+        first = datetime.now() - timedelta(days=365)
+        model.db.get_cursor().executemany('''
+            INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount)
+            VALUES (?, ?, ?, 2, ?, 'Завершена', ?, 0)
+        ''', ((rnd.randint(1, 5000), rnd.randint(1, 300), to_epoch(first) + i * 100, to_epoch(first) + i * 100 + 7200,
+               rnd.uniform(50, 500)) for i in range(rows)))
+        model.db.commit()
+
+        def read_report(cursor):
+            cursor.execute("SELECT client_id, COUNT(*), SUM(total_cost) FROM rentals "
+                           "WHERE start_time >= ? AND start_time < ? GROUP BY client_id",
+                           (to_epoch(first), to_epoch(datetime.now())))
+            cursor.fetchall()
+
+        def write():
+            started = time.perf_counter()
+            model.add_client("Клієнт", "+380500000000", "client@example.com", "ID")
+            return time.perf_counter() - started
+
+        # Як до пулу: звіт і запис по черзі в одному потоці через одне з'єднання
+        latencies, reports = [], 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            read_report(model.db.get_cursor())
+            reports += 1
+            latencies.append(time.perf_counter() - started + write())
+        report_result("read_pool_single_connection", seconds, writes=len(latencies), reports=reports,
+                      p50_ms=f"{percentile(latencies, 0.5):.2f}", p99_ms=f"{percentile(latencies, 0.99):.2f}")
+
+        stop = threading.Event()
+        counts = []
+
+        def reader_loop():
+            done = 0
+            while not stop.is_set():
+                read_report(model.db.read_cursor())
+                done += 1
+            counts.append(done)
+
+        threads = [threading.Thread(target=reader_loop) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            latencies.append(write())
+            time.sleep(0.005)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        report_result("read_pool_reader_threads", seconds, readers=readers, writes=len(latencies),
+                      reports=sum(counts), p50_ms=f"{percentile(latencies, 0.5):.2f}",
+                      p99_ms=f"{percentile(latencies, 0.99):.2f}")
+        model.db.close()
+
+
+def bench_group_commit(writes=4000, producers=16, max_delay_ms=0):
+    """
+    Записів за секунду: окремий commit на кожен запис (як без групової фіксації) проти
+    GroupCommitWriter з producers потоками-виробниками (як потоки, що обслуговують кіоски).
+    """
+    import threading
+    from model import BikeRentalModel
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "group_commit.db"))
+        started = time.perf_counter()
+        for _ in range(writes):
+            model.add_client("Клієнт", "+380500000000", "client@example.com", "ID")
+        single = time.perf_counter() - started
+        report_result("group_commit_off", single, writes=writes, per_second=f"{writes / single:.0f}")
+
+        for threads_count in (1, producers):
+            model.db.start_group_commit(max_delay=max_delay_ms / 1000)
+            writer = model.db.group_writer
+            per_thread = writes // threads_count
+
+            def produce():
+                for _ in range(per_thread):
+                    writer.execute("INSERT INTO clients (name, phone, email, document, name_key) VALUES (?, ?, ?, ?, ?)",
+                                   ("Клієнт", "+380500000000", "client@example.com", "ID", "клієнт"))
+
+            threads = [threading.Thread(target=produce) for _ in range(threads_count)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            done = per_thread * threads_count
+            report_result(f"group_commit_{threads_count}_producers", elapsed, writes=done,
+                          per_second=f"{done / elapsed:.0f}", batches=writer.batches,
+                          speedup=f"{(done / elapsed) / (writes / single):.1f}x")
+            model.db.stop_group_commit()
+        model.db.close()
+
+
+def bench_utilization(rows=2000000, bikes=500):
+    """Теплова карта завантаженості за рік: завантаження інтервалів із SQLite та векторний розрахунок."""
+    import numpy as np
+    from model import BikeRentalModel, to_epoch
+    from utilization import occupancy_by_hour_of_week, load_rental_intervals
+    rnd = random.Random(17)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "utilization.db"))
+        cursor = model.db.get_cursor()
+        cursor.executemany("INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key) "
+                           "VALUES (?, ?, ?, 'Доступний', 100, ?)",
+                           [(f"Bike {i}", f"SN{i}", ("Гірський", "Міський", "Шосейний")[i % 3], f"bike {i}")
+                            for i in range(bikes)])
+        last = datetime.now().replace(microsecond=0)
+        first = last - timedelta(days=365)
+        step = 365 * 86400 / rows
+        cursor.executemany('''
+            INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount)
+            VALUES (1, ?, ?, ?, ?, 'Завершена', 100, 0)
+        ''', ((rnd.randint(1, bikes), to_epoch(first) + int(i * step), duration,
+               to_epoch(first) + int(i * step) + duration * 3600 - rnd.randint(0, 3599))
+              for i, duration in ((i, rnd.randint(1, 8)) for i in range(rows))))
+        model.db.commit()
+        start_date, end_date = first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+
+        started = time.perf_counter()
+        intervals = load_rental_intervals(model.db.read_cursor(), to_epoch(first), to_epoch(last), to_epoch(last))
+        loaded = time.perf_counter() - started
+        started = time.perf_counter()
+        occupancy_by_hour_of_week(intervals[:, 1], intervals[:, 2], intervals[:, 0] - 1, bikes)
+        computed = time.perf_counter() - started
+        report_result("utilization_load", loaded, intervals=len(intervals))
+        report_result("utilization_compute", computed, intervals=len(intervals),
+                      per_million_s=f"{computed / len(intervals) * 1e6:.2f}")
+
+        started = time.perf_counter()
+        utilization = model.get_utilization(start_date, end_date)
+        report_result("utilization_total", time.perf_counter() - started, bikes=bikes,
+                      fleet_peak=f"{np.max(utilization['fleet']) * 100:.0f}%")
+        model.db.close()
+
+
+def bench_forecast(rows=2000000, bikes=500, years=3):
+    """Прогноз попиту: повна побудова погодинного ряду за роки оренд, дорахунок нової доби та підгонка моделей."""
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(23)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "forecast.db"))
+        cursor = model.db.get_cursor()
+        cursor.executemany("INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key) "
+                           "VALUES (?, ?, ?, 'Доступний', 100, ?)",
+                           [(f"Bike {i}", f"SN{i}", ("Гірський", "Міський", "Шосейний")[i % 3], f"bike {i}")
+                            for i in range(bikes)])
+        last = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=20)
+        first = last - timedelta(days=365 * years)
+        step = 365 * years * 86400 / rows
+
+        def rentals(begin, count, step):
+            for i in range(count):
+                start = begin + int(i * step)
+                duration = rnd.randint(1, 4)
+                yield rnd.randint(1, bikes), start, duration, start + duration * 3600 - rnd.randint(0, 3599)
+
+        insert = '''
+            INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount)
+            VALUES (1, ?, ?, ?, ?, 'Завершена', 100, 0)
+        '''
+        cursor.executemany(insert, rentals(to_epoch(first), rows, step))
+        model.db.commit()
+        start_date, end_date = first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+
+        started = time.perf_counter()
+        hours = model.update_demand_history(rebuild=True)
+        report_result("forecast_build", time.perf_counter() - started, rentals=rows, hours=hours)
+
+        # Оренди, внесені після побудови ряду
+        cursor.executemany(insert, rentals(to_epoch(last), int(16 * 3600 / step), step))
+        model.db.commit()
+        started = time.perf_counter()
+        hours = model.update_demand_history()
+        report_result("forecast_incremental", time.perf_counter() - started, hours=hours)
+
+        started = time.perf_counter()
+        _, rows_ = model.get_forecast_report(start_date, end_date)
+        report_result("forecast_fit", time.perf_counter() - started, rows=len(rows_))
+        model.db.close()
+
+
+def bench_clients(rows=2000000, clients=100000):
+    """Аналітика клієнтів: час звіту та пікова пам'ять Python при порційній обробці оренд."""
+    import tracemalloc
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(29)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "clients.db"))
+        cursor = model.db.get_cursor()
+        cursor.executemany("INSERT INTO clients (name, phone, email, document, name_key) VALUES (?, ?, '', '', ?)",
+                           ((f"Клієнт {i % 5000}", f"+380{i:09d}", f"клієнт {i % 5000}") for i in range(clients)))
+        cursor.executemany("INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key) "
+                           "VALUES (?, ?, ?, 'Доступний', 100, ?)",
+                           [(f"Bike {i}", f"SN{i}", ("Гірський", "Міський", "Шосейний")[i % 3], f"bike {i}")
+                            for i in range(500)])
+        first = datetime(2025, 1, 1)
+        step = 365 * 86400 / rows
+        cursor.executemany(
+            "INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount) "
+            "VALUES (?, ?, ?, ?, ?, 'Завершена', ?, 0)",
+            ((rnd.randint(1, clients), rnd.randint(1, 500), to_epoch(first) + int(i * step), 2,
+              to_epoch(first) + int(i * step) + 7200, rnd.randint(50, 500)) for i in range(rows)))
+        model.db.commit()
+
+        started = time.perf_counter()
+        columns, report_rows = model.get_client_report("2025-01-01", "2025-12-31")
+        seconds = time.perf_counter() - started
+        # Пам'ять – окремим прогоном: трасування сповільнює виділення пам'яті в рази
+        tracemalloc.start()
+        model.get_client_report("2025-01-01", "2025-12-31")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report_result("clients_report", seconds, rentals=rows, clients=len(report_rows),
+                      peak_mb=f"{peak / 1024 / 1024:.0f}")
+        model.db.close()
+
+
+def bench_export(rows=1000000, clients=50000):
+    """
+    Експорт у Parquet: повний прогін, нічний дорахунок після 1% нових і 1% змінених оренд,
+    пікова пам'ять процесу та ціна тригерів обліку змін на вставці оренд.
+    """
+    from model import BikeRentalModel, to_epoch
+    from bi_export import ColumnarExport
+    rnd = random.Random(37)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BikeRentalModel(os.path.join(tmp, "export.db"))
+        cursor = model.db.get_cursor()
+        cursor.executemany("INSERT INTO clients (name, phone, email, document, name_key) VALUES (?, ?, '', '', ?)",
+                           ((f"Клієнт {i}", f"+380{i:09d}", f"клієнт {i}") for i in range(clients)))
+        cursor.executemany("INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key) "
+                           "VALUES (?, ?, 'Міський', 'Доступний', 100, ?)",
+                           [(f"Bike {i}", f"SN{i}", f"bike {i}") for i in range(500)])
+        first = to_epoch(datetime(2024, 1, 1))
+        step = 2 * 365 * 86400 / rows
+        insert = '''
+            INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount)
+            VALUES (?, ?, ?, 2, ?, 'Завершена', ?, 0)
+        '''
+
+        def rentals(begin, count):
+            for i in range(count):
+                start = begin + int(i * step)
+                yield rnd.randint(1, clients), rnd.randint(1, 500), start, start + 7200, rnd.randint(50, 500)
+
+        def timed_insert(count):
+            started = time.perf_counter()
+            cursor.executemany(insert, rentals(first, count))
+            model.db.commit()
+            return time.perf_counter() - started
+
+        cursor.executemany(insert, rentals(first, rows))
+        cursor.executemany("INSERT INTO payments (invoice_id, rental_id, amount, payment_date, payment_method) "
+                           "SELECT id, id, total_cost, datetime(end_time, 'unixepoch', 'localtime'), 'Карткою' "
+                           "FROM rentals WHERE id % 2 = 0", ())
+        model.db.commit()
+        sample = max(rows // 20, 1000)
+        plain = timed_insert(sample)
+
+        exporter = ColumnarExport(model.db, os.path.join(tmp, "bi"))
+        output = exporter.output_dir
+        rss_before = peak_rss_mb()
+        started = time.perf_counter()
+        ok, message = exporter.run()
+        seconds = time.perf_counter() - started
+        if not ok:
+            print(message)
+            return
+        size = sum(os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(output) for name in names)
+        report_result("export_full", seconds, rows=rows + sample, mb=f"{size / 1024 / 1024:.1f}",
+                      peak_rss_mb=peak_rss_mb(), rss_before_mb=rss_before)
+
+        tracked = timed_insert(sample)
+        report_result("export_tracking_insert", tracked, rentals=sample, untracked=f"{plain:.3f}")
+        cursor.execute("UPDATE rentals SET is_paid = 1 WHERE id % 100 = 0")
+        model.db.commit()
+        started = time.perf_counter()
+        exporter.run()
+        report_result("export_incremental", time.perf_counter() - started, rentals=exporter.stats["rentals"]["rows"],
+                      clients=exporter.stats["clients"]["rows"], payments=exporter.stats["payments"]["rows"])
+        model.db.close()
+
+
+def bench_replication(rows=300000, day=3000):
+    """
+    Реплікація пункту в центральну базу: початковий пакет з rows оренд, потім пакет однієї доби
+    (day нових оренд з рахунками й платежами та day завершень) – експорт і застосування.
+    """
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(41)
+    with tempfile.TemporaryDirectory() as tmp:
+        depot = create_desk_database(os.path.join(tmp, "depot.db"), rows)
+        office = BikeRentalModel(os.path.join(tmp, "office.db"))
+        depot.replication.install("depot")
+        office.replication.install("office")
+        outbox = os.path.join(tmp, "outbox")
+
+        started = time.perf_counter()
+        path, _ = depot.replication.export_batch(outbox)
+        exported = time.perf_counter() - started
+        started = time.perf_counter()
+        ok, message = office.replication.apply_batch(path)
+        report_result("replication_initial", time.perf_counter() - started, export=f"{exported:.3f}",
+                      mb=f"{os.path.getsize(path) / 1024 / 1024:.1f}", result=message)
+
+        cursor = depot.db.get_cursor()
+        cursor.execute("SELECT MAX(id) FROM clients")
+        clients = cursor.fetchone()[0]
+        now = to_epoch(datetime.now())
+        for _ in range(day):
+            cursor.execute("INSERT INTO rentals (client_id, bike_id, start_time, duration, status, total_cost, discount) "
+                           "VALUES (?, ?, ?, 2, 'Активна', 200, 0)", (rnd.randint(1, clients), rnd.randint(51, 300), now))
+            rental_id = cursor.lastrowid
+            cursor.execute("INSERT INTO invoices (Rentals, amount) VALUES (?, 200)", (rental_id,))
+            depot.payment_dao.insert_payment(cursor, cursor.lastrowid, rental_id, 200, "Карткою")
+            cursor.execute("UPDATE rentals SET status = 'Завершена', end_time = ? WHERE id = ?", (now + 7200, rental_id))
+        depot.db.commit()
+
+        started = time.perf_counter()
+        path, _ = depot.replication.export_batch(outbox)
+        exported = time.perf_counter() - started
+        started = time.perf_counter()
+        ok, message = office.replication.apply_batch(path)
+        report_result("replication_day", time.perf_counter() - started, export=f"{exported:.3f}",
+                      kb=f"{os.path.getsize(path) / 1024:.0f}", result=message)
+        depot.db.close()
+        office.db.close()
+
+
+def bench_service(*sizes):
+    """
+    Наробіток велосипедів: завершення 50 активних оренд (тригер лічильників) і запит
+    «потребують обслуговування» на базах зі sizes завершених оренд (типово 10000 і 300000).
+    """
+    for rentals in sizes or (10000, 300000):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = create_desk_database(os.path.join(tmp, "service.db"), rentals)
+            model.set_service_interval("", 100, 40)
+            active = [rental.id for rental in model.get_active_rentals()]
+            started = time.perf_counter()
+            for rental_id in active:
+                model.complete_rental(rental_id)
+            seconds = time.perf_counter() - started
+            report_result("service_complete", seconds, rentals=rentals, completed=len(active),
+                          ms_each=f"{seconds / len(active) * 1000:.2f}")
+            started = time.perf_counter()
+            for _ in range(100):
+                count = model.count_bikes_due_for_service()
+                due = model.get_bikes_due_for_service(20)
+            seconds = time.perf_counter() - started
+            report_result("service_due_query", seconds, rentals=rentals, due=count, shown=len(due),
+                          ms_each=f"{seconds / 100 * 1000:.2f}")
+            model.db.close()
+
+
+def bench_pricing(*sizes):
+    """
+    Динамічний тариф на базах зі sizes завершених оренд (типово 10000 і 300000): розрахунок з кешу,
+    без кешу (лічильники типів) і для порівняння – підрахунок доступних велосипедів типу по таблиці bikes;
+    оформлення й завершення 50 оренд за тарифом.
+    """
+    for rentals in sizes or (10000, 300000):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = create_desk_database(os.path.join(tmp, "pricing.db"), rentals)
+            model.set_pricing_rule("", 0.2, 1.0, 0.8, 1.8)
+            model.add_pricing_band(17, 21, 1.2)
+            bike_ids = [bike.id for bike in model.get_available_bikes()][:50]
+            moment = datetime.now()
+            started = time.perf_counter()
+            for i in range(10000):
+                model.quote_rental(bike_ids[i % len(bike_ids)], 2, 0, moment)
+            seconds = time.perf_counter() - started
+            report_result("pricing_quote_cached", seconds, rentals=rentals, quotes=10000,
+                          us_each=f"{seconds / 10000 * 1e6:.1f}", hits=model.pricing.hits)
+            started = time.perf_counter()
+            for i in range(10000):
+                model.pricing.on_change("bike", bike_ids[0], "update")
+                model.quote_rental(bike_ids[i % len(bike_ids)], 2, 0, moment)
+            seconds = time.perf_counter() - started
+            report_result("pricing_quote_uncached", seconds, rentals=rentals, quotes=10000,
+                          us_each=f"{seconds / 10000 * 1e6:.1f}")
+            cursor = model.db.read_cursor()
+            started = time.perf_counter()
+            for i in range(10000):
+                cursor.execute("SELECT COUNT(*), SUM(status = 'Доступний') FROM bikes WHERE type = ?",
+                               (("Гірський", "Міський", "Шосейний")[i % 3],))
+                cursor.fetchone()
+            seconds = time.perf_counter() - started
+            report_result("pricing_scan_baseline", seconds, rentals=rentals, queries=10000,
+                          us_each=f"{seconds / 10000 * 1e6:.1f}")
+            started = time.perf_counter()
+            created = [model.create_rental(1, bike_id, moment, 2, 0)[0] for bike_id in bike_ids]
+            for rental_id in created:
+                model.complete_rental(rental_id)
+            seconds = time.perf_counter() - started
+            report_result("pricing_checkout", seconds, rentals=rentals, checkouts=len(created),
+                          ms_each=f"{seconds / len(created) * 1000:.2f}",
+                          peak=max(model.get_rental(rental_id).total_cost for rental_id in created))
+            model.db.close()
+
+
+def peak_rss_mb():
+    """Пікова резидентна пам'ять процесу в МБ або None, якщо модуль resource недоступний (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # На Linux ru_maxrss – у кілобайтах, на macOS – у байтах
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale)
+
+
+def scripted_dialogs(controller_module, messages):
+    """
+    Підміняє модальні діалоги контролера автоматичними відповідями («Так», перший варіант, 1 година),
+    щоб сценарій виконувався без користувача; тексти повідомлень збираються в messages.
+    """
+    from PyQt5.QtWidgets import QMessageBox
+
+    class AutoMessageBox(QMessageBox):
+        @staticmethod
+        def information(parent, title, text, *args):
+            messages.append(("information", text))
+            return QMessageBox.Ok
+
+        @staticmethod
+        def warning(parent, title, text, *args):
+            messages.append(("warning", text))
+            return QMessageBox.Ok
+
+        @staticmethod
+        def question(parent, title, text, *args):
+            return QMessageBox.Yes
+
+    class AutoInputDialog:
+        @staticmethod
+        def getItem(parent, title, label, items, current=0, editable=True):
+            return items[current], True
+
+        @staticmethod
+        def getInt(parent, title, label, value=0, *args):
+            return value, True
+
+    controller_module.QMessageBox = AutoMessageBox
+    controller_module.QInputDialog = AutoInputDialog
+
+
+def create_desk_database(path, rentals, seed=31):
+    """Синтетична база каси: rentals завершених оренд за рік, клієнти, 300 велосипедів і 50 активних оренд."""
+    from model import BikeRentalModel, to_epoch
+    rnd = random.Random(seed)
+    clients = max(100, rentals // 10)
+    bikes = 300
+    active = 50
+    model = BikeRentalModel(path)
+    cursor = model.db.get_cursor()
+    cursor.executemany("INSERT INTO clients (name, phone, email, document, name_key) VALUES (?, ?, ?, ?, ?)",
+                       ((f"Клієнт {i}", f"+380{i:09d}", f"client{i}@example.com", f"DOC{i}", f"клієнт {i}")
+                        for i in range(1, clients + 1)))
+    cursor.executemany("INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key) "
+                       "VALUES (?, ?, ?, ?, 100, ?)",
+                       [(f"Bike {i}", f"SN{i}", ("Гірський", "Міський", "Шосейний")[i % 3],
+                         "В оренді" if i <= active else "Доступний", f"bike {i}") for i in range(1, bikes + 1)])
+    now = datetime.now().replace(microsecond=0)
+    first = to_epoch(now - timedelta(days=365))
+    step = 365 * 86400 / rentals
+    cursor.executemany(
+        "INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost, discount) "
+        "VALUES (?, ?, ?, 2, ?, 'Завершена', 200, 0)",
+        ((rnd.randint(1, clients), rnd.randint(active + 1, bikes), first + int(i * step),
+          first + int(i * step) + 7200) for i in range(rentals)))
+    cursor.executemany(
+        "INSERT INTO rentals (client_id, bike_id, start_time, duration, status, total_cost, discount) "
+        "VALUES (?, ?, ?, 4, 'Активна', 400, 0)",
+        [(rnd.randint(1, clients), bike_id, to_epoch(now - timedelta(minutes=bike_id))) for bike_id in range(1, active + 1)])
+    model.db.commit()
+    model.client_dao.migrate_aggregates()
+    # Щоденна копія вже є, тож таймер резервного копіювання не стартує під час вимірювань
+    model.backups.run()
+    return model
+
+
+# Бюджет медіани інтерактивних кроків сценарію каси, мс: перевищення друкується як регресія
+UI_STEP_BUDGETS_MS = {"search_client": 100, "pick_client": 50, "calculate_price": 50, "create_rental": 100,
+                      "extend_rental": 100, "complete_rental": 100, "switch_tabs": 100, "preview_report": 200}
+
+
+def run_desk_scenario(rentals, repeats=5):
+    """
+    Один розмір бази в поточному процесі: запуск вікна та repeats проходів сценарію каси.
+    Кроки виконуються через віджети (click(), сигнали полів і таймерів), тобто через ті самі
+    з'єднання сигналів і обгортки слотів, що й у користувача; напряму викликаються лише
+    підмінені модальні діалоги (scripted_dialogs).
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt, QModelIndex
+    from PyQt5.QtWidgets import QApplication, QLineEdit, QPushButton, QTableWidget, QComboBox
+    import controller as controller_module
+    from controller import BikeRentalController
+    from view import MainWindow, LookupPicker
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    messages = []
+    scripted_dialogs(controller_module, messages)
+    samples = {}
+
+    def step(name, action):
+        started = time.perf_counter()
+        action()
+        app.processEvents()  # перемальовування входить у час кроку
+        samples.setdefault(name, []).append(time.perf_counter() - started)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # звіти зберігаються в поточний каталог
+        model = create_desk_database(os.path.join(tmp, "desk.db"), rentals)
+        holder = {}
+
+        def start():
+            holder["view"] = MainWindow()
+            holder["controller"] = BikeRentalController(model, holder["view"])
+            holder["view"].show()
+        step("startup", start)
+        view, controller = holder["view"], holder["controller"]
+        rentals_tab = view.rentals_tab
+        active_table = rentals_tab.findChild(QTableWidget, "active_table")
+        client_picker = rentals_tab.findChild(LookupPicker, "client_picker")
+        bike_picker = rentals_tab.findChild(LookupPicker, "bike_picker")
+        report_combo = view.reports_tab.findChild(QComboBox, "report_type_combo")
+        view.reports_tab.findChild(QComboBox, "format_combo").setCurrentText("Excel")
+
+        def click(tab, name):
+            return lambda: tab.findChild(QPushButton, name).click()
+
+        def pick(picker, text, item_id=None):
+            # Введення тексту (textEdited, як з клавіатури) і вибір варіанта з автодоповнення
+            picker.setText(text)
+            picker.textEdited.emit(text)
+            options = picker.options_model
+            row = next(row for row in range(options.rowCount())
+                       if item_id is None or options.item(row).data(Qt.UserRole) == item_id)
+            picker.options_completer.activated[QModelIndex].emit(options.index(row, 0))
+            picker.options_completer.popup().hide()
+
+        def select_rental(rental_id):
+            row = controller.find_table_row(active_table, rental_id)
+            active_table.clearSelection()
+            active_table.setCurrentCell(row, 1)
+
+        for repeat in range(repeats):
+            client_id = 1 + repeat * 7
+            view.tabs.setCurrentWidget(view.clients_tab)
+            view.clients_tab.findChild(QLineEdit, "search_input").setText(f"Клієнт {client_id}")
+            step("search_client", click(view.clients_tab, "search_client_btn"))
+
+            view.tabs.setCurrentWidget(rentals_tab)
+            step("pick_client", lambda: pick(client_picker, f"Клієнт {client_id}", client_id))
+            pick(bike_picker, "Bike")
+            step("calculate_price", click(rentals_tab, "calculate_btn"))
+            step("create_rental", click(rentals_tab, "create_rental_btn"))
+            rental_id = max(rental.id for rental in model.get_active_rentals())
+            select_rental(rental_id)
+            step("extend_rental", click(rentals_tab, "extend_rental_btn"))
+            select_rental(rental_id)
+            step("complete_rental", click(rentals_tab, "return_bike_btn"))
+
+            def switch_tabs():
+                for index in range(view.tabs.count()):
+                    view.tabs.setCurrentIndex(index)
+                    app.processEvents()
+            step("switch_tabs", switch_tabs)
+            view.tabs.setCurrentWidget(view.reports_tab)
+            # Зміна типу звіту запускає таймер живого перегляду; його спрацювання не чекаємо 400 мс
+            report_combo.setCurrentIndex(repeat % 3)
+
+            def live_preview():
+                controller.preview_timer.stop()
+                controller.preview_timer.timeout.emit()
+            step("preview_report", live_preview)
+            step("generate_report", click(view.reports_tab, "report_btn"))
+
+        warnings = [text for kind, text in messages if kind == "warning"]
+        for name, values in samples.items():
+            values = sorted(values)
+            median = values[len(values) // 2]
+            report_result(f"ui_{rentals}_{name}", median, runs=len(values), max_ms=f"{values[-1] * 1000:.1f}")
+            if median * 1000 > UI_STEP_BUDGETS_MS.get(name, float("inf")):
+                print(f"  перевищено бюджет {UI_STEP_BUDGETS_MS[name]} мс: {name}")
+        report_result(f"ui_{rentals}_total", sum(sum(values) for values in samples.values()),
+                      peak_rss_mb=peak_rss_mb(), warnings=len(warnings))
+        for text in warnings[:3]:
+            print("  попередження:", text)
+        view.close()
+        model.db.close()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_ui(*sizes):
+    """
+    Наскрізний сценарій каси у вікні MainWindow + BikeRentalController з QT_QPA_PLATFORM=offscreen:
+    пошук клієнта, нова оренда, продовження, завершення, перемикання вкладок, звіт – на базах
+    зі sizes завершених оренд (типово 1000, 10000, 100000). Кожен розмір запускається окремим
+    процесом, щоб пікова пам'ять і кеші не переходили між розмірами.
+    """
+    import subprocess
+    sizes = sizes or (1000, 10000, 100000)
+    if len(sizes) == 1:
+        run_desk_scenario(sizes[0])
+        return
+    for size in sizes:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "ui", str(size)], check=False)
+
+
+BENCHMARKS = {
+    "pdf_table": bench_pdf_table,
+    "reservations": bench_reservations,
+    "timestamps": bench_timestamps,
+    "group_rentals": bench_group_rentals,
+    "invoices": bench_invoices,
+    "backup": bench_backup,
+    "read_pool": bench_read_pool,
+    "group_commit": bench_group_commit,
+    "utilization": bench_utilization,
+    "forecast": bench_forecast,
+    "clients": bench_clients,
+    "export": bench_export,
+    "replication": bench_replication,
+    "service": bench_service,
+    "pricing": bench_pricing,
+    "ui": bench_ui,
+}
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else None
+    if name not in BENCHMARKS:
+        print("Доступні бенчмарки: " + ", ".join(BENCHMARKS))
+        sys.exit(1)
+    args = [int(arg) for arg in sys.argv[2:]]
+    BENCHMARKS[name](*args)
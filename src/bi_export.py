@@ -0,0 +1,309 @@
+import os
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# ===== Інкрементний стовпцевий експорт для BI =====
+# Таблиці пишуться у Parquet з розбиттям за місяцем: <каталог>/<таблиця>/month=YYYY-MM/part-N.parquet
+# (розбиття у стилі Hive читають pyarrow.dataset, Spark, DuckDB). Кожен запуск дописує лише нові
+# та змінені з минулого запуску рядки: для rentals, bikes і clients це рядки з change_seq більшим
+# за збережену межу (change_seq ставлять тригери з наскрізного лічильника export_sequence),
+# для payments, які лише додаються, – рядки з більшим id. Видалення потрапляють у набір deletions.
+# Змінений рядок з'являється в кількох файлах: актуальна версія – з найбільшим change_seq.
+
+SEQUENCE_TRACKED = ("rentals", "bikes", "clients")
+DELETIONS = "deletions"
+
+# Стовпці: (ім'я, вид). Види: int, float, text; epoch – секунди Unix -> timestamp UTC;
+# local – рядок місцевого часу 'YYYY-MM-DD HH:MM:SS' -> timestamp без часового поясу
+EXPORT_TABLES = {
+    "rentals": {
+        "columns": [("id", "int"), ("client_id", "int"), ("bike_id", "int"), ("group_id", "int"),
+                    ("start_time", "epoch"), ("duration", "int"), ("end_time", "epoch"), ("status", "text"),
+                    ("total_cost", "float"), ("discount", "float"), ("is_paid", "int"),
+                    ("penalty_intervals_charged", "int"), ("created_at", "epoch"), ("change_seq", "int")],
+        "month": "strftime('%Y-%m', start_time, 'unixepoch', 'localtime')",
+        "watermark": "change_seq",
+    },
+    "payments": {
+        "columns": [("id", "int"), ("invoice_id", "int"), ("rental_id", "int"), ("amount", "float"),
+                    ("payment_date", "local"), ("payment_method", "text")],
+        "month": "substr(payment_date, 1, 7)",
+        "watermark": "id",
+    },
+    "clients": {
+        "columns": [("id", "int"), ("name", "text"), ("phone", "text"), ("email", "text"), ("document", "text"),
+                    ("created_at", "local"), ("rentals_count", "int"), ("total_spent", "float"),
+                    ("last_rental_at", "epoch"), ("change_seq", "int")],
+        "month": "substr(created_at, 1, 7)",
+        "watermark": "change_seq",
+    },
+    # Велосипедів небагато і вони не мають дати створення – набір без розбиття
+    "bikes": {
+        "columns": [("id", "int"), ("model", "text"), ("serial_number", "text"), ("type", "text"),
+                    ("status", "text"), ("price_per_hour", "float"), ("last_maintenance_date", "text"),
+                    ("change_seq", "int")],
+        "month": None,
+        "watermark": "change_seq",
+    },
+    DELETIONS: {
+        "columns": [("change_seq", "int"), ("table_name", "text"), ("row_id", "int"), ("deleted_at", "epoch")],
+        "month": None,
+        "watermark": "change_seq",
+    },
+}
+ARROW_TYPES = {"int": pa.int64(), "float": pa.float64(), "text": pa.string(),
+               "epoch": pa.timestamp("s", tz="UTC"), "local": pa.timestamp("s")}
+
+
+def arrow_schema(columns):
+    return pa.schema([(name, ARROW_TYPES[kind]) for name, kind in columns])
+
+
+def to_record_batch(rows, columns, schema):
+    """
+    Кортежі рядків -> RecordBatch за схемою; час перетворюється у стовпцях, а не по рядку.
+    Зайві стовпці в кінці рядка (ключ розділу) відкидаються.
+    """
+    arrays = []
+    for values, (name, kind) in zip(zip(*rows), columns):
+        if kind == "epoch":
+            arrays.append(pa.array(values, pa.int64()).cast(ARROW_TYPES[kind]))
+        elif kind == "local":
+            # Рядок, що не розбирається як дата, стає порожнім значенням, а не зупиняє експорт
+            arrays.append(pc.strptime(pa.array(values, pa.string()), format="%Y-%m-%d %H:%M:%S",
+                                      unit="s", error_is_null=True))
+        else:
+            arrays.append(pa.array(values, ARROW_TYPES[kind]))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class PartitionWriters:
+    """
+    Відкриті ParquetWriter по розділах одного запуску. Рядки накопичуються в буферах розділів,
+    і коли в усіх буферах разом batch_size рядків, кожен буфер записується окремою групою рядків:
+    у пам'яті не більше batch_size рядків незалежно від розміру експорту. Файли пишуться з суфіксом
+    .part і отримують остаточне ім'я лише в commit().
+    """
+
+    def __init__(self, table_dir, file_name, columns, batch_size):
+        self.table_dir = table_dir
+        self.file_name = file_name
+        self.columns = columns
+        self.schema = arrow_schema(columns)
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.buffered = 0
+        self.writers = {}
+        self.rows = 0
+
+    def path(self, month):
+        directory = self.table_dir if month is False else os.path.join(self.table_dir, f"month={month or 'unknown'}")
+        return os.path.join(directory, self.file_name)
+
+    def add(self, month, rows):
+        self.buffers.setdefault(month, []).extend(rows)
+        self.buffered += len(rows)
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for month, rows in self.buffers.items():
+            writer = self.writers.get(month)
+            if writer is None:
+                path = self.path(month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                writer = self.writers[month] = pq.ParquetWriter(path + ".part", self.schema, compression="zstd")
+            writer.write_batch(to_record_batch(rows, self.columns, self.schema))
+            self.rows += len(rows)
+        self.buffers = {}
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+
+    def commit(self):
+        """Перейменовує файли запуску на остаточні; повертає їхні шляхи."""
+        paths = [self.path(month) for month in self.writers]
+        for path in paths:
+            os.replace(path + ".part", path)
+        return paths
+
+    def discard(self):
+        for writer in self.writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        for month in self.writers:
+            if os.path.exists(self.path(month) + ".part"):
+                os.remove(self.path(month) + ".part")
+
+
+class ColumnarExport:
+    """
+    Експорт таблиць бази в output_dir. Межі попереднього експорту (export_watermarks) зберігаються
+    в самій базі й оновлюються лише після того, як файли таблиці записано й перейменовано, тож перерваний
+    запуск повторюється з тієї ж межі й перезаписує ті самі файли (ім'я файлу походить від цієї межі).
+    Облік змін (стовпець change_seq і тригери) встановлюється при першому експорті й далі коштує
+    кілька додаткових оновлень на кожен запис у відстежувані таблиці.
+    """
+
+    def __init__(self, db, output_dir, batch_size=50000):
+        self.db = db
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+
+    def install_tracking(self):
+        # Схема змінюється через основне з'єднання, як у create_table DAO
+        cursor = self.db.get_cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS export_watermarks (
+                table_name TEXT PRIMARY KEY,
+                last_value INTEGER NOT NULL,
+                exported_at TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS export_sequence (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO export_sequence (id, value) VALUES (1, 0)")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS export_deletions (
+                change_seq INTEGER PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                deleted_at INTEGER NOT NULL
+            )
+        ''')
+        for table in SEQUENCE_TRACKED:
+            # Рядки, що існували до встановлення обліку, мають change_seq NULL і потрапляють
+            # лише до першого (повного) експорту
+            self.db.add_column_if_missing(table, "change_seq", "INTEGER")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table}(change_seq)")
+            stamp = f'''
+                UPDATE export_sequence SET value = value + 1 WHERE id = 1;
+                UPDATE {table} SET change_seq = (SELECT value FROM export_sequence WHERE id = 1)
+                WHERE id = NEW.id;
+            '''
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_export_insert AFTER INSERT ON {table}
+                BEGIN {stamp} END
+            ''')
+            # Умова WHEN не дає власному оновленню change_seq знову запустити тригер
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_export_update AFTER UPDATE ON {table}
+                WHEN NEW.change_seq IS OLD.change_seq
+                BEGIN {stamp} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_export_delete AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE export_sequence SET value = value + 1 WHERE id = 1;
+                    INSERT INTO export_deletions (change_seq, table_name, row_id, deleted_at)
+                    VALUES ((SELECT value FROM export_sequence WHERE id = 1), '{table}', OLD.id,
+                            CAST(strftime('%s', 'now') AS INTEGER));
+                END
+            ''')
+        self.db.commit()
+
+    def watermarks(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT table_name, last_value FROM export_watermarks")
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def reset(self, table):
+        """Забуває межу таблиці й видаляє її файли: наступний експорт буде повним."""
+        def command(cursor):
+            cursor.execute("DELETE FROM export_watermarks WHERE table_name = ?", (table,))
+        self.db.write(command)
+        table_dir = os.path.join(self.output_dir, table)
+        for directory, _, names in os.walk(table_dir):
+            for name in names:
+                if name.startswith("part-") and name.endswith((".parquet", ".parquet.part")):
+                    os.remove(os.path.join(directory, name))
+
+    def export_table(self, table, watermark):
+        """
+        Записує рядки таблиці після межі watermark (None – усі рядки); повертає (рядків, файли, нова межа).
+        Рядки читає один SELECT порціями fetchmany: він бачить один знімок бази, а записи, зроблені під
+        час експорту, отримують більші change_seq і потрапляють у наступний запуск.
+        """
+        spec = EXPORT_TABLES[table]
+        source = "export_deletions" if table == DELETIONS else table
+        key = spec["watermark"]
+        select = ", ".join(name for name, _ in spec["columns"]) + ", " + (spec["month"] or "NULL")
+        if watermark is None:
+            query, params = f"SELECT {select} FROM {source}", ()
+        else:
+            query, params = f"SELECT {select} FROM {source} WHERE {key} > ? ORDER BY {key}", (watermark,)
+        key_index = [name for name, _ in spec["columns"]].index(key)
+        partitioned = spec["month"] is not None
+
+        # Повний експорт пише part-0, наступні – part-<межа + 1>: межа росте з кожним непорожнім запуском
+        first = 0 if watermark is None else watermark + 1
+        writers = PartitionWriters(os.path.join(self.output_dir, table), f"part-{first:012d}.parquet",
+                                   spec["columns"], self.batch_size)
+        last_value = watermark or 0
+        cursor = self.db.read_cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                # Рядки йдуть приблизно в порядку часу, тож сусідні рядки переважно з одного місяця
+                # і передаються записувачам цілими відрізками
+                if partitioned:
+                    for month, run in groupby(rows, key=itemgetter(-1)):
+                        writers.add(month, list(run))
+                else:
+                    writers.add(False, rows)
+                last_value = max(last_value, max((row[key_index] for row in rows if row[key_index] is not None),
+                                                 default=last_value))
+            writers.close()
+        except Exception:
+            writers.discard()
+            raise
+        finally:
+            cursor.close()
+        return writers.rows, writers.commit(), last_value
+
+    def save_watermark(self, table, value):
+        def command(cursor):
+            cursor.execute('''
+                INSERT INTO export_watermarks (table_name, last_value, exported_at) VALUES (?, ?, ?)
+                ON CONFLICT (table_name) DO UPDATE SET last_value = excluded.last_value,
+                                                       exported_at = excluded.exported_at
+            ''', (table, value, datetime.now().isoformat(timespec="seconds")))
+        self.db.write(command)
+
+    def run(self, tables=None, full=False):
+        """
+        Експортує tables (типово всі, разом із deletions); full – почати з нуля, видаливши попередні файли.
+        Повертає (успіх, повідомлення); підсумки по таблицях лишаються в self.stats.
+        """
+        self.stats = {}
+        try:
+            self.install_tracking()
+            for table in tables or EXPORT_TABLES:
+                if full:
+                    self.reset(table)
+                watermark = self.watermarks().get(table)
+                rows, files, last_value = self.export_table(table, watermark)
+                self.save_watermark(table, last_value)
+                self.stats[table] = {"rows": rows, "files": len(files), "watermark": last_value}
+        except Exception as e:
+            print("Error exporting to Parquet:", e)
+            return False, "Помилка експорту: " + str(e)
+        summary = ", ".join(f"{table} – {stats['rows']}" for table, stats in self.stats.items())
+        return True, f"Експорт у {self.output_dir} завершено, рядків: {summary}"
@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+
+# ===== Стрічка змін моделі =====
+
+
+class ChangeFeed:
+    """
+    Внутрішньопроцесна стрічка змін: DAO після успішного запису повідомляють
+    (entity, entity_id, operation), де operation – "insert", "update" або "delete".
+    Підписники (таблиці, списки, лічильники панелі) оновлюють лише змінені рядки.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self.pending = None
+
+    def subscribe(self, callback, entities=None):
+        """callback(entity, entity_id, operation); entities обмежує набір сутностей."""
+        self.subscribers.append((callback, set(entities) if entities else None))
+
+    def unsubscribe(self, callback):
+        self.subscribers = [(cb, entities) for cb, entities in self.subscribers if cb != callback]
+
+    def emit(self, entity, entity_id, operation):
+        if self.pending is not None:
+            self.queue(entity, entity_id, operation)
+            return
+        self.deliver(entity, entity_id, operation)
+
+    def queue(self, entity, entity_id, operation):
+        key = (entity, entity_id)
+        previous = self.pending.get(key)
+        if previous == "insert" and operation == "update":
+            return
+        if previous == "insert" and operation == "delete":
+            del self.pending[key]
+            return
+        # dict зберігає порядок першої появи ключа, тому сповіщення йдуть у порядку змін
+        self.pending[key] = operation
+
+    def deliver(self, entity, entity_id, operation):
+        for callback, entities in list(self.subscribers):
+            if entities is not None and entity not in entities:
+                continue
+            try:
+                callback(entity, entity_id, operation)
+            except Exception as e:
+                print("Error in change feed subscriber:", e)
+
+    @contextmanager
+    def batch(self):
+        """Групує зміни: кожен запис повідомляється один раз після виходу з блоку."""
+        if self.pending is not None:
+            yield
+            return
+        self.pending = {}
+        try:
+            yield
+        finally:
+            pending, self.pending = self.pending, None
+            for (entity, entity_id), operation in pending.items():
+                self.deliver(entity, entity_id, operation)
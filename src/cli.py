@@ -0,0 +1,242 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+# ===== Командний рядок без графічного інтерфейсу =====
+# Звіти, імпорт, обслуговування бази, резервні копії та бенчмарки для запуску з cron.
+# Модуль працює лише з BikeRentalModel і не імпортує PyQt5, тож запускається на сервері без дисплея:
+#
+#   python cli.py report "Оренди за період" 2025-04-01 2025-04-30 --format PDF
+#   python cli.py invoices 2025-04-01 2025-04-30 --merged
+#   python cli.py import clients clients.csv
+#   python cli.py maintain --analyze --vacuum
+#   python cli.py backup --keep 14
+#   python cli.py forecast 2024-01-01 2025-04-30 --weeks 6
+#   python cli.py forecast 2025-04-01 2025-04-30 --daily
+#   python cli.py export /srv/bi/bike_rental
+#   python cli.py sync export outbox --site depot-podil
+#   python cli.py sync apply inbox/*.jsonl.gz
+#   python cli.py bench timestamps 100000
+
+DEFAULT_DB = "bike_rental.db"
+IMPORT_COLUMNS = {
+    "clients": ("name", "phone", "email", "document"),
+    "bikes": ("model", "serial_number", "type", "price_per_hour"),
+}
+
+
+def open_model(args):
+    from model import BikeRentalModel
+    return BikeRentalModel(args.db)
+
+
+def is_error(message):
+    return message.startswith(("Помилка", "Невідомий"))
+
+
+def command_report(args):
+    message = open_model(args).generate_report(args.report_type, args.start_date, args.end_date, args.format)
+    print(message)
+    return 1 if is_error(message) else 0
+
+
+def command_invoices(args):
+    message = open_model(args).render_invoices(args.start_date, args.end_date, args.output_dir,
+                                               args.merged, args.workers)
+    print(message)
+    return 1 if is_error(message) else 0
+
+
+def read_import_rows(path, columns):
+    # utf-8-sig прибирає BOM, який додає Excel при збереженні CSV
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        missing = [column for column in columns if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError("У файлі відсутні стовпці: " + ", ".join(missing))
+        for record in reader:
+            yield tuple((record[column] or "").strip() for column in columns)
+
+
+def command_import(args):
+    model = open_model(args)
+    # Помилки читання файлу виникають уже всередині транзакції імпорту й скасовують її
+    rows = read_import_rows(args.path, IMPORT_COLUMNS[args.entity])
+    if args.entity == "clients":
+        _, message = model.import_clients(rows)
+    else:
+        _, message = model.import_bikes(rows)
+    print(message)
+    return 1 if is_error(message) else 0
+
+
+def command_maintain(args):
+    ok, message = open_model(args).run_maintenance(args.analyze, not args.no_optimize, args.vacuum)
+    print(message)
+    return 0 if ok else 1
+
+
+def command_backup(args):
+    backups = open_model(args).backups
+    if args.backup_dir:
+        backups.backup_dir = args.backup_dir
+    if args.list:
+        for path in backups.list_snapshots():
+            print(path)
+        return 0
+    backups.keep = args.keep
+    backups.compress = not args.no_compress
+    path, message = backups.run()
+    print(message)
+    return 0 if path else 1
+
+
+def command_forecast(args):
+    model = open_model(args)
+    if args.rebuild:
+        model.update_demand_history(rebuild=True)
+    if args.daily:
+        columns, rows = model.get_daily_demand_report(args.start_date, args.end_date)
+    else:
+        columns, rows = model.get_forecast_report(args.start_date, args.end_date, args.weeks)
+    if not rows:
+        print("За вибраний період немає повних діб історії." if args.daily
+              else "Для прогнозу потрібен хоча б один повний тиждень історії.")
+        return 1
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join(str(value) for value in row))
+    return 0
+
+
+def command_export(args):
+    ok, message = open_model(args).export_columnar(args.output_dir, args.tables, args.full)
+    print(message)
+    return 0 if ok else 1
+
+
+def command_sync(args):
+    replication = open_model(args).replication
+    if args.site:
+        site_id = replication.install(args.site)
+        if site_id != args.site:
+            print(f"База вже має ідентифікатор пункту {site_id}")
+            return 1
+    if args.action == "status":
+        status = replication.status()
+        if status is None:
+            print("Реплікацію не налаштовано.")
+            return 0
+        print(f"Пункт: {status['site_id']}, змін у журналі: {status['last_seq']}, "
+              f"не експортовано: {status['pending']}, конфліктів: {status['conflicts']}")
+        for site_id, applied_seq, applied_at in status["peers"]:
+            print(f"  {site_id}: застосовано зміни до {applied_seq} ({applied_at})")
+        return 0
+    if args.action == "export":
+        path, message = replication.export_batch(args.paths[0] if args.paths else "outbox", args.since)
+        print(message)
+        return 0 if path or message.startswith("Нових") else 1
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".jsonl.gz"))
+        else:
+            paths.append(path)
+    if not paths:
+        print("Не вказано файлів пакетів.")
+        return 1
+    ok, message = replication.apply_batches(paths)
+    print(message)
+    return 0 if ok else 1
+
+
+def command_bench(args):
+    from benchmarks import BENCHMARKS
+    if args.name not in BENCHMARKS:
+        print("Доступні бенчмарки: " + ", ".join(BENCHMARKS))
+        return 1
+    BENCHMARKS[args.name](*args.args)
+    return 0
+
+
+def build_parser():
+    from model import REPORT_TYPES
+    parser = argparse.ArgumentParser(prog="cli.py", description="Прокат велосипедів: команди без графічного інтерфейсу")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"файл бази даних (типово {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="сформувати звіт у PDF або Excel")
+    report.add_argument("report_type", choices=REPORT_TYPES)
+    report.add_argument("start_date", help="РРРР-ММ-ДД")
+    report.add_argument("end_date", help="РРРР-ММ-ДД")
+    report.add_argument("--format", choices=("PDF", "Excel"), default="PDF")
+    report.set_defaults(handler=command_report)
+
+    invoices = commands.add_parser("invoices", help="надрукувати рахунки за період")
+    invoices.add_argument("start_date")
+    invoices.add_argument("end_date")
+    invoices.add_argument("--output-dir")
+    invoices.add_argument("--merged", action="store_true", help="один об'єднаний PDF")
+    invoices.add_argument("--workers", type=int, help="кількість процесів (типово за кількістю ядер)")
+    invoices.set_defaults(handler=command_invoices)
+
+    imports = commands.add_parser("import", help="масовий імпорт з CSV з рядком заголовків")
+    imports.add_argument("entity", choices=sorted(IMPORT_COLUMNS))
+    imports.add_argument("path")
+    imports.set_defaults(handler=command_import)
+
+    maintain = commands.add_parser("maintain", help="ANALYZE, PRAGMA optimize, VACUUM")
+    maintain.add_argument("--analyze", action="store_true")
+    maintain.add_argument("--vacuum", action="store_true")
+    maintain.add_argument("--no-optimize", action="store_true")
+    maintain.set_defaults(handler=command_maintain)
+
+    backup = commands.add_parser("backup", help="онлайн-копія бази з ротацією")
+    backup.add_argument("--backup-dir")
+    backup.add_argument("--keep", type=int, default=7)
+    backup.add_argument("--no-compress", action="store_true")
+    backup.add_argument("--list", action="store_true", help="лише показати наявні копії")
+    backup.set_defaults(handler=command_backup)
+
+    forecast = commands.add_parser("forecast", help="прогноз пікового попиту по типах велосипедів")
+    forecast.add_argument("start_date", help="початок історії, РРРР-ММ-ДД")
+    forecast.add_argument("end_date", help="кінець історії, РРРР-ММ-ДД")
+    forecast.add_argument("--weeks", type=int, default=4, help="горизонт прогнозу в тижнях")
+    forecast.add_argument("--rebuild", action="store_true", help="перерахувати збережений ряд попиту з нуля")
+    forecast.add_argument("--daily", action="store_true",
+                          help="замість прогнозу вивести денний ряд: пік, велосипедо-години та оренди за добу")
+    forecast.set_defaults(handler=command_forecast)
+
+    export = commands.add_parser("export", help="інкрементний експорт у Parquet для BI")
+    export.add_argument("output_dir")
+    export.add_argument("--tables", nargs="+", choices=("rentals", "payments", "clients", "bikes", "deletions"),
+                        help="типово всі таблиці")
+    export.add_argument("--full", action="store_true", help="видалити попередні файли й експортувати все заново")
+    export.set_defaults(handler=command_export)
+
+    sync = commands.add_parser("sync", help="реплікація між пунктами через файли пакетів змін")
+    sync.add_argument("action", choices=("export", "apply", "status"))
+    sync.add_argument("paths", nargs="*", help="каталог для export; файли або каталоги пакетів для apply")
+    sync.add_argument("--site", help="ідентифікатор цього пункту (при першому запуску)")
+    sync.add_argument("--since", type=int, help="експортувати зміни після цього номера (повторний експорт)")
+    sync.set_defaults(handler=command_sync)
+
+    bench = commands.add_parser("bench", help="запустити бенчмарк з benchmarks.py")
+    bench.add_argument("name")
+    bench.add_argument("args", nargs="*", type=int)
+    bench.set_defaults(handler=command_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+    code = args.handler(args)
+    print(f"Готово за {time.perf_counter() - started:.2f} с", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import numpy as np
+
+# ===== Аналітика клієнтської бази (RFM) =====
+# Оренди групуються в SQLite за клієнтом і типом, групи читаються порціями й згортаються в масиви розміру
+# «кількість клієнтів» (та «клієнти × типи» для улюбленого типу), тож пам'ять не залежить від
+# кількості оренд. Клієнти розрізняються за id, а не за іменем; клієнти без оренд теж у звіті.
+
+CLIENT_COLUMNS = ["ID клієнта", "Клієнт", "Телефон", "Кількість оренд", "Загальна сума",
+                  "Середня тривалість (год)", "Улюблений тип", "Днів від останньої оренди", "RFM", "Сегмент"]
+NO_RENTALS_SEGMENT = "Без оренд"
+
+
+def rfm_scores(values, active, bins=5):
+    """
+    Бали 1..bins за квантилями values серед активних клієнтів (вищі значення – вищий бал);
+    однакові значення отримують однаковий бал. Для неактивних – 0.
+    """
+    scores = np.zeros(len(values), dtype=np.int64)
+    ranked = np.sort(values[active])
+    if ranked.size:
+        position = np.searchsorted(ranked, values[active], side="left")
+        scores[active] = 1 + position * bins // ranked.size
+    return scores
+
+
+def segment(recency, frequency):
+    """Сегмент за балами давності та частоти (0 – клієнт без оренд у періоді)."""
+    if recency == 0:
+        return NO_RENTALS_SEGMENT
+    if recency >= 4 and frequency >= 4:
+        return "Чемпіони"
+    if frequency >= 4:
+        return "Лояльні"
+    if recency >= 4 and frequency <= 2:
+        return "Нові"
+    if recency <= 2 and frequency >= 3:
+        return "Під загрозою"
+    if recency <= 2:
+        return "Втрачені"
+    return "Потребують уваги"
+
+
+def accumulate_rentals(cursor, bounds, client_ids, chunk_size=20000):
+    """
+    Згортає оренди, що почалися в межах bounds, по клієнтах client_ids (відсортованих).
+    SQLite групує оренди періоду за (клієнт, тип велосипеда) одним проходом по індексу start_time,
+    а групи читаються порціями по chunk_size рядків: у Python не надходить більше рядка на пару
+    клієнт–тип, і в пам'яті одночасно лише одна порція. Повертає (типи, словник масивів):
+    rentals, spent, seconds, last_start та type_counts (клієнти × типи).
+    """
+    cursor.row_factory = None
+    # Типів небагато, тож лічильники «клієнти × типи» – щільний масив
+    cursor.execute("SELECT DISTINCT COALESCE(type, '') FROM bikes")
+    types = sorted({row[0] for row in cursor.fetchall()} | {""})
+    type_index = {bike_type: index for index, bike_type in enumerate(types)}
+    clients = len(client_ids)
+    totals = {"rentals": np.zeros(clients, dtype=np.int64), "spent": np.zeros(clients),
+              "seconds": np.zeros(clients), "last_start": np.full(clients, np.iinfo(np.int64).min),
+              "type_counts": np.zeros((clients, len(types)), dtype=np.int64)}
+    # Діапазонний пошук за індексом (client_id, start_time) читав би таблицю вроздріб;
+    # послідовний прохід періоду з групуванням у тимчасовому B-дереві вдвічі швидший
+    cursor.execute('''
+        SELECT r.client_id, COALESCE(b.type, ''), COUNT(*), SUM(COALESCE(r.total_cost, 0)),
+               SUM(COALESCE(r.end_time - r.start_time, r.duration * 3600)), MAX(r.start_time)
+        FROM rentals r
+        LEFT JOIN bikes b ON b.id = r.bike_id
+        WHERE r.start_time >= ? AND r.start_time < ?
+        GROUP BY r.client_id, b.type
+    ''', bounds)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        kinds = np.array([type_index[row[1]] for row in rows], dtype=np.int64)
+        values = np.array([row[2:] for row in rows], dtype=np.float64)
+        # Оренди видалених клієнтів не мають рядка в clients і не враховуються
+        positions = np.searchsorted(client_ids, ids)
+        known = positions < clients
+        known[known] = client_ids[positions[known]] == ids[known]
+        positions, kinds, values = positions[known], kinds[known], values[known]
+        # Клієнт може мати кілька рядків (по типах), тому підсумки додаються через bincount
+        totals["rentals"] += np.bincount(positions, weights=values[:, 0], minlength=clients).astype(np.int64)
+        totals["spent"] += np.bincount(positions, weights=values[:, 1], minlength=clients)
+        totals["seconds"] += np.bincount(positions, weights=values[:, 2], minlength=clients)
+        np.maximum.at(totals["last_start"], positions, values[:, 3].astype(np.int64))
+        totals["type_counts"][positions, kinds] += values[:, 0].astype(np.int64)
+    return types, totals
+
+
+def client_segments(cursor, bounds, as_of_epoch, chunk_size=20000):
+    """
+    Рядки звіту (у порядку CLIENT_COLUMNS) для всіх клієнтів за період bounds (секунди Unix):
+    кількість і сума оренд, середня тривалість, улюблений тип, давність останньої оренди
+    відносно as_of_epoch, бали RFM і сегмент. Сортування – за сумою, від більшої.
+    """
+    cursor.row_factory = None
+    cursor.execute("SELECT id, name, phone FROM clients ORDER BY id")
+    clients = cursor.fetchall()
+    client_ids = np.array([row[0] for row in clients], dtype=np.int64)
+    types, totals = accumulate_rentals(cursor, bounds, client_ids, chunk_size)
+
+    rentals = totals["rentals"]
+    active = rentals > 0
+    days_since = np.maximum(as_of_epoch - totals["last_start"], 0) // 86400
+    recency = rfm_scores(-days_since, active)
+    frequency = rfm_scores(rentals, active)
+    monetary = rfm_scores(totals["spent"], active)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_hours = np.where(active, totals["seconds"] / 3600 / rentals, 0)
+    favourite = totals["type_counts"].argmax(axis=1)
+
+    rows = []
+    for index in np.argsort(-totals["spent"], kind="stable").tolist():
+        client_id, name, phone = clients[index]
+        has_rentals = bool(active[index])
+        rows.append([client_id, name, phone or "", int(rentals[index]), round(float(totals["spent"][index]), 2),
+                     round(float(average_hours[index]), 1),
+                     (types[favourite[index]] or "Без типу") if has_rentals else "",
+                     int(days_since[index]) if has_rentals else "",
+                     f"{recency[index]}{frequency[index]}{monetary[index]}" if has_rentals else "",
+                     segment(int(recency[index]), int(frequency[index]))])
+    return rows
@@ -8,24 +8,49 @@ from PyQt5.QtWidgets import (
     QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QComboBox, QTableWidget, QTableWidgetItem, QSpinBox,
     QDoubleSpinBox, QInputDialog, QDateTimeEdit, QGroupBox, QFormLayout, QMessageBox,
-    QHeaderView, QDialog, QDialogButtonBox, QSystemTrayIcon
+    QHeaderView, QDialog, QDialogButtonBox, QSystemTrayIcon, QTableView
 )
 from PyQt5.QtCore import QRegExp, QDateTime, Qt, QTimer
 from PyQt5.QtGui import QRegExpValidator, QIcon, QFont
-from view import MainWindow, AddClientDialog, EditClientDialog, AddBikeDialog, EditBikeDialog
-from model import BikeRentalModel
+from view import (MainWindow, AddClientDialog, EditClientDialog, AddBikeDialog, EditBikeDialog, LookupPicker,
+                  GroupRentalDialog, LatencyDialog)
+from model import BikeRentalModel, format_datetime, PAYMENT_METHODS, FORECAST_REPORT
+from utilization import recent_period
+from activity import ACTIVITY_LABELS
+from ui_latency import LatencyRecorder, TimedModel
+
+# Слоти, що підключаються в setup_connections, та зворотні виклики таймерів: їхній час
+# записується в LatencyRecorder (вкладені виклики входять у час зовнішнього обробника)
+INSTRUMENTED_SLOTS = (
+    "add_client", "edit_client", "delete_client", "view_client_history", "search_clients",
+    "fetch_client_options", "fetch_bike_options",
+    "add_bike", "edit_bike", "delete_bike", "change_bike_status", "search_bikes",
+    "calculate_rental_price", "create_rental", "complete_rental", "extend_rental", "create_reservation",
+    "create_group_rental", "generate_report", "preview_report", "live_preview_report", "show_computed_preview",
+    "render_invoices", "start_backup",
+    "show_latency_diagnostics", "check_overdue_rentals", "update_dashboard_stats", "update_utilization_heatmap",
+    "start_daily_backup", "poll_backup",
+)
 
 class BikeRentalController:
-    def __init__(self, model: BikeRentalModel, view: MainWindow):
-        self.model = model
+    def __init__(self, model: BikeRentalModel, view: MainWindow, latency=None):
+        self.latency = latency or LatencyRecorder()
+        self.model = TimedModel(model, self.latency)
         self.view = view
         self.overdue_notification_times = {}
         self.alerted_rentals = set()
+        self.recent_activity_version = None
+        # Обгортки ставляться на екземпляр до підключення сигналів і таймерів
+        for name in INSTRUMENTED_SLOTS:
+            setattr(self, name, self.latency.wrap_slot(name, getattr(self, name)))
+        self.setup_latency_watchdog()
         self.setup_tray_icon()
         self.setup_connections()
         self.load_initial_data()
+        self.model.changes.subscribe(self.on_model_change)
         self.setup_overdue_timer()
         self.setup_dashboard_timer()
+        self.setup_backup_timer()
         self.update_dashboard_stats()
 
     def setup_tray_icon(self):
@@ -35,6 +60,18 @@ class BikeRentalController:
         self.tray_icon.setIcon(QIcon(icon_path))
         self.tray_icon.setVisible(True)
 
+    def setup_latency_watchdog(self):
+        """Пульс циклу подій для виявлення зависань: якщо таймер не спрацював вчасно, цикл був зайнятий."""
+        self.heartbeat_timer = QTimer(self.view)
+        self.heartbeat_timer.timeout.connect(self.latency.heartbeat)
+        self.heartbeat_timer.start(int(self.latency.beat_interval * 1000))
+        self.latency.start_watchdog()
+
+    def show_latency_diagnostics(self):
+        dialog = LatencyDialog(lambda: (self.latency.summary(), self.latency.stall_list()),
+                               self.latency.dump, self.view)
+        dialog.exec_()
+
     def setup_overdue_timer(self):
         """Налаштовує таймер для автоматичної перевірки просрочених оренд кожні 60 секунд."""
         self.overdue_timer = QTimer(self.view)
@@ -47,17 +84,186 @@ class BikeRentalController:
         self.dashboard_timer = QTimer(self.view)
         self.dashboard_timer.timeout.connect(self.update_dashboard_stats)
         self.dashboard_timer.start(5000)
+        # Теплова карта за 4 тижні змінюється повільно – достатньо оновлювати раз на 10 хвилин
+        self.utilization_timer = QTimer(self.view)
+        self.utilization_timer.timeout.connect(self.update_utilization_heatmap)
+        self.utilization_timer.start(10 * 60 * 1000)
+
+    def update_utilization_heatmap(self):
+        start_date, end_date = recent_period(28)
+        try:
+            utilization = self.model.get_utilization(start_date, end_date)
+        except Exception as e:
+            print("Error computing utilization:", e)
+            return
+        self.view.utilization_heatmap.set_values(utilization["fleet"])
+
+    def setup_backup_timer(self):
+        """Щогодини перевіряє, чи потрібна щоденна резервна копія; прогрес копіювання опитується окремим таймером."""
+        self.backup_manual = False
+        self.backup_progress_timer = QTimer(self.view)
+        self.backup_progress_timer.timeout.connect(self.poll_backup)
+        self.backup_timer = QTimer(self.view)
+        self.backup_timer.timeout.connect(self.start_daily_backup)
+        self.backup_timer.start(3600 * 1000)
+        self.start_daily_backup()
+
+    def start_daily_backup(self):
+        if self.model.backups.is_due(timedelta(days=1)):
+            self.start_backup()
+
+    def start_backup(self, manual=False):
+        """Запускає онлайн-копіювання бази у фоновому потоці; інтерфейс і запис продовжують працювати."""
+        if not self.model.backups.start():
+            if manual:
+                QMessageBox.information(self.view, "Резервна копія", "Резервне копіювання вже виконується.")
+            return
+        self.backup_manual = manual
+        self.backup_progress_timer.start(200)
+
+    def poll_backup(self):
+        backups = self.model.backups
+        if backups.is_running():
+            copied, total = backups.progress
+            if total:
+                self.view.statusBar().showMessage(f"Резервне копіювання: {copied * 100 // total}%")
+            return
+        self.backup_progress_timer.stop()
+        path, msg = backups.result
+        self.view.statusBar().showMessage(msg, 10000)
+        if self.backup_manual:
+            if path:
+                QMessageBox.information(self.view, "Резервна копія", msg)
+            else:
+                QMessageBox.warning(self.view, "Резервна копія", msg)
+        elif not path:
+            self.tray_icon.showMessage("Резервна копія", msg, QSystemTrayIcon.Warning, 5000)
+
+    def load_dashboard_counters(self):
+        """
+        Початкові значення лічильників панелі та стан, потрібний для їх інкрементного оновлення.
+        Далі лічильники змінюються лише за подіями стрічки змін моделі.
+        """
+        self.bike_statuses = {bike.id: bike.status for bike in self.model.get_all_bikes()}
+        self.active_rental_ids = {rental.id for rental in self.model.get_active_rentals()}
+        self.dashboard_counts = {
+            "available_bikes": self.model.count_available_bikes(),
+            "active_rentals": len(self.active_rental_ids),
+            "clients": self.model.count_clients(),
+        }
 
     def update_dashboard_stats(self):
-        available_bikes = len(self.model.get_available_bikes())
-        active_rentals = len(self.model.get_active_rentals())
-        clients_count = len(self.model.get_all_clients())
         income = self.model.get_income_today()  # Викликаємо метод моделі
 
-        self.view.available_bikes_label.setText(str(available_bikes))
-        self.view.active_rentals_label.setText(str(active_rentals))
-        self.view.clients_label.setText(str(clients_count))
+        self.view.available_bikes_label.setText(str(self.dashboard_counts["available_bikes"]))
+        self.view.active_rentals_label.setText(str(self.dashboard_counts["active_rentals"]))
+        self.view.clients_label.setText(str(self.dashboard_counts["clients"]))
         self.view.income_label.setText(f"{income:.2f} грн")
+        self.update_recent_activity()
+        self.update_service_due()
+
+    def update_service_due(self, limit=20):
+        """Віджет «Потребують обслуговування»: кількість і перші limit велосипедів (частковий індекс, без історії)."""
+        count = self.model.count_bikes_due_for_service()
+        self.view.service_group.setTitle(f"Потребують обслуговування: {count}")
+        table = self.view.dashboard_tab.findChild(QTableWidget, "service_table")
+        bikes = self.model.get_bikes_due_for_service(limit)
+        table.setRowCount(len(bikes))
+        for row, (_, model, serial_number, bike_type, hours, rentals) in enumerate(bikes):
+            for column, text in enumerate((model, serial_number or "", bike_type or "", f"{hours:.1f}", str(rentals))):
+                table.setItem(row, column, QTableWidgetItem(text))
+
+    def update_recent_activity(self):
+        """Перемальовує таблицю «Останні оренди» з буфера подій моделі, лише якщо він змінився."""
+        events, version = self.model.get_recent_activity()
+        if version == self.recent_activity_version:
+            return
+        self.recent_activity_version = version
+        table = self.view.dashboard_tab.findChild(QTableWidget, "recent_table")
+        table.setRowCount(len(events))
+        for row, (_, kind, client_name, bike_model, moment) in enumerate(events):
+            for column, text in enumerate((client_name or "Невідомо", bike_model or "Невідомо",
+                                           format_datetime(moment), ACTIVITY_LABELS.get(kind, kind))):
+                table.setItem(row, column, QTableWidgetItem(text))
+
+    # --- Інкрементне оновлення UI за стрічкою змін моделі ---
+    def on_model_change(self, entity, entity_id, operation):
+        if entity == "bike":
+            self.apply_bike_change(entity_id, operation)
+        elif entity == "client":
+            self.apply_client_change(entity_id, operation)
+        elif entity == "rental":
+            self.apply_rental_change(entity_id, operation)
+
+    def find_table_row(self, table, entity_id):
+        """Рядок таблиці з указаним ID у прихованому стовпці 0 або -1."""
+        for item in table.findItems(str(entity_id), Qt.MatchExactly):
+            if item.column() == 0:
+                return item.row()
+        return -1
+
+    def upsert_table_row(self, table, entity_id, operation, fill_row, entity):
+        """Оновлює, додає або видаляє один рядок таблиці замість повного перезавантаження."""
+        row = self.find_table_row(table, entity_id)
+        if entity is None:
+            if row >= 0:
+                table.removeRow(row)
+            return
+        if row < 0:
+            # Оновлення запису, відсутнього у відфільтрованій таблиці, не додає його
+            if operation != "insert":
+                return
+            row = table.rowCount()
+            table.insertRow(row)
+        fill_row(table, row, entity)
+
+    def apply_bike_change(self, bike_id, operation):
+        bike = None if operation == "delete" else self.model.get_bike(bike_id)
+        old_status = self.bike_statuses.pop(bike_id, None)
+        new_status = bike.status if bike else None
+        if bike:
+            self.bike_statuses[bike_id] = new_status
+        self.dashboard_counts["available_bikes"] += (new_status == "Доступний") - (old_status == "Доступний")
+        table = self.view.bikes_tab.findChild(QTableWidget, "bikes_table")
+        self.upsert_table_row(table, bike_id, operation, self.fill_bike_row, bike)
+        picker = self.view.rentals_tab.findChild(LookupPicker, "bike_picker")
+        if picker and picker.currentData() == bike_id:
+            if new_status == "Доступний":
+                picker.set_selection(bike_id, self.bike_label(bike))
+            else:
+                picker.clear_selection()
+        self.view.available_bikes_label.setText(str(self.dashboard_counts["available_bikes"]))
+        # Завершення оренди та повернення з ремонту змінюють позначки обслуговування
+        self.update_service_due()
+
+    def apply_client_change(self, client_id, operation):
+        client = None if operation == "delete" else self.model.get_client(client_id)
+        if operation == "insert":
+            self.dashboard_counts["clients"] += 1
+        elif operation == "delete":
+            self.dashboard_counts["clients"] -= 1
+        table = self.view.clients_tab.findChild(QTableWidget, "clients_table")
+        self.upsert_table_row(table, client_id, operation, self.fill_client_row, client)
+        picker = self.view.rentals_tab.findChild(LookupPicker, "client_picker")
+        if picker and picker.currentData() == client_id:
+            if client is None:
+                picker.clear_selection()
+            else:
+                picker.set_selection(client_id, self.client_label(client))
+        self.view.clients_label.setText(str(self.dashboard_counts["clients"]))
+
+    def apply_rental_change(self, rental_id, operation):
+        rental = None if operation == "delete" else self.model.get_rental(rental_id)
+        is_active = rental is not None and rental.status == "Активна"
+        was_active = rental_id in self.active_rental_ids
+        if is_active:
+            self.active_rental_ids.add(rental_id)
+        else:
+            self.active_rental_ids.discard(rental_id)
+        self.dashboard_counts["active_rentals"] += is_active - was_active
+        table = self.view.rentals_tab.findChild(QTableWidget, "active_table")
+        self.upsert_table_row(table, rental_id, "insert", self.fill_rental_row, rental if is_active else None)
+        self.update_dashboard_stats()
 
     def validate_client_data(self, name, phone, email, document):
         """
@@ -104,13 +310,13 @@ class BikeRentalController:
         if search_client_btn:
             search_client_btn.clicked.connect(self.search_clients)
 
-        # Пошук клієнтів у вкладці "Оренда"
-        client_search = self.view.rentals_tab.findChild(QLineEdit, "client_search")
-        if client_search:
-            client_search.textChanged.connect(self.search_clients_for_rental)
-        client_results = self.view.rentals_tab.findChild(QTableWidget, "client_results")
-        if client_results:
-            client_results.cellClicked.connect(self.select_client_from_search)
+        # Вибір клієнта та велосипеда у вкладці "Оренда": варіанти підвантажуються запитом за префіксом
+        client_picker = self.view.rentals_tab.findChild(LookupPicker, "client_picker")
+        if client_picker:
+            client_picker.set_fetch(self.fetch_client_options)
+        bike_picker = self.view.rentals_tab.findChild(LookupPicker, "bike_picker")
+        if bike_picker:
+            bike_picker.set_fetch(self.fetch_bike_options)
 
         # Вкладка "Велосипеди"
         add_bike_btn = self.view.bikes_tab.findChild(QPushButton, "add_bike_btn")
@@ -142,21 +348,96 @@ class BikeRentalController:
         extend_rental_btn = self.view.rentals_tab.findChild(QPushButton, "extend_rental_btn")
         if extend_rental_btn:
             extend_rental_btn.clicked.connect(self.extend_rental)
+        reserve_btn = self.view.rentals_tab.findChild(QPushButton, "reserve_btn")
+        if reserve_btn:
+            reserve_btn.clicked.connect(self.create_reservation)
+        group_rental_btn = self.view.rentals_tab.findChild(QPushButton, "group_rental_btn")
+        if group_rental_btn:
+            group_rental_btn.clicked.connect(self.create_group_rental)
 
         # Вкладка "Звіти"
         report_btn = self.view.reports_tab.findChild(QPushButton, "report_btn")
         if report_btn:
             report_btn.clicked.connect(self.generate_report)
+        preview_btn = self.view.reports_tab.findChild(QPushButton, "preview_btn")
+        if preview_btn:
+            preview_btn.clicked.connect(self.preview_report)
+        invoices_btn = self.view.reports_tab.findChild(QPushButton, "invoices_btn")
+        if invoices_btn:
+            invoices_btn.clicked.connect(self.render_invoices)
+        backup_btn = self.view.reports_tab.findChild(QPushButton, "backup_btn")
+        if backup_btn:
+            backup_btn.clicked.connect(lambda: self.start_backup(manual=True))
+        diagnostics_btn = self.view.reports_tab.findChild(QPushButton, "diagnostics_btn")
+        if diagnostics_btn:
+            diagnostics_btn.clicked.connect(self.show_latency_diagnostics)
+        # Живий перегляд: оновлюємо після зміни параметрів з невеликою затримкою,
+        # щоб не запускати запит на кожен крок QDateTimeEdit
+        self.preview_timer = QTimer(self.view)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.timeout.connect(self.live_preview_report)
+        # Обчислювані звіти переглядаються лише кнопкою, у фоновому потоці; результат забирає цей таймер
+        self.preview_future = None
+        self.preview_poll_timer = QTimer(self.view)
+        self.preview_poll_timer.timeout.connect(self.show_computed_preview)
+        report_type_combo = self.view.reports_tab.findChild(QComboBox, "report_type_combo")
+        if report_type_combo:
+            report_type_combo.currentIndexChanged.connect(lambda *args: self.preview_timer.start(400))
+        for name in ("start_date", "end_date"):
+            date_edit = self.view.reports_tab.findChild(QDateTimeEdit, name)
+            if date_edit:
+                date_edit.dateTimeChanged.connect(lambda *args: self.preview_timer.start(400))
 
     def load_initial_data(self):
         """Завантажує дані з моделі та оновлює UI."""
         self.load_bikes_data()
         self.load_clients_data()
         self.load_rentals_data()
-        self.update_client_combo()
-        self.update_bike_combo()
         self.setup_overdue_timer()
+        self.load_dashboard_counters()
         self.update_dashboard_stats()
+        self.update_utilization_heatmap()
+        self.live_preview_report()
+
+    def fill_bike_row(self, table, row, bike):
+        table.setItem(row, 0, QTableWidgetItem(str(bike.id)))
+        table.setItem(row, 1, QTableWidgetItem(bike.model))
+        table.setItem(row, 2, QTableWidgetItem(bike.serial_number))
+        table.setItem(row, 3, QTableWidgetItem(bike.type))
+        table.setItem(row, 4, QTableWidgetItem(bike.status))
+        table.setItem(row, 5, QTableWidgetItem(str(bike.price_per_hour)))
+
+    def fill_client_row(self, table, row, client):
+        table.setItem(row, 0, QTableWidgetItem(str(client.id)))
+        table.setItem(row, 1, QTableWidgetItem(client.name))
+        table.setItem(row, 2, QTableWidgetItem(client.phone))
+        table.setItem(row, 3, QTableWidgetItem(client.email if client.email else ""))
+        table.setItem(row, 4, QTableWidgetItem(client.document))
+        table.setItem(row, 5, QTableWidgetItem(client.created_at))
+
+    def fill_rental_row(self, table, row, rental, client_name=None, bike_model=None):
+        if client_name is None:
+            client = self.model.get_client(rental.client_id)
+            client_name = client.name if client else "Невідомо"
+        if bike_model is None:
+            bike = self.model.get_bike(rental.bike_id)
+            bike_model = bike.model if bike else "Невідомо"
+        table.setItem(row, 0, QTableWidgetItem(str(rental.id)))
+        table.setItem(row, 1, QTableWidgetItem(client_name))
+        table.setItem(row, 2, QTableWidgetItem(bike_model))
+        table.setItem(row, 3, QTableWidgetItem(format_datetime(rental.start_time)))
+        if rental.end_time is None:
+            expected_end = rental.start_time + timedelta(hours=rental.duration)
+        else:
+            expected_end = rental.end_time
+        table.setItem(row, 4, QTableWidgetItem(format_datetime(expected_end)))
+        table.setItem(row, 5, QTableWidgetItem(str(rental.total_cost)))
+
+    def bike_label(self, bike):
+        return f"{bike.model} ({bike.serial_number}, {bike.type}) - {bike.price_per_hour} грн/год"
+
+    def client_label(self, client):
+        return f"{client.name} ({client.phone})"
 
     def load_bikes_data(self):
         """Оновлює таблицю велосипедів у вкладці 'Велосипеди'."""
@@ -166,12 +447,7 @@ class BikeRentalController:
         for bike in bikes:
             row = table.rowCount()
             table.insertRow(row)
-            table.setItem(row, 0, QTableWidgetItem(str(bike.id)))
-            table.setItem(row, 1, QTableWidgetItem(bike.model))
-            table.setItem(row, 2, QTableWidgetItem(bike.serial_number))
-            table.setItem(row, 3, QTableWidgetItem(bike.type))
-            table.setItem(row, 4, QTableWidgetItem(bike.status))
-            table.setItem(row, 5, QTableWidgetItem(str(bike.price_per_hour)))
+            self.fill_bike_row(table, row, bike)
         table.setColumnHidden(0, True)
 
     def load_clients_data(self):
@@ -182,12 +458,7 @@ class BikeRentalController:
         for client in clients:
             row = table.rowCount()
             table.insertRow(row)
-            table.setItem(row, 0, QTableWidgetItem(str(client.id)))
-            table.setItem(row, 1, QTableWidgetItem(client.name))
-            table.setItem(row, 2, QTableWidgetItem(client.phone))
-            table.setItem(row, 3, QTableWidgetItem(client.email if client.email else ""))
-            table.setItem(row, 4, QTableWidgetItem(client.document))
-            table.setItem(row, 5, QTableWidgetItem(client.created_at))
+            self.fill_client_row(table, row, client)
         table.setColumnHidden(0, True)
 
     def load_rentals_data(self):
@@ -206,43 +477,17 @@ class BikeRentalController:
         for rental in rentals:
             row = table.rowCount()
             table.insertRow(row)
-            table.setItem(row, 0, QTableWidgetItem(str(rental.id)))
-            table.setItem(row, 1, QTableWidgetItem(client_map.get(rental.client_id, "Невідомо")))
-            table.setItem(row, 2, QTableWidgetItem(bike_map.get(rental.bike_id, "Невідомо")))
-            table.setItem(row, 3, QTableWidgetItem(rental.start_time))
-            if rental.end_time is None:
-                start_dt = QDateTime.fromString(rental.start_time, "yyyy-MM-dd HH:mm:ss")
-                if not start_dt.isValid():
-                    expected_end_str = "Невідомо"
-                else:
-                    expected_end = start_dt.addSecs(rental.duration * 3600)
-                    expected_end_str = expected_end.toString("yyyy-MM-dd HH:mm:ss")
-            else:
-                expected_end_str = rental.end_time
-            table.setItem(row, 4, QTableWidgetItem(expected_end_str))
-            table.setItem(row, 5, QTableWidgetItem(str(rental.total_cost)))
+            self.fill_rental_row(table, row, rental, client_map.get(rental.client_id, "Невідомо"),
+                                 bike_map.get(rental.bike_id, "Невідомо"))
         table.setColumnHidden(0, True)
 
-    def update_client_combo(self):
-        """Оновлює прихований ComboBox для збереження вибраного ID клієнта."""
-        combo = self.view.rentals_tab.findChild(QComboBox, "client_combo")
-        if combo:
-            combo.clear()
-            combo.addItem("Виберіть клієнта...", None)
-            clients = self.model.get_all_clients()
-            for client in clients:
-                combo.addItem(f"{client.name} ({client.phone})", client.id)
-
-    def update_bike_combo(self):
-        """Оновлює ComboBox для вибору доступного велосипеда у вкладці 'Оренда'."""
-        combo = self.view.rentals_tab.findChild(QComboBox, "bike_combo")
-        if combo:
-            combo.clear()
-            combo.addItem("Виберіть велосипед...", None)
-            bikes = self.model.get_available_bikes()
-            for bike in bikes:
-                combo.addItem(f"{bike.model} ({bike.serial_number}, {bike.type}) - {bike.price_per_hour} грн/год",
-                              bike.id)
+    def fetch_client_options(self, text):
+        """Варіанти для поля вибору клієнта: перші збіги за префіксом ПІБ або телефону."""
+        return [(client.id, self.client_label(client)) for client in self.model.search_clients_prefix(text)]
+
+    def fetch_bike_options(self, text):
+        """Варіанти для поля вибору велосипеда: доступні велосипеди за префіксом моделі або серійного номера."""
+        return [(bike.id, self.bike_label(bike)) for bike in self.model.search_available_bikes_prefix(text)]
 
     # --- Методи роботи з клієнтами ---
     def add_client(self):
@@ -255,8 +500,6 @@ class BikeRentalController:
                 return
             if self.model.add_client(data["name"], data["phone"], data["email"], data["document"]):
                 QMessageBox.information(self.view, "Успіх", "Клієнта додано успішно!")
-                self.load_clients_data()
-                self.update_client_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", "Не вдалося додати клієнта.")
 
@@ -282,8 +525,6 @@ class BikeRentalController:
                 return
             if self.model.update_client(client_id, data["name"], data["phone"], data["email"], data["document"]):
                 QMessageBox.information(self.view, "Успіх", "Інформацію про клієнта оновлено!")
-                self.load_clients_data()
-                self.update_client_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", "Не вдалося оновити інформацію про клієнта.")
 
@@ -301,8 +542,6 @@ class BikeRentalController:
             result, msg = self.model.delete_client(client_id)
             if result:
                 QMessageBox.information(self.view, "Успіх", msg)
-                self.load_clients_data()
-                self.update_client_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", msg)
 
@@ -315,12 +554,15 @@ class BikeRentalController:
         client_id = int(table.item(row, 0).text())
         client_name = table.item(row, 1).text()
         try:
-            rentals = self.model.get_client_rental_history(client_id)
-            if not rentals:
+            aggregates = self.model.get_client_aggregates(client_id)
+            if not aggregates or not aggregates["rentals_count"]:
                 QMessageBox.information(self.view, "Історія оренд", "Для вибраного клієнта історія оренд відсутня.")
                 return
             from view import RentalHistoryDialog
-            dialog = RentalHistoryDialog(client_name, rentals, self.view)
+            dialog = RentalHistoryDialog(
+                client_name, aggregates,
+                lambda after: self.model.get_client_rental_history_page(client_id, 50, after),
+                self.view)
             dialog.exec_()
         except Exception as e:
             QMessageBox.critical(self.view, "Помилка", f"Сталася помилка: {str(e)}")
@@ -343,8 +585,6 @@ class BikeRentalController:
                     return
             if self.model.add_bike(data["model"], data["serial_number"], data["type"], data["price_per_hour"]):
                 QMessageBox.information(self.view, "Успіх", "Велосипед додано успішно!")
-                self.load_bikes_data()
-                self.update_bike_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", "Не вдалося додати велосипед.")
 
@@ -382,8 +622,6 @@ class BikeRentalController:
             if self.model.update_bike(bike_id, model=data["model"], serial_number=data["serial_number"],
                                       bike_type=data["type"], price_per_hour=data["price_per_hour"]):
                 QMessageBox.information(self.view, "Успіх", "Велосипед оновлено!")
-                self.load_bikes_data()
-                self.update_bike_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", "Не вдалося оновити інформацію про велосипед.")
 
@@ -405,8 +643,6 @@ class BikeRentalController:
             result, msg = self.model.delete_bike(bike_id)
             if result:
                 QMessageBox.information(self.view, "Успіх", msg)
-                self.load_bikes_data()
-                self.update_bike_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", msg)
 
@@ -425,41 +661,44 @@ class BikeRentalController:
         if ok and new_status != current_status:
             if self.model.update_bike(bike_id, status=new_status):
                 QMessageBox.information(self.view, "Успіх", f"Статус змінено на {new_status}.")
-                self.load_bikes_data()
-                self.update_bike_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", "Не вдалося змінити статус.")
 
     # --- Методи роботи з орендою ---
     def calculate_rental_price(self):
         rental_tab = self.view.rentals_tab
-        bike_combo = rental_tab.findChild(QComboBox, "bike_combo")
+        bike_picker = rental_tab.findChild(LookupPicker, "bike_picker")
         duration_spin = rental_tab.findChild(QSpinBox, "duration_spin")
         discount_spin = rental_tab.findChild(QDoubleSpinBox, "discount_spin")
         price_field = rental_tab.findChild(QLineEdit, "price_field")
-        bike_id = bike_combo.currentData()
+        start_time = rental_tab.findChild(QDateTimeEdit, "start_time").dateTime().toString("yyyy-MM-dd HH:mm:ss")
+        bike_id = bike_picker.currentData()
         duration = duration_spin.value()
         discount = discount_spin.value()
+        quote = None
         if bike_id is not None:
-            price = self.model.calculate_rental_price(bike_id, duration, discount)
-            if price is not None:
-                price_field.setText(f"{price:.2f} грн")
-            else:
-                price_field.setText("0.00 грн")
-        else:
+            quote = self.model.quote_rental(bike_id, duration, discount, start_time)
+        if quote is None:
             price_field.setText("0.00 грн")
+            return
+        price, multiplier = quote
+        # Коефіцієнт показується, лише коли тариф відрізняється від базового
+        if multiplier != 1:
+            price_field.setText(f"{price:.2f} грн (тариф ×{multiplier:g})")
+        else:
+            price_field.setText(f"{price:.2f} грн")
 
     def create_rental(self):
         rental_tab = self.view.rentals_tab
-        client_combo = rental_tab.findChild(QComboBox, "client_combo")
-        bike_combo = rental_tab.findChild(QComboBox, "bike_combo")
+        client_picker = rental_tab.findChild(LookupPicker, "client_picker")
+        bike_picker = rental_tab.findChild(LookupPicker, "bike_picker")
         start_time = rental_tab.findChild(QDateTimeEdit, "start_time")
         duration_spin = rental_tab.findChild(QSpinBox, "duration_spin")
         discount_spin = rental_tab.findChild(QDoubleSpinBox, "discount_spin")
         price_field = rental_tab.findChild(QLineEdit, "price_field")
 
-        client_id = client_combo.currentData()
-        bike_id = bike_combo.currentData()
+        client_id = client_picker.currentData()
+        bike_id = bike_picker.currentData()
 
         if client_id is None:
             QMessageBox.warning(self.view, "Увага", "Виберіть клієнта.")
@@ -475,12 +714,9 @@ class BikeRentalController:
         duration = duration_spin.value()
         discount = discount_spin.value()
 
-        total_cost = self.model.calculate_rental_price(bike_id, duration, discount)
-
         # Спочатку вибір способу оплати
-        payment_methods = ["Карткою", "Готівкою"]
         payment_method, ok = QInputDialog.getItem(self.view, "Оплата",
-                                                  "Оберіть спосіб оплати:", payment_methods, 0, False)
+                                                  "Оберіть спосіб оплати:", list(PAYMENT_METHODS), 0, False)
         if not ok or not payment_method.strip():
             QMessageBox.warning(self.view, "Увага", "Оплату скасовано. Оренда не проведена.")
             return
@@ -490,6 +726,8 @@ class BikeRentalController:
         if not rental_id:
             QMessageBox.warning(self.view, "Помилка", msg)
             return
+        # Оплачується сума, зафіксована в оренді: тариф міг змінитися після натискання «Розрахувати»
+        total_cost = self.model.get_rental(rental_id).total_cost
 
         # Створення рахунку
         invoice_id, invoice_msg = self.model.generate_invoice(rental_id)
@@ -505,14 +743,79 @@ class BikeRentalController:
 
         self.model.update_bike(bike_id, status="В оренді")
         QMessageBox.information(self.view, "Успіх", "Оплата проведена. " + msg)
-        self.load_rentals_data()
-        self.load_bikes_data()
-        self.update_bike_combo()
-        client_search = rental_tab.findChild(QLineEdit, "client_search")
-        if client_search:
-            client_search.clear()
+        client_picker.clear_selection()
+        bike_picker.clear_selection()
+
+    def create_reservation(self):
+        """Бронює вибраний велосипед для клієнта на інтервал 'Час початку' + 'Тривалість'."""
+        rental_tab = self.view.rentals_tab
+        client_id = rental_tab.findChild(LookupPicker, "client_picker").currentData()
+        bike_id = rental_tab.findChild(LookupPicker, "bike_picker").currentData()
+        start_dt = rental_tab.findChild(QDateTimeEdit, "start_time").dateTime()
+        duration = rental_tab.findChild(QSpinBox, "duration_spin").value()
+        if client_id is None:
+            QMessageBox.warning(self.view, "Увага", "Виберіть клієнта.")
+            return
+        if bike_id is None:
+            QMessageBox.warning(self.view, "Увага", "Виберіть велосипед.")
+            return
+        start_time_str = start_dt.toString("yyyy-MM-dd HH:mm:ss")
+        end_time_str = start_dt.addSecs(duration * 3600).toString("yyyy-MM-dd HH:mm:ss")
+        reservation_id, msg = self.model.create_reservation(client_id, bike_id, start_time_str, end_time_str)
+        if reservation_id:
+            QMessageBox.information(self.view, "Успіх", msg)
+        else:
+            QMessageBox.warning(self.view, "Помилка", msg)
+
+    def selected_rental_ids(self):
+        """ID усіх вибраних рядків таблиці активних оренд."""
+        table = self.view.rentals_tab.findChild(QTableWidget, "active_table")
+        rows = sorted({index.row() for index in table.selectionModel().selectedRows()})
+        return [int(table.item(row, 0).text()) for row in rows if table.item(row, 0) is not None]
+
+    def create_group_rental(self):
+        """Оформлює оренду кількох велосипедів для вибраного клієнта одним записом зі спільним рахунком."""
+        rental_tab = self.view.rentals_tab
+        client_id = rental_tab.findChild(LookupPicker, "client_picker").currentData()
+        if client_id is None:
+            QMessageBox.warning(self.view, "Увага", "Виберіть клієнта.")
+            return
+        bikes = [(bike.id, self.bike_label(bike)) for bike in self.model.get_available_bikes()]
+        dialog = GroupRentalDialog(bikes, self.view)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        bike_ids = dialog.selected_bike_ids()
+        if not bike_ids:
+            QMessageBox.warning(self.view, "Увага", "Виберіть хоча б один велосипед.")
+            return
+        start_time_str = rental_tab.findChild(QDateTimeEdit, "start_time").dateTime().toString("yyyy-MM-dd HH:mm:ss")
+        duration = rental_tab.findChild(QSpinBox, "duration_spin").value()
+        discount = rental_tab.findChild(QDoubleSpinBox, "discount_spin").value()
+        payment_method, ok = QInputDialog.getItem(self.view, "Оплата",
+                                                  "Оберіть спосіб оплати:", list(PAYMENT_METHODS), 0, False)
+        if not ok or not payment_method.strip():
+            QMessageBox.warning(self.view, "Увага", "Оплату скасовано. Оренда не проведена.")
+            return
+        group_id, msg = self.model.create_group_rental(client_id, bike_ids, start_time_str, duration, discount,
+                                                       payment_method.strip())
+        if group_id:
+            QMessageBox.information(self.view, "Успіх", "Оплата проведена. " + msg)
+        else:
+            QMessageBox.warning(self.view, "Помилка", msg)
 
     def complete_rental(self):
+        rental_ids = self.selected_rental_ids()
+        if len(rental_ids) > 1:
+            reply = QMessageBox.question(self.view, "Підтвердження",
+                                         f"Завершити вибрані оренди ({len(rental_ids)})?",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply == QMessageBox.Yes:
+                result, msg = self.model.complete_rentals(rental_ids)
+                if result:
+                    QMessageBox.information(self.view, "Успіх", msg)
+                else:
+                    QMessageBox.warning(self.view, "Помилка", msg)
+            return
         table = self.view.rentals_tab.findChild(QTableWidget, "active_table")
         row = table.currentRow()
         if row < 0:
@@ -532,14 +835,10 @@ class BikeRentalController:
         if rental is None:
             QMessageBox.warning(self.view, "Увага", "Оренду не знайдено.")
             return
-        start_dt = QDateTime.fromString(rental.start_time, "yyyy-MM-dd HH:mm:ss")
-        if not start_dt.isValid():
-            QMessageBox.warning(self.view, "Помилка", "Невірний формат часу початку оренди.")
-            return
-        expected_end = start_dt.addSecs(rental.duration * 3600)
-        now = QDateTime.currentDateTime()
+        expected_end = rental.start_time + timedelta(hours=rental.duration)
+        now = datetime.now()
         if now > expected_end:
-            overdue_seconds = now.toSecsSinceEpoch() - expected_end.toSecsSinceEpoch()
+            overdue_seconds = (now - expected_end).total_seconds()
             penalty_hours = ceil(overdue_seconds / 3600)
             price_per_hour = self.model.calculate_rental_price(rental.bike_id, 1, 0)
             penalty_fee = penalty_hours * price_per_hour * 1.5  # коефіцієнт штрафу 1.5
@@ -555,14 +854,22 @@ class BikeRentalController:
                 if rental:
                     self.model.update_bike(rental.bike_id, status="Доступний")
                 QMessageBox.information(self.view, "Успіх", msg)
-                self.load_rentals_data()
-                self.load_bikes_data()
-                self.update_bike_combo()
-                self.update_dashboard_stats()
             else:
                 QMessageBox.warning(self.view, "Помилка", msg)
 
     def extend_rental(self):
+        rental_ids = self.selected_rental_ids()
+        if len(rental_ids) > 1:
+            additional_duration, ok = QInputDialog.getInt(self.view, "Продовження оренд",
+                                                          f"Додаткова тривалість для {len(rental_ids)} оренд (год):",
+                                                          1, 1, 72, 1)
+            if ok:
+                result, msg = self.model.extend_rentals(rental_ids, additional_duration)
+                if result:
+                    QMessageBox.information(self.view, "Успіх", msg)
+                else:
+                    QMessageBox.warning(self.view, "Помилка", msg)
+            return
         table = self.view.rentals_tab.findChild(QTableWidget, "active_table")
         row = table.currentRow()
         if row < 0:
@@ -579,9 +886,6 @@ class BikeRentalController:
             result, msg = self.model.extend_rental(rental_id, additional_duration)
             if result:
                 QMessageBox.information(self.view, "Успіх", msg)
-                self.load_rentals_data()
-                self.load_bikes_data()
-                self.update_bike_combo()
             else:
                 QMessageBox.warning(self.view, "Помилка", msg)
 
@@ -635,35 +939,6 @@ class BikeRentalController:
             table.setItem(row, 5, QTableWidgetItem(client.created_at))
         table.setColumnHidden(0, True)
 
-    def search_clients_for_rental(self):
-        client_search = self.view.rentals_tab.findChild(QLineEdit, "client_search")
-        client_results = self.view.rentals_tab.findChild(QTableWidget, "client_results")
-        search_text = client_search.text().strip()
-        if len(search_text) < 2:
-            client_results.setVisible(False)
-            return
-        clients = self.model.search_clients(search_text)
-        client_results.setRowCount(0)
-        for client in clients:
-            row = client_results.rowCount()
-            client_results.insertRow(row)
-            client_results.setItem(row, 0, QTableWidgetItem(str(client.id)))
-            client_results.setItem(row, 1, QTableWidgetItem(client.name))
-            client_results.setItem(row, 2, QTableWidgetItem(client.phone))
-        client_results.setVisible(client_results.rowCount() > 0)
-
-    def select_client_from_search(self, row, column):
-        client_results = self.view.rentals_tab.findChild(QTableWidget, "client_results")
-        client_search = self.view.rentals_tab.findChild(QLineEdit, "client_search")
-        client_combo = self.view.rentals_tab.findChild(QComboBox, "client_combo")
-        client_id = int(client_results.item(row, 0).text())
-        client_name = client_results.item(row, 1).text()
-        client_search.setText(client_name)
-        client_combo.clear()
-        client_combo.addItem(client_name, client_id)
-        client_combo.setCurrentIndex(0)
-        client_results.setVisible(False)
-
     def setup_overdue_timer(self):
         """Налаштовує таймер для перевірки прострочених оренд кожні 60 секунд."""
         self.overdue_timer = QTimer(self.view)
@@ -671,66 +946,41 @@ class BikeRentalController:
         self.overdue_timer.start(5000)
         self.overdue_notification_times = {}
         self.finished_notifications = {}  # Для повідомлень про завершення оренди
-        self.notified_intervals = {}  # Для відстеження кількості повідомлених 30-хвилинних інтервалів
 
     def check_overdue_rentals(self):
         """
         Перевіряє активні оренди.
         Якщо оренда закінчилася (в межах 5 хвилин після expected_end) – надсилається повідомлення,
         що час оренди завершився (однократно).
-        Якщо оренда прострочена (понад 5 хвилин після expected_end), штраф нараховується за кожні
-        повні 30 хвилин прострочки, і якщо кількість таких інтервалів зросла, надсилається повідомлення.
+        Штраф за кожні повні 30 хвилин прострочки нараховує модель одним запитом; повідомлення
+        надсилається для кожної оренди, якій нараховано нові інтервали.
         """
-        now = QDateTime.currentDateTime()
-        clients = self.model.get_all_clients()
-        client_map = {client.id: client.name for client in clients}
-        bikes = self.model.get_all_bikes()
-        bike_map = {bike.id: bike.model for bike in bikes}
-        active_rentals = self.model.get_active_rentals()
-
-        for rental in active_rentals:
-            start_dt = QDateTime.fromString(rental.start_time, "yyyy-MM-dd HH:mm:ss")
-            if not start_dt.isValid():
-                continue
-            expected_end = start_dt.addSecs(rental.duration * 3600)
-
-            # Якщо оренда щойно завершилася (менше 5 хвилин прострочки)
-            if expected_end <= now and now.toSecsSinceEpoch() - expected_end.toSecsSinceEpoch() < 300:
-                if not self.finished_notifications.get(rental.id, False):
-                    msg = (
-                        f"{client_map.get(rental.client_id, 'Невідомо')} - {bike_map.get(rental.bike_id, 'Невідомо')}: "
-                        "час оренди завершився. Будь ласка, завершіть оренду.")
-                    self.tray_icon.showMessage("Час оренди завершено", msg, QSystemTrayIcon.Information, 5000)
-                    self.finished_notifications[rental.id] = True
-                continue
-
-            # Якщо оренда прострочена більше 5 хвилин
-            if now > expected_end:
-                overdue_seconds = now.toSecsSinceEpoch() - expected_end.toSecsSinceEpoch()
-                penalty_intervals = int(overdue_seconds // 1800)
-                if penalty_intervals == 0:
-                    continue
-                # далі – розрахунок штрафу
-                price_per_hour = self.model.calculate_rental_price(rental.bike_id, 1, 0)
-                interval_penalty = price_per_hour * 1.2
-                full_penalty = penalty_intervals * interval_penalty
-                prev_intervals = self.notified_intervals.get(rental.id, 0)
-                additional_intervals = penalty_intervals - prev_intervals
-                if additional_intervals > 0:
-
-                    additional_penalty = additional_intervals * interval_penalty
-                    new_total = rental.total_cost + additional_penalty
-                    if hasattr(self.model, "update_rental_total_cost"):
-                        self.model.update_rental_total_cost(rental.id, new_total)
-                    rental.total_cost = new_total
-                    self.notified_intervals[rental.id] = penalty_intervals
-                    msg = (
-                        f"{client_map.get(rental.client_id, 'Невідомо')} - {bike_map.get(rental.bike_id, 'Невідомо')}: "
-                        f"прострочено на {penalty_intervals * 0.5:.1f} год, штраф: {full_penalty:.2f} грн.")
-                    self.tray_icon.showMessage("Просрочені оренди", msg, QSystemTrayIcon.Information, 5000)
-                    self.overdue_notification_times[rental.id] = now.toSecsSinceEpoch()
-                    self.load_rentals_data()
+        now = datetime.now()
+        names = {}
+
+        def describe(client_id, bike_id):
+            if ("client", client_id) not in names:
+                client = self.model.get_client(client_id)
+                names[("client", client_id)] = client.name if client else "Невідомо"
+            if ("bike", bike_id) not in names:
+                bike = self.model.get_bike(bike_id)
+                names[("bike", bike_id)] = bike.model if bike else "Невідомо"
+            return f"{names[('client', client_id)]} - {names[('bike', bike_id)]}"
+
+        # Оренди, що щойно завершилися (менше 5 хвилин прострочки)
+        for rental in self.model.get_due_rentals(now, since=now - timedelta(minutes=5)):
+            if not self.finished_notifications.get(rental.id, False):
+                msg = f"{describe(rental.client_id, rental.bike_id)}: час оренди завершився. Будь ласка, завершіть оренду."
+                self.tray_icon.showMessage("Час оренди завершено", msg, QSystemTrayIcon.Information, 5000)
+                self.finished_notifications[rental.id] = True
 
+        self.model.prune_reservation_index(now)
+        for row in self.model.accrue_overdue_penalties(now):
+            msg = (
+                f"{describe(row['client_id'], row['bike_id'])}: "
+                f"прострочено на {row['penalty_intervals_charged'] * 0.5:.1f} год, штраф: {row['penalty']:.2f} грн.")
+            self.tray_icon.showMessage("Просрочені оренди", msg, QSystemTrayIcon.Information, 5000)
+            self.overdue_notification_times[row["id"]] = int(now.timestamp())
 
     def generate_report(self):
         report_tab = self.view.reports_tab
@@ -741,6 +991,94 @@ class BikeRentalController:
         report = self.model.generate_report(report_type, start_date, end_date, report_format)
         QMessageBox.information(self.view, "Звіт", report)
 
+    def render_invoices(self):
+        """Друкує рахунки за вибраний у вкладці "Звіти" період: окремі PDF або один об'єднаний файл."""
+        report_tab = self.view.reports_tab
+        start_date = report_tab.findChild(QDateTimeEdit, "start_date").dateTime().toString("yyyy-MM-dd")
+        end_date = report_tab.findChild(QDateTimeEdit, "end_date").dateTime().toString("yyyy-MM-dd")
+        modes = ["Окремий файл на кожен рахунок", "Один об'єднаний PDF"]
+        mode, ok = QInputDialog.getItem(self.view, "Друк рахунків", "Формат:", modes, 0, False)
+        if not ok:
+            return
+        message = self.model.render_invoices(start_date, end_date, merged=(mode == modes[1]))
+        QMessageBox.information(self.view, "Рахунки", message)
+
+    def report_parameters(self):
+        report_tab = self.view.reports_tab
+        report_type = report_tab.findChild(QComboBox, "report_type_combo").currentText()
+        start_date = report_tab.findChild(QDateTimeEdit, "start_date").dateTime().toString("yyyy-MM-dd")
+        end_date = report_tab.findChild(QDateTimeEdit, "end_date").dateTime().toString("yyyy-MM-dd")
+        return report_type, start_date, end_date
+
+    def live_preview_report(self):
+        """
+        Перегляд після зміни параметрів (таймер). Звіти SQL показуються одразу (LIMIT), а обчислювані
+        звіти обробляють усю історію періоду – для них лише підказка натиснути кнопку перегляду.
+        """
+        report_type, _, _ = self.report_parameters()
+        if not self.model.is_computed_report(report_type):
+            self.preview_report()
+            return
+        self.preview_future = None
+        self.preview_poll_timer.stop()
+        self.view.reports_tab.findChild(QTableView, "preview_table").model().set_report([], [])
+        self.view.reports_tab.findChild(QLabel, "preview_label").setText(
+            "Звіт обчислюється за всю історію періоду – натисніть «Переглянути», щоб побачити рядки.")
+
+    def preview_report(self):
+        """Показує перші рядки звіту та оцінку загальної кількості рядків без формування файлу."""
+        report_type, start_date, end_date = self.report_parameters()
+        preview_label = self.view.reports_tab.findChild(QLabel, "preview_label")
+        if self.model.is_computed_report(report_type):
+            try:
+                if report_type == FORECAST_REPORT:
+                    # Дорахунок ряду попиту – запис, тому в потоці основного з'єднання; зазвичай лише кілька годин
+                    self.model.update_demand_history()
+                self.preview_future = self.model.start_computed_preview(report_type, start_date, end_date, 100)
+            except Exception as e:
+                preview_label.setText(f"Помилка попереднього перегляду: {str(e)}")
+                return
+            preview_label.setText("Обчислення звіту...")
+            self.preview_poll_timer.start(100)
+            return
+        self.preview_future = None
+        self.preview_poll_timer.stop()
+        try:
+            columns, rows, total = self.model.preview_report(report_type, start_date, end_date, 100)
+        except Exception as e:
+            preview_label.setText(f"Помилка попереднього перегляду: {str(e)}")
+            return
+        self.show_report_preview(columns, rows, total)
+
+    def show_computed_preview(self):
+        """Забирає результат фонового обчислення звіту, коли він готовий."""
+        future = self.preview_future
+        if future is None:
+            self.preview_poll_timer.stop()
+            return
+        if not future.done():
+            return
+        self.preview_poll_timer.stop()
+        self.preview_future = None
+        try:
+            columns, rows, total = future.result()
+        except Exception as e:
+            self.view.reports_tab.findChild(QLabel, "preview_label").setText(
+                f"Помилка попереднього перегляду: {str(e)}")
+            return
+        self.show_report_preview(columns, rows, total)
+
+    def show_report_preview(self, columns, rows, total):
+        preview_table = self.view.reports_tab.findChild(QTableView, "preview_table")
+        preview_label = self.view.reports_tab.findChild(QLabel, "preview_label")
+        preview_table.model().set_report(columns, rows)
+        if not rows:
+            preview_label.setText("За вибраний період дані відсутні.")
+        elif total > len(rows):
+            preview_label.setText(f"Показано перші {len(rows)} з {total} рядків звіту")
+        else:
+            preview_label.setText(f"Рядків у звіті: {total}")
+
     # --- Методи пошуку ---
     def search_bikes(self):
         bike_tab = self.view.bikes_tab
@@ -781,32 +1119,3 @@ class BikeRentalController:
             table.setItem(row, 4, QTableWidgetItem(client.document))
             table.setItem(row, 5, QTableWidgetItem(client.created_at))
         table.setColumnHidden(0, True)
-
-    def search_clients_for_rental(self):
-        client_search = self.view.rentals_tab.findChild(QLineEdit, "client_search")
-        client_results = self.view.rentals_tab.findChild(QTableWidget, "client_results")
-        search_text = client_search.text().strip()
-        if len(search_text) < 2:
-            client_results.setVisible(False)
-            return
-        clients = self.model.search_clients(search_text)
-        client_results.setRowCount(0)
-        for client in clients:
-            row = client_results.rowCount()
-            client_results.insertRow(row)
-            client_results.setItem(row, 0, QTableWidgetItem(str(client.id)))
-            client_results.setItem(row, 1, QTableWidgetItem(client.name))
-            client_results.setItem(row, 2, QTableWidgetItem(client.phone))
-        client_results.setVisible(client_results.rowCount() > 0)
-
-    def select_client_from_search(self, row, column):
-        client_results = self.view.rentals_tab.findChild(QTableWidget, "client_results")
-        client_search = self.view.rentals_tab.findChild(QLineEdit, "client_search")
-        client_combo = self.view.rentals_tab.findChild(QComboBox, "client_combo")
-        client_id = int(client_results.item(row, 0).text())
-        client_name = client_results.item(row, 1).text()
-        client_search.setText(client_name)
-        client_combo.clear()
-        client_combo.addItem(client_name, client_id)
-        client_combo.setCurrentIndex(0)
-        client_results.setVisible(False)
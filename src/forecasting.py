@@ -0,0 +1,299 @@
+from datetime import datetime, timedelta
+from math import ceil
+import numpy as np
+from utilization import (HOURS_PER_WEEK, WEEKDAYS, hour_of_week, epoch_to_wall, merge_overlaps,
+                         hourly_occupancy, hourly_peaks, load_rental_intervals)
+
+# ===== Прогноз попиту для планування парку =====
+# Для кожного типу велосипедів і години зберігаються велосипедо-години (середня кількість одночасних
+# оренд за годину), найбільша кількість одночасних оренд протягом години (peak) і кількість оренд,
+# що почалися. Погодинний ряд зберігається в таблиці demand_hourly і дораховується лише для нових годин;
+# сезонні моделі (день тижня × година) будуються над рядом піків у NumPy без циклів по годинах –
+# розмір парку визначає саме пік, а не середнє.
+
+SEASONAL_MEAN = "Сезонне середнє"
+SEASONAL_SMOOTHING = "Експоненційне згладжування"
+
+
+def wall_hour_start(hour):
+    """Початок години настінного часу (номер від початку відліку) як datetime."""
+    return datetime(1970, 1, 1) + timedelta(hours=int(hour))
+
+
+class DemandHistory:
+    """
+    Погодинний ряд попиту по типах велосипедів у таблиці demand_hourly (години настінного часу).
+    Години до demand_state.settled_hour остаточні: усі оренди, що почалися раніше, на момент
+    розрахунку вже були завершені, а межа відсунута ще на lookback_hours назад для оренд,
+    внесених пізніше тієї ж доби. Наступний update() перераховує лише години від цієї межі,
+    читаючи оренди по індексу end_time. Давніші зміни заднім числом потребують rebuild().
+    """
+
+    def __init__(self, db, lookback_hours=24):
+        self.db = db
+        self.lookback_hours = lookback_hours
+
+    def create_table(self):
+        def command(cursor):
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS demand_hourly (
+                    bike_type TEXT NOT NULL,
+                    hour INTEGER NOT NULL,
+                    bike_hours REAL NOT NULL,
+                    rentals INTEGER NOT NULL,
+                    peak INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (bike_type, hour)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute("PRAGMA table_info(demand_hourly)")
+            if "peak" not in {row[1] for row in cursor.fetchall()}:
+                # Ряд, збережений без піків, будується заново наступним update()
+                cursor.execute("ALTER TABLE demand_hourly ADD COLUMN peak INTEGER NOT NULL DEFAULT 0")
+                cursor.execute("DELETE FROM demand_hourly")
+                cursor.execute("DROP TABLE IF EXISTS demand_state")
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS demand_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    settled_hour INTEGER NOT NULL
+                )
+            ''')
+        self.db.write(command)
+
+    def settled_hour(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT settled_hour FROM demand_state WHERE id = 1")
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def rebuild(self, now_epoch):
+        """Стирає збережений ряд і будує його заново з усіх оренд."""
+        self.create_table()
+
+        def command(cursor):
+            cursor.execute("DELETE FROM demand_hourly")
+            cursor.execute("DELETE FROM demand_state")
+        self.db.write(command)
+        return self.update(now_epoch)
+
+    def update(self, now_epoch):
+        """Дораховує ряд до поточної години; повертає кількість перерахованих годин."""
+        self.create_table()
+        cursor = self.db.read_cursor()
+        cursor.row_factory = None
+        settled = self.settled_hour()
+        if settled is None:
+            cursor.execute("SELECT MIN(start_time) FROM rentals")
+            first = cursor.fetchone()[0]
+            if first is None:
+                return 0
+            settled = int(epoch_to_wall([first])[0]) // 3600
+        cursor.execute("SELECT MIN(start_time) FROM rentals WHERE end_time IS NULL AND status = 'Активна'")
+        active_start = cursor.fetchone()[0]
+        settled_epoch = now_epoch if active_start is None else min(now_epoch, active_start)
+        first_hour = settled
+        next_settled = max(first_hour, int(epoch_to_wall([settled_epoch])[0]) // 3600 - self.lookback_hours)
+        end_hour = int(epoch_to_wall([now_epoch])[0]) // 3600 + 1
+        hours = end_hour - first_hour
+        if hours <= 0:
+            return 0
+
+        cursor.execute("SELECT id, type FROM bikes ORDER BY id")
+        bikes = cursor.fetchall()
+        bike_ids = np.array([row[0] for row in bikes], dtype=np.int64)
+        types = sorted({row[1] or "" for row in bikes})
+        bike_types = np.array([types.index(row[1] or "") for row in bikes], dtype=np.int64)
+        # Запас у дві доби покриває різницю між секундами Unix і настінним часом
+        intervals = load_rental_intervals(cursor, first_hour * 3600 - 2 * 86400,
+                                          end_hour * 3600 + 2 * 86400, now_epoch)
+        positions = np.searchsorted(bike_ids, intervals[:, 0])
+        known = positions < len(bike_ids)
+        known[known] = bike_ids[positions[known]] == intervals[known, 0]
+        positions = positions[known]
+        starts = epoch_to_wall(intervals[known, 1])
+        ends = epoch_to_wall(intervals[known, 2])
+
+        # Кількість оренд, що почалися в кожну годину, – до об'єднання перекриттів
+        start_hours = starts // 3600 - first_hour
+        inside = (start_hours >= 0) & (start_hours < hours)
+        rentals = np.bincount(bike_types[positions[inside]] * hours + start_hours[inside],
+                              minlength=len(types) * hours).reshape(len(types), hours)
+        starts, ends, groups = merge_overlaps(starts, ends, positions)
+        bike_hours = hourly_occupancy(starts, ends, bike_types[groups], len(types), first_hour, hours) / 3600
+        peaks = hourly_peaks(starts, ends, bike_types[groups], len(types), first_hour, hours)
+
+        type_index, hour_index = np.nonzero((bike_hours > 0) | (rentals > 0) | (peaks > 0))
+        records = list(zip([types[index] for index in type_index.tolist()],
+                           (hour_index + first_hour).tolist(),
+                           bike_hours[type_index, hour_index].tolist(),
+                           rentals[type_index, hour_index].tolist(),
+                           peaks[type_index, hour_index].tolist()))
+
+        def command(write_cursor):
+            write_cursor.execute("DELETE FROM demand_hourly WHERE hour >= ?", (first_hour,))
+            write_cursor.executemany("INSERT INTO demand_hourly (bike_type, hour, bike_hours, rentals, peak) "
+                                     "VALUES (?, ?, ?, ?, ?)", records)
+            write_cursor.execute("INSERT OR REPLACE INTO demand_state (id, settled_hour) VALUES (1, ?)",
+                                 (next_settled,))
+        self.db.write(command)
+        return hours
+
+    def load(self, first_hour, end_hour):
+        """
+        Ряд за години [first_hour, end_hour): (типи, масив велосипедо-годин (типи, години),
+        масив кількості оренд (типи, години), масив піків одночасних оренд (типи, години)).
+        Типи – з таблиці bikes та збереженого ряду.
+        """
+        cursor = self.db.read_cursor()
+        cursor.row_factory = None
+        cursor.execute('''
+            SELECT bike_type, hour, bike_hours, rentals, peak
+            FROM demand_hourly
+            WHERE hour >= ? AND hour < ?
+        ''', (first_hour, end_hour))
+        rows = cursor.fetchall()
+        cursor.execute("SELECT DISTINCT type FROM bikes")
+        types = sorted({row[0] or "" for row in cursor.fetchall()} | {row[0] for row in rows})
+        hours = max(end_hour - first_hour, 0)
+        bike_hours = np.zeros((len(types), hours))
+        rentals = np.zeros((len(types), hours), dtype=np.int64)
+        peaks = np.zeros((len(types), hours), dtype=np.int64)
+        if rows:
+            index = {bike_type: position for position, bike_type in enumerate(types)}
+            type_index = np.array([index[row[0]] for row in rows], dtype=np.int64)
+            values = np.array([row[1:] for row in rows], dtype=np.float64)
+            hour_index = values[:, 0].astype(np.int64) - first_hour
+            bike_hours[type_index, hour_index] = values[:, 1]
+            rentals[type_index, hour_index] = values[:, 2]
+            peaks[type_index, hour_index] = values[:, 3]
+        return types, bike_hours, rentals, peaks
+
+
+def daily_series(hourly, first_hour):
+    """
+    Денні ряди з погодинного (типи, години): пік за добу та сума за добу для повних діб.
+    Повертає (перша година першої доби, піки, суми).
+    """
+    skip = (-first_hour) % 24
+    days = max((hourly.shape[1] - skip) // 24, 0)
+    block = hourly[:, skip:skip + days * 24].reshape(hourly.shape[0], days, 24)
+    return first_hour + skip, block.max(axis=2, initial=0), block.sum(axis=2)
+
+
+def daily_rows(types, bike_hours, rentals, peaks, first_hour):
+    """
+    Рядки денного ряду попиту: для кожного типу й повної доби – пік одночасних оренд,
+    велосипедо-години та кількість оренд, що почалися за добу.
+    """
+    day_start, peaks, _ = daily_series(peaks, first_hour)
+    _, _, totals = daily_series(bike_hours, first_hour)
+    _, _, started = daily_series(rentals, first_hour)
+    rows = []
+    for index, bike_type in enumerate(types):
+        for day in range(peaks.shape[1]):
+            rows.append([bike_type or "Без типу", wall_hour_start(day_start + day * 24).strftime("%Y-%m-%d"),
+                         int(peaks[index, day]), round(float(totals[index, day]), 1),
+                         int(started[index, day])])
+    return rows
+
+
+def weekly_matrix(hourly, first_hour):
+    """Повні тижні (з понеділка 00:00) погодинного ряду як масив (типи, тижні, 168) та їхній початок."""
+    skip = int((-hour_of_week(first_hour)) % HOURS_PER_WEEK)
+    weeks = max((hourly.shape[1] - skip) // HOURS_PER_WEEK, 0)
+    block = hourly[:, skip:skip + weeks * HOURS_PER_WEEK]
+    return block.reshape(hourly.shape[0], weeks, HOURS_PER_WEEK), first_hour + skip
+
+
+def seasonal_mean(weeks, recent_weeks=8):
+    """Базовий профіль: середнє кожної години тижня за останні recent_weeks тижнів."""
+    return weeks[:, -recent_weeks:].mean(axis=1)
+
+
+def seasonal_smoothing(weeks, alpha=0.3):
+    """
+    Експоненційне згладжування кожної години тижня вздовж тижнів: згорнута форма рекурсії
+    s = α·x + (1 − α)·s з вагами α(1 − α)^k, нормованими на скінченну історію.
+    """
+    count = weeks.shape[1]
+    weights = alpha * (1 - alpha) ** np.arange(count - 1, -1, -1)
+    return np.tensordot(weeks, weights / weights.sum(), axes=([1], [0]))
+
+
+def weekly_trend(weeks, alpha=0.5, beta=0.2):
+    """Рівень і тренд тижневого середнього (лінійне згладжування Холта); цикл лише по тижнях."""
+    means = weeks.mean(axis=2)
+    level = means[:, 0].copy()
+    trend = np.zeros_like(level)
+    for week in range(1, means.shape[1]):
+        previous = level
+        level = alpha * means[:, week] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+    return level, trend
+
+
+def project(profiles, level, trend, horizon):
+    """Профілі (типи, 168), масштабовані прогнозом рівня на кожен з horizon тижнів: (типи, horizon, 168)."""
+    future = np.maximum(level[:, None] + trend[:, None] * np.arange(1, horizon + 1), 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.where(level[:, None] > 0, future / level[:, None], 1.0)
+    return np.maximum(profiles[:, None, :] * scale[:, :, None], 0)
+
+
+def fit_profiles(weeks, alpha, recent_weeks):
+    return np.stack([seasonal_mean(weeks, recent_weeks), seasonal_smoothing(weeks, alpha)])
+
+
+def forecast_demand(hourly, first_hour, horizon=4, alpha=0.3, recent_weeks=8):
+    """
+    Прогноз погодинного ряду (піків одночасних оренд) на horizon тижнів після останнього повного тижня.
+    Для кожного типу обидві моделі перевіряються на останньому тижні (навчання на попередніх),
+    і вибирається модель з меншою середньою абсолютною похибкою; 90-й перцентиль її похибки
+    стає запасом для рекомендованого розміру парку.
+    Повертає None, якщо в ряді немає жодного повного тижня, інакше словник:
+      "start_hour" – перша година прогнозу, "hourly" – масив (типи, horizon, 168),
+      "models" – назва вибраної моделі для кожного типу, "margin" – запас (типи,),
+      "last_week" – фактичний останній тиждень (типи, 168).
+    """
+    weeks, week_start = weekly_matrix(hourly, first_hour)
+    count = weeks.shape[1]
+    if count == 0:
+        return None
+    types = weeks.shape[0]
+    if count >= 2:
+        actual = weeks[:, -1]
+        errors = np.abs(fit_profiles(weeks[:, :-1], alpha, recent_weeks) - actual)  # (моделі, типи, 168)
+        best = errors.mean(axis=2).argmin(axis=0)
+        margin = np.quantile(errors[best, np.arange(types)], 0.9, axis=1)
+    else:
+        best = np.zeros(types, dtype=np.int64)
+        margin = np.zeros(types)
+    profiles = fit_profiles(weeks, alpha, recent_weeks)[best, np.arange(types)]
+    level, trend = weekly_trend(weeks)
+    names = (SEASONAL_MEAN, SEASONAL_SMOOTHING)
+    return {"start_hour": week_start + count * HOURS_PER_WEEK,
+            "hourly": project(profiles, level, trend, horizon),
+            "models": [names[index] for index in best.tolist()],
+            "margin": margin,
+            "last_week": weeks[:, -1]}
+
+
+def peak_rows(types, forecast, fleet_sizes):
+    """
+    Рядки звіту: для кожного типу й тижня прогнозу – пік одночасних оренд, його день і година,
+    фактичний пік останнього тижня, поточний і рекомендований розмір парку.
+    """
+    hourly = forecast["hourly"]
+    peaks = hourly.max(axis=2)
+    peak_slots = hourly.argmax(axis=2)
+    actual_peaks = forecast["last_week"].max(axis=1)
+    rows = []
+    for index, bike_type in enumerate(types):
+        for week in range(hourly.shape[1]):
+            start = wall_hour_start(forecast["start_hour"] + week * HOURS_PER_WEEK)
+            day, hour = divmod(int(peak_slots[index, week]), 24)
+            rows.append([bike_type or "Без типу", start.strftime("%Y-%m-%d"),
+                         round(float(peaks[index, week]), 1), f"{WEEKDAYS[day]} {hour:02d}:00",
+                         round(float(actual_peaks[index]), 1), fleet_sizes.get(bike_type, 0),
+                         ceil(round(float(peaks[index, week] + forecast["margin"][index]), 6)),
+                         forecast["models"][index]])
+    return rows
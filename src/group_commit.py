@@ -0,0 +1,262 @@
+import json
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Listener, Client
+
+# ===== Групова фіксація записів =====
+
+# Найбільший розмір повідомлення кіоску в байтах
+MAX_MESSAGE_BYTES = 64 * 1024
+AUTHKEY_BYTES = 32
+
+
+def sql_command(sql, params=()):
+    """Команда для GroupCommitWriter з одного SQL-запиту; результат – (lastrowid, rowcount)."""
+    def command(cursor):
+        cursor.execute(sql, params)
+        return cursor.lastrowid, cursor.rowcount
+    return command
+
+
+# ----- Команди кіосків -----
+# Кіоски не надсилають SQL: лише ім'я команди з KIOSK_COMMANDS та значення параметрів.
+# Повідомлення передаються як JSON (не pickle), тож дані клієнта не можуть виконати код.
+
+def kiosk_add_client(cursor, name, phone, email, document):
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Порожнє ім'я клієнта.")
+    cursor.execute("INSERT INTO clients (name, phone, email, document, name_key) VALUES (?, ?, ?, ?, ?)",
+                   (name, phone, email, document, name.lower()))
+    return cursor.lastrowid, cursor.rowcount
+
+
+def kiosk_update_client_contacts(cursor, client_id, phone, email):
+    cursor.execute("UPDATE clients SET phone = ?, email = ? WHERE id = ?", (phone, email, client_id))
+    return client_id, cursor.rowcount
+
+
+def kiosk_return_bike(cursor, bike_id):
+    # Повернення в кіоску, як RentalDAO.complete_rental, завершує активну оренду велосипеда
+    # і звільняє його в одній транзакції пакета. Запис іде через з'єднання потоку фіксації, тому
+    # стрічка змін і індекс резервувань застосунку про нього не дізнаються – інтерфейс побачить
+    # повернення лише після оновлення даних.
+    cursor.execute("UPDATE rentals SET status = 'Завершена', end_time = ? WHERE bike_id = ? AND status = 'Активна'",
+                   (int(time.time()), bike_id))
+    completed = cursor.rowcount
+    cursor.execute("UPDATE bikes SET status = 'Доступний' WHERE id = ? AND status = 'В оренді'", (bike_id,))
+    return bike_id, completed
+
+
+# Ім'я команди -> (функція, кількість параметрів)
+KIOSK_COMMANDS = {
+    "add_client": (kiosk_add_client, 4),
+    "update_client_contacts": (kiosk_update_client_contacts, 3),
+    "return_bike": (kiosk_return_bike, 1),
+}
+
+
+def kiosk_command(name, params):
+    """Команда для GroupCommitWriter з імені та параметрів кіоску; ValueError для невідомих або некоректних."""
+    if not isinstance(name, str) or name not in KIOSK_COMMANDS:
+        raise ValueError(f"Невідома команда: {name}")
+    function, count = KIOSK_COMMANDS[name]
+    if not isinstance(params, list) or not all(value is None or isinstance(value, (str, int, float))
+                                               for value in params):
+        raise ValueError("Параметри команди мають бути рядками, числами або null.")
+    if len(params) != count:
+        raise ValueError(f"Невірна кількість параметрів команди {name}.")
+    return lambda cursor: function(cursor, *params)
+
+
+def create_authkey_file(path):
+    """
+    Створює випадковий ключ доступу кіосків (AUTHKEY_BYTES байтів) у файлі з правами 0600
+    і повертає його. Файл передається кіоскам окремо від коду; наявний файл перезаписується.
+    """
+    authkey = secrets.token_bytes(AUTHKEY_BYTES)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(authkey)
+    os.chmod(path, 0o600)
+    return authkey
+
+
+def read_authkey_file(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def check_authkey(authkey):
+    if not isinstance(authkey, bytes) or len(authkey) < 16:
+        raise ValueError("Потрібен випадковий ключ доступу (щонайменше 16 байтів, див. create_authkey_file).")
+
+
+class GroupCommitWriter:
+    """
+    Потік запису з груповою фіксацією. Команди command(cursor) від кількох виробників (потоків,
+    а через serve() – і локальних процесів) накопичуються до max_batch штук або max_delay секунд
+    від першої команди пакета й виконуються однією транзакцією з одним commit.
+    Кожен виробник отримує результат своєї команди лише після commit.
+    Команда виконується у власній точці збереження: помилка однієї не скасовує решту пакета.
+    З max_delay=0 пакет складають команди, що накопичилися в черзі, поки йшов попередній commit;
+    більше значення збільшує пакети ціною затримки – має сенс для дисків з повільним fsync.
+    """
+
+    def __init__(self, db_path, max_batch=256, max_delay=0.0, timeout=30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = queue.Queue()
+        self.thread = None
+        self.listener = None
+        self.batches = 0
+        self.commands = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="group-commit-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Виконує вже надіслані команди та зупиняє потік запису."""
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, command):
+        """Ставить команду в чергу; повертає Future з результатом після commit."""
+        if self.thread is None:
+            raise RuntimeError("Потік запису не запущено.")
+        future = Future()
+        self.queue.put((command, future))
+        return future
+
+    def execute(self, sql, params=()):
+        """SQL-запит через групову фіксацію; чекає на commit і повертає (lastrowid, rowcount)."""
+        return self.submit(sql_command(sql, params)).result()
+
+    def next_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Сигнал зупинки повертається в чергу й обробляється після цього пакета
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def run(self):
+        # isolation_level=None: транзакціями пакета керуємо явно; timeout – очікування блокування,
+        # яке тримає основне з'єднання моделі
+        connection = sqlite3.connect(self.db_path, isolation_level=None, timeout=self.timeout)
+        connection.row_factory = sqlite3.Row
+        cursor = connection.cursor()
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            self.execute_batch(connection, cursor, self.next_batch(item))
+        connection.close()
+
+    def execute_batch(self, connection, cursor, batch):
+        outcomes = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for command, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute("SAVEPOINT command")
+                try:
+                    outcomes.append((future, command(cursor), None))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO command")
+                    outcomes.append((future, None, e))
+                cursor.execute("RELEASE command")
+            cursor.execute("COMMIT")
+        except Exception as e:
+            print("Error committing write batch:", e)
+            if connection.in_transaction:
+                connection.rollback()
+            for _, future in batch:
+                if not future.done() and (future.running() or future.set_running_or_notify_cancel()):
+                    future.set_exception(e)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        self.batches += 1
+        self.commands += len(outcomes)
+
+    # --- Запис з інших процесів (кіоски) ---
+    def serve(self, authkey, address=("127.0.0.1", 0)):
+        """
+        Приймає команди KIOSK_COMMANDS від локальних процесів (WriterClient) у фоновому потоці.
+        authkey – випадковий ключ (create_authkey_file), без якого з'єднання відхиляється.
+        Повертає фактичну адресу (для порту 0 – вибраний системою).
+        """
+        check_authkey(authkey)
+        self.listener = Listener(address, authkey=authkey)
+        threading.Thread(target=self.accept_clients, args=(self.listener,), daemon=True).start()
+        return self.listener.address
+
+    def accept_clients(self, listener):
+        while True:
+            try:
+                connection = listener.accept()
+            except OSError:
+                return  # слухач закрито в stop()
+            except Exception as e:
+                print("Error accepting writer client:", e)
+                continue
+            threading.Thread(target=self.serve_client, args=(connection,), daemon=True).start()
+
+    def serve_client(self, connection):
+        with connection:
+            while True:
+                try:
+                    # recv_bytes замість recv: повідомлення не розпаковуються через pickle
+                    message = connection.recv_bytes(MAX_MESSAGE_BYTES)
+                except (EOFError, OSError):
+                    return
+                try:
+                    name, params = json.loads(message)
+                    reply = ["ok", list(self.submit(kiosk_command(name, params)).result())]
+                except Exception as e:
+                    reply = ["error", str(e)]
+                connection.send_bytes(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+
+
+class WriterClient:
+    """Клієнт процесу-кіоску: надсилає команди KIOSK_COMMANDS у GroupCommitWriter.serve() і чекає на commit."""
+
+    def __init__(self, address, authkey):
+        check_authkey(authkey)
+        self.connection = Client(address, authkey=authkey)
+
+    def execute(self, command, *params):
+        """Виконує команду command з параметрами params; повертає (id запису, кількість змінених рядків)."""
+        self.connection.send_bytes(json.dumps([command, list(params)], ensure_ascii=False).encode("utf-8"))
+        status, value = json.loads(self.connection.recv_bytes(MAX_MESSAGE_BYTES))
+        if status != "ok":
+            raise sqlite3.DatabaseError(value)
+        return tuple(value)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from fpdf import FPDF
+from pdf_table import PDFTable, FONT_PATH, FONT_FAMILY, get_font_metrics, get_document_font
+
+# ===== Друк рахунків у PDF =====
+
+INVOICE_COLUMNS = ["ID оренди", "Велосипед", "Серійний номер", "Початок", "Тривалість (год)", "Знижка", "Вартість"]
+INVOICE_STATUSES = {"pending": "Очікує оплати", "paid": "Оплачено"}
+
+
+def invoice_filename(invoice):
+    return f"Invoice_{invoice['id']}.pdf"
+
+
+def invoices_font(invoices):
+    """Шрифт для порції рахунків: get_document_font за всім текстом, що потрапить у PDF."""
+    rows = []
+    for invoice in invoices:
+        rows.append([invoice["invoice_date"] or "", invoice["client_name"] or "", invoice["client_phone"] or "",
+                     invoice["client_document"] or "", INVOICE_STATUSES.get(invoice["status"], invoice["status"] or "")])
+        rows.extend([line["bike_model"] or "", line["serial_number"] or ""] for line in invoice["lines"])
+    return get_document_font(rows)
+
+
+class InvoiceRenderer:
+    """
+    Виводить рахунки (словники з InvoiceDAO.iter_invoices) по одному на сторінку.
+    Один екземпляр обслуговує один документ FPDF: для окремих файлів створюється новий документ,
+    для об'єднаного PDF усі рахунки додаються до того самого.
+    """
+
+    def __init__(self, font_path=FONT_PATH):
+        self.font_path = font_path
+        self.pdf = FPDF()
+        self.table = PDFTable(self.pdf, font_path, line_height=7)
+
+    def text_line(self, text, size, y):
+        self.pdf.set_font(FONT_FAMILY, "", size)
+        self.pdf.text(self.pdf.l_margin, y, text)
+
+    def render(self, invoice):
+        pdf = self.pdf
+        pdf.add_page()
+        date = invoice["invoice_date"] or ""
+        self.text_line(f"Рахунок № {invoice['id']} від {date[:10]}", 16, 20)
+        self.text_line(f"Клієнт: {invoice['client_name'] or 'Невідомо'}", 11, 32)
+        self.text_line(f"Телефон: {invoice['client_phone'] or ''}    Документ: {invoice['client_document'] or ''}",
+                       11, 39)
+        if invoice["group_id"] is not None:
+            self.text_line(f"Групова оренда № {invoice['group_id']}", 11, 46)
+        pdf.set_font(FONT_FAMILY, "", 10)
+        pdf.set_y(54)
+        rows = [[line["rental_id"], line["bike_model"] or "", line["serial_number"] or "",
+                 line["start_time"].strftime("%Y-%m-%d %H:%M"), line["duration"],
+                 f"{line['discount'] or 0:g} %", f"{line['total_cost']:.2f}"]
+                for line in invoice["lines"]]
+        self.table.render(INVOICE_COLUMNS, rows)
+        y = pdf.get_y() + 10
+        self.text_line(f"Разом до сплати: {invoice['amount'] or 0:.2f} грн", 12, y)
+        status = INVOICE_STATUSES.get(invoice["status"], invoice["status"] or "")
+        self.text_line(f"Статус: {status}", 11, y + 7)
+
+    def output(self, filename):
+        self.pdf.output(filename)
+
+
+def init_worker(font_path):
+    # Ширини гліфів читаються з кешу один раз на процес, а не на кожен рахунок
+    get_font_metrics(font_path)
+
+
+def render_invoice_files(invoices, output_dir, font_path):
+    """Окремий PDF для кожного рахунку; виконується і в робочих процесах пулу."""
+    filenames = []
+    for invoice in invoices:
+        renderer = InvoiceRenderer(font_path)
+        renderer.render(invoice)
+        filename = os.path.join(output_dir, invoice_filename(invoice))
+        renderer.output(filename)
+        filenames.append(filename)
+    return filenames
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_invoices(invoices, output_dir, merged=False, workers=None, chunk_size=25):
+    """
+    Друкує рахунки з ітератора invoices у каталог output_dir.
+    merged=True – один файл Invoices.pdf (рахунок на сторінку) у поточному процесі:
+    документ FPDF не можна поділити між процесами.
+    Інакше – окремий файл на рахунок; порції по chunk_size рахунків розподіляються між
+    workers процесами (None – за кількістю ядер, 1 – без пулу). Одночасно в черзі тримається
+    обмежена кількість порцій, тому ітератор читається з бази поступово.
+    Шрифт вибирає invoices_font для кожної порції (для об'єднаного файлу – для всіх рахунків):
+    спільна кешована підмножина, або повний шрифт, якщо в даних є символи поза нею.
+    Повертає список створених файлів.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if merged:
+        # Шрифт документа задається до першої сторінки, а FPDF однаково тримає весь документ у пам'яті
+        invoices = list(invoices)
+        if not invoices:
+            return []
+        renderer = InvoiceRenderer(invoices_font(invoices))
+        for invoice in invoices:
+            renderer.render(invoice)
+        filename = os.path.join(output_dir, "Invoices.pdf")
+        renderer.output(filename)
+        return [filename]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        filenames = []
+        for chunk in chunked(invoices, chunk_size):
+            filenames.extend(render_invoice_files(chunk, output_dir, invoices_font(chunk)))
+        return filenames
+    filenames = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(invoices_font([]),)) as pool:
+        pending = []
+        for chunk in chunked(invoices, chunk_size):
+            pending.append(pool.submit(render_invoice_files, chunk, output_dir, invoices_font(chunk)))
+            if len(pending) >= 2 * workers:
+                filenames.extend(pending.pop(0).result())
+        for future in pending:
+            filenames.extend(future.result())
+    return filenames
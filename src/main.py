@@ -1,18 +1,52 @@
 import sys
+import time
+import multiprocessing
 
+from PyQt5.QtCore import QEvent
 from PyQt5.QtWidgets import QApplication
 
 from model import BikeRentalModel
 from view import MainWindow
 from controller import BikeRentalController
+from ui_latency import LatencyRecorder
+
+LATENCY_REPORT = "ui_latency.json"
+PAINT_EVENTS = (QEvent.Paint, QEvent.UpdateRequest)
+
+
+class BikeRentalApplication(QApplication):
+    """QApplication, що передає час обробки подій перемальовування в LatencyRecorder."""
+
+    def __init__(self, argv, latency):
+        super().__init__(argv)
+        self.latency = latency
+        self.painting = False
+
+    def notify(self, receiver, event):
+        # Paint віджетів доставляється всередині UpdateRequest вікна – рахується лише зовнішня подія
+        if self.painting or event.type() not in PAINT_EVENTS:
+            return super().notify(receiver, event)
+        self.painting = True
+        started = time.perf_counter()
+        try:
+            return super().notify(receiver, event)
+        finally:
+            self.painting = False
+            self.latency.add_repaint(time.perf_counter() - started)
+
 
 def main():
-    app = QApplication(sys.argv)
+    latency = LatencyRecorder()
+    app = BikeRentalApplication(sys.argv, latency)
     model = BikeRentalModel("bike_rental.db")
     view = MainWindow()
-    controller = BikeRentalController(model, view)
+    controller = BikeRentalController(model, view, latency)
+    # Після скарги «програма зависла» підсумки лишаються у файлі
+    app.aboutToQuit.connect(lambda: latency.dump(LATENCY_REPORT))
     view.show()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # Потрібно для пулу процесів друку рахунків у зібраному exe (PyInstaller)
+    multiprocessing.freeze_support()
     main()
@@ -1,9 +1,18 @@
 import sqlite3
 import os
+import threading
+import time
+from concurrent.futures import Future
+from urllib.request import pathname2url
 from datetime import datetime, timedelta
 from math import ceil
-import pandas as pd
-from fpdf import FPDF
+from reservations import ReservationIndex
+from change_feed import ChangeFeed
+from backup import BackupManager
+from replication import Replicator
+from group_commit import GroupCommitWriter
+from activity import RecentActivity
+from pricing import PricingEngine
 
 # ===== Сутності =====
 
@@ -50,13 +59,76 @@ class Rental:
         return f"Rental({self.id}, Client: {self.client_id}, Bike: {self.bike_id}, {self.status})"
 
 
+def prefix_range(prefix):
+    """Межі [low, high) для пошуку за префіксом діапазоном по індексу (порівняння TEXT у SQLite побайтове)."""
+    return prefix, prefix + "\U0010ffff"
+
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_datetime(value):
+    """Перетворює рядок 'YYYY-MM-DD HH:MM:SS' на datetime (datetime повертається як є); None для некоректних значень."""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_epoch(value):
+    """Місцевий час (datetime або рядок) -> ціле число секунд Unix для стовпців часу rentals."""
+    value = parse_datetime(value)
+    return int(value.timestamp()) if value is not None else None
+
+
+def from_epoch(value):
+    """Секунди Unix з бази -> datetime у місцевому часі; None залишається None."""
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+def format_datetime(value):
+    return value.strftime(DATETIME_FORMAT) if value is not None else ""
+
+
+def day_bounds(start_date, end_date):
+    """Межі [початок start_date, початок дня після end_date) у секундах Unix для умов за датами."""
+    start = datetime.fromisoformat(start_date)
+    end = datetime.fromisoformat(end_date) + timedelta(days=1)
+    return to_epoch(start), to_epoch(end)
+
+
 # ===== Клас для роботи з базою даних =====
 
+# Скільки секунд з'єднання запису чекає на блокування, яке тримає інше з'єднання
+WRITE_TIMEOUT = 30
+# Тривалість одного штрафного інтервалу прострочки, секунд
+PENALTY_INTERVAL = 1800
+
 class Database:
+    """
+    Одне з'єднання для запису (connection, належить потоку, що створив Database) та пул
+    з'єднань лише для читання – по одному на потік. Звіти, панель і журнали читають через
+    read_cursor(): у режимі WAL таке читання не чекає на запис і може йти з будь-якого потоку.
+    """
+
     def __init__(self, db_path):
-        self.connection = sqlite3.connect(db_path)
+        self.db_path = db_path
+        # IMMEDIATE: транзакція одразу бере блокування запису й чекає на нього до WRITE_TIMEOUT секунд,
+        # а не отримує "database is locked" при спробі запису після читання, якщо базу змінило
+        # інше з'єднання (потік запису кіосків, реплікація, інша каса)
+        self.connection = sqlite3.connect(db_path, timeout=WRITE_TIMEOUT, isolation_level="IMMEDIATE")
         self.connection.row_factory = sqlite3.Row
+        # WAL: читання (зокрема резервне копіювання) не блокує запис і навпаки
+        if db_path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.readers = {}  # потік -> з'єднання лише для читання
+        self.readers_lock = threading.Lock()
+        self.group_writer = None
         # Увімкнення підтримки foreign keys
+        # Стрічка змін, у яку DAO повідомляють про успішні записи
+        self.changes = ChangeFeed()
 
     def get_cursor(self):
         return self.connection.cursor()
@@ -64,6 +136,137 @@ class Database:
     def commit(self):
         self.connection.commit()
 
+    def write(self, command):
+        """
+        Виконує command(cursor) через основне з'єднання і фіксує зміни; повертає результат command.
+        При помилці зміни команди скасовуються, виняток передається далі.
+        """
+        cursor = self.get_cursor()
+        try:
+            result = command(cursor)
+            self.commit()
+            return result
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def start_group_commit(self, max_batch=256, max_delay=0.0):
+        """
+        Запускає потік групової фіксації (GroupCommitWriter) для записувачів поза DAO: процесів-кіосків
+        (group_writer.serve) і фонових потоків-виробників (group_writer.submit); їхні записи збираються
+        до max_batch команд або max_delay секунд і фіксуються одним commit.
+        Записи DAO завжди йдуть через основне з'єднання: вони читають власні незафіксовані зміни
+        в межах транзакції. Обидва з'єднання беруть блокування запису одразу (BEGIN IMMEDIATE)
+        і чекають одне на одного до WRITE_TIMEOUT секунд.
+        Для бази в пам'яті недоступно – потік запису не бачить її. Повертає True, якщо запущено.
+        """
+        if self.db_path == ":memory:" or self.group_writer is not None:
+            return False
+        self.group_writer = GroupCommitWriter(self.db_path, max_batch, max_delay, WRITE_TIMEOUT)
+        self.group_writer.start()
+        return True
+
+    def stop_group_commit(self):
+        if self.group_writer is not None:
+            self.group_writer.stop()
+            self.group_writer = None
+
+    def read_cursor(self):
+        """
+        Курсор з'єднання лише для читання поточного потоку. Бачить лише зафіксовані зміни,
+        тому всередині транзакції запису потрібно читати через get_cursor().
+        База в пам'яті не має окремих з'єднань – для неї повертається курсор основного з'єднання.
+        """
+        if self.db_path == ":memory:":
+            return self.connection.cursor()
+        thread = threading.current_thread()
+        with self.readers_lock:
+            connection = self.readers.get(thread)
+        if connection is None:
+            connection = self.open_reader(thread)
+        return connection.cursor()
+
+    def open_reader(self, thread):
+        uri = "file:" + pathname2url(os.path.abspath(self.db_path)) + "?mode=ro"
+        # isolation_level=None: кожен SELECT бачить останні зафіксовані дані й не тримає знімок WAL
+        connection = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only=ON")
+        with self.readers_lock:
+            # З'єднання завершених потоків закриваються, щоб пул не ріс
+            for finished in [reader for reader in self.readers if not reader.is_alive()]:
+                self.readers.pop(finished).close()
+            self.readers[thread] = connection
+        return connection
+
+    def close(self):
+        self.stop_group_commit()
+        with self.readers_lock:
+            for connection in self.readers.values():
+                connection.close()
+            self.readers.clear()
+        self.connection.close()
+
+    def column_types(self, table):
+        """Оголошені типи стовпців таблиці: {ім'я: тип}."""
+        cursor = self.get_cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row["name"]: row["type"].upper() for row in cursor.fetchall()}
+
+    def add_column_if_missing(self, table, column, definition):
+        """Додає стовпець до таблиці старої бази; повертає True, якщо стовпець було додано."""
+        if column in self.column_types(table):
+            return False
+        self.get_cursor().execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+
+    def backup(self, target_path, pages=256, sleep=0.01, progress=None):
+        """
+        Онлайн-копія бази у файл target_path через Connection.backup: по pages сторінок за крок
+        з паузою sleep секунд між кроками (ця ж пауза – і очікування зайнятої бази). Копіювання
+        файлової бази йде через окреме з'єднання, тому його можна запускати з фонового потоку,
+        а запис з основного з'єднання не зупиняється; базу ":memory:" копіюють лише з потоку,
+        що її відкрив. progress(copied, total) отримує кількість скопійованих сторінок після
+        кожного кроку. Повертає результат PRAGMA integrity_check копії ("ok" для цілої копії).
+        """
+        source = self.connection if self.db_path == ":memory:" else sqlite3.connect(self.db_path)
+        target = sqlite3.connect(target_path)
+        try:
+            # У режимі WAL відкрита транзакція читання фіксує знімок бази: записи інших з'єднань
+            # не перезапускають копіювання з початку, а потраплять у наступну копію
+            if source is not self.connection and source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+            def report(status, remaining, total):
+                if progress:
+                    progress(total - remaining, total)
+                # Connection.backup чекає sleep лише на зайнятій базі, тож паузу між кроками робимо тут
+                if remaining and sleep:
+                    time.sleep(sleep)
+
+            source.backup(target, pages=pages, progress=report, sleep=sleep)
+            # Копія – самодостатній файл без -wal/-shm
+            target.execute("PRAGMA journal_mode=DELETE")
+            return target.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            target.close()
+            if source is not self.connection:
+                source.close()
+
+    def analyze(self):
+        self.get_cursor().execute("ANALYZE")
+        self.commit()
+
+    def optimize(self):
+        # Перераховує статистику лише для таблиць, де вона застаріла
+        self.get_cursor().execute("PRAGMA optimize")
+        self.commit()
+
+    def vacuum(self):
+        self.commit()
+        self.get_cursor().execute("VACUUM")
+
 
 # ===== DAO для клієнтів =====
 
@@ -80,24 +283,136 @@ class ClientDAO:
                 phone TEXT,
                 email TEXT,
                 document TEXT,
-                created_at DATETIME DEFAULT (datetime('now','localtime'))
+                created_at DATETIME DEFAULT (datetime('now','localtime')),
+                rentals_count INTEGER NOT NULL DEFAULT 0,
+                total_spent REAL NOT NULL DEFAULT 0,
+                last_rental_at INTEGER,
+                name_key TEXT
             )
         ''')
+        # name_key – ПІБ у нижньому регістрі для пошуку за префіксом
+        # (вбудований lower() SQLite не працює з кирилицею, тому ключ рахується в Python)
+        if self.db.add_column_if_missing("clients", "name_key", "TEXT"):
+            cursor.execute("SELECT id, name FROM clients")
+            cursor.executemany("UPDATE clients SET name_key = ? WHERE id = ?",
+                               [(row["name"].lower(), row["id"]) for row in cursor.fetchall()])
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_name_key ON clients(name_key)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_phone ON clients(phone)")
+        self.create_name_tokens(cursor)
         self.db.commit()
 
-    def add_client(self, name, phone, email, document):
+    def create_name_tokens(self, cursor):
+        """
+        Окремі слова name_key (ім'я, прізвище, частини подвійного прізвища) для пошуку за префіксом
+        будь-якого слова. Слова ведуть тригери за name_key, тому їх отримують і клієнти,
+        додані імпортом, реплікацією чи кіоском.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'client_name_tokens'")
+        backfill = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS client_name_tokens (
+                token TEXT NOT NULL,
+                client_id INTEGER NOT NULL,
+                PRIMARY KEY (token, client_id)
+            ) WITHOUT ROWID
+        ''')
+        # Для перевірки решти слів знайденого клієнта та видалення його слів
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_client_name_tokens_client ON client_name_tokens(client_id, token)")
+        insert_tokens = '''
+            INSERT OR IGNORE INTO client_name_tokens (token, client_id)
+            WITH RECURSIVE split(word, rest) AS (
+                SELECT '', replace(COALESCE(NEW.name_key, ''), '-', ' ') || ' '
+                UNION ALL
+                SELECT substr(rest, 1, instr(rest, ' ') - 1), substr(rest, instr(rest, ' ') + 1) FROM split WHERE rest != ''
+            )
+            SELECT word, NEW.id FROM split WHERE word != '';
+        '''
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_clients_tokens_insert AFTER INSERT ON clients BEGIN {insert_tokens} END")
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_clients_tokens_update AFTER UPDATE OF name_key ON clients BEGIN
+                DELETE FROM client_name_tokens WHERE client_id = OLD.id;
+                {insert_tokens}
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_clients_tokens_delete AFTER DELETE ON clients BEGIN
+                DELETE FROM client_name_tokens WHERE client_id = OLD.id;
+            END
+        ''')
+        if backfill:
+            # Тригер оновлення заповнює слова наявних клієнтів
+            cursor.execute("UPDATE clients SET name_key = name_key")
+
+    def migrate_aggregates(self):
+        """
+        Додає до старих баз стовпці накопичених показників клієнта та заповнює їх один раз
+        з історії оренд. Далі показники підтримують тригери таблиці rentals.
+        """
         cursor = self.db.get_cursor()
-        try:
+        if not self.db.add_column_if_missing("clients", "rentals_count", "INTEGER NOT NULL DEFAULT 0"):
+            return
+        self.db.add_column_if_missing("clients", "total_spent", "REAL NOT NULL DEFAULT 0")
+        self.db.add_column_if_missing("clients", "last_rental_at", "INTEGER")
+        cursor.execute('''
+            UPDATE clients SET
+                rentals_count = (SELECT COUNT(*) FROM rentals r WHERE r.client_id = clients.id),
+                total_spent = (SELECT COALESCE(SUM(total_cost), 0) FROM rentals r WHERE r.client_id = clients.id),
+                last_rental_at = (SELECT MAX(start_time) FROM rentals r WHERE r.client_id = clients.id)
+        ''')
+        self.db.commit()
+
+    def get_aggregates(self, client_id):
+        """Кількість оренд, загальна сума та дата останньої оренди клієнта (без сканування історії)."""
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT rentals_count, total_spent, last_rental_at FROM clients WHERE id = ?", (client_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {"rentals_count": row["rentals_count"], "total_spent": row["total_spent"],
+                "last_rental_at": from_epoch(row["last_rental_at"])}
+
+    def add_client(self, name, phone, email, document):
+        def insert(cursor):
             cursor.execute('''
-                INSERT INTO clients (name, phone, email, document)
-                VALUES (?, ?, ?, ?)
-            ''', (name, phone, email, document))
-            self.db.commit()
+                INSERT INTO clients (name, phone, email, document, name_key)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (name, phone, email, document, name.lower()))
+            return cursor.lastrowid
+        try:
+            client_id = self.db.write(insert)
+            self.db.changes.emit("client", client_id, "insert")
             return True
         except Exception as e:
             print("Error adding client:", e)
             return False
 
+    def import_clients(self, rows):
+        """
+        Масовий імпорт клієнтів з ітерованого rows (name, phone, email, document) в одній транзакції.
+        Повертає (кількість доданих, повідомлення); при помилці не додається жоден запис.
+        """
+        cursor = self.db.get_cursor()
+        client_ids = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for name, phone, email, document in rows:
+                if not name:
+                    raise ValueError(f"Порожнє ім'я клієнта у записі {len(client_ids) + 1}.")
+                cursor.execute('''
+                    INSERT INTO clients (name, phone, email, document, name_key)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (name, phone, email, document, name.lower()))
+                client_ids.append(cursor.lastrowid)
+            self.db.commit()
+        except Exception as e:
+            self.db.connection.rollback()
+            print("Error importing clients:", e)
+            return 0, "Помилка імпорту клієнтів: " + str(e)
+        with self.db.changes.batch():
+            for client_id in client_ids:
+                self.db.changes.emit("client", client_id, "insert")
+        return len(client_ids), f"Імпортовано клієнтів: {len(client_ids)}"
+
     def update_client(self, client_id, name=None, phone=None, email=None, document=None):
         cursor = self.db.get_cursor()
         fields = []
@@ -105,6 +420,8 @@ class ClientDAO:
         if name is not None:
             fields.append("name = ?")
             values.append(name)
+            fields.append("name_key = ?")
+            values.append(name.lower())
         if phone is not None:
             fields.append("phone = ?")
             values.append(phone)
@@ -121,6 +438,7 @@ class ClientDAO:
         try:
             cursor.execute(query, tuple(values))
             self.db.commit()
+            self.db.changes.emit("client", client_id, "update")
             return True
         except Exception as e:
             print("Error updating client:", e)
@@ -131,10 +449,26 @@ class ClientDAO:
         try:
             cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
             self.db.commit()
+            if cursor.rowcount > 0:
+                self.db.changes.emit("client", client_id, "delete")
             return True, "Клієнта видалено."
         except Exception as e:
             return False, str(e)
 
+    def get_by_id(self, client_id):
+        cursor = self.db.get_cursor()
+        cursor.execute("SELECT id, name, phone, email, document, created_at FROM clients WHERE id = ?",
+                       (client_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return Client(row["id"], row["name"], row["phone"], row["email"], row["document"], row["created_at"])
+
+    def count(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT COUNT(*) FROM clients")
+        return cursor.fetchone()[0]
+
     def get_all(self):
         cursor = self.db.get_cursor()
         cursor.execute("SELECT id, name, phone, email, document, created_at FROM clients")
@@ -146,7 +480,7 @@ class ClientDAO:
         return clients
 
     def search(self, search_text):
-        cursor = self.db.get_cursor()
+        cursor = self.db.read_cursor()
         query = """
             SELECT id, name, phone, email, document, created_at 
             FROM clients 
@@ -161,9 +495,59 @@ class ClientDAO:
                                   row["email"], row["document"], row["created_at"]))
         return clients
 
+    def search_prefix(self, prefix, limit=20):
+        """
+        Клієнти, в імені яких кожне слово prefix є початком якогось слова (ім'я, прізвище – у будь-якому
+        порядку), або чий телефон починається з prefix. Перше слово шукається діапазоном по
+        client_name_tokens, решта – перевіркою слів знайденого клієнта; кожна гілка має власний LIMIT,
+        тому вартість не залежить від кількості клієнтів у базі.
+        """
+        cursor = self.db.read_cursor()
+        words = prefix.strip().lower().replace("-", " ").split() or [""]
+        others = " ".join(["AND EXISTS (SELECT 1 FROM client_name_tokens o "
+                           "WHERE o.client_id = t.client_id AND o.token >= ? AND o.token < ?)"] * (len(words) - 1))
+        name_values = list(prefix_range(words[0]))
+        for word in words[1:]:
+            name_values.extend(prefix_range(word))
+        phone_low, phone_high = prefix_range(prefix.strip())
+        cursor.execute(f'''
+            SELECT id, name, phone, email, document, created_at FROM clients WHERE id IN (
+                SELECT t.client_id FROM client_name_tokens t
+                WHERE t.token >= ? AND t.token < ? {others}
+                ORDER BY t.token LIMIT ?
+            )
+            UNION
+            SELECT id, name, phone, email, document, created_at FROM (
+                SELECT * FROM clients WHERE phone >= ? AND phone < ? ORDER BY phone LIMIT ?
+            )
+            ORDER BY name
+            LIMIT ?
+        ''', (*name_values, limit, phone_low, phone_high, limit, limit))
+        return [Client(row["id"], row["name"], row["phone"], row["email"], row["document"], row["created_at"])
+                for row in cursor.fetchall()]
+
 
 # ===== DAO для велосипедів =====
 
+# Типові інтервали обслуговування (рядок service_intervals з порожнім типом): години в оренді
+# та кількість завершених оренд від останнього обслуговування, що настане раніше
+DEFAULT_SERVICE_HOURS = 150
+DEFAULT_SERVICE_RENTALS = 60
+SERVICE_STATUS = "Ремонт"
+
+
+def service_due_sql(seconds, rentals):
+    """
+    SQL-умова «пора на обслуговування» для рядка bikes, де seconds і rentals – вирази наробітку
+    (секунди в оренді) та кількості завершених оренд. Інтервал береться для типу велосипеда,
+    а якщо його не задано – типовий (bike_type = '').
+    """
+    interval = "COALESCE((SELECT {0} FROM service_intervals WHERE bike_type = bikes.type), " \
+               "(SELECT {0} FROM service_intervals WHERE bike_type = ''))"
+    return (f"(({seconds}) - service_seconds >= 3600 * {interval.format('hours')} "
+            f"OR ({rentals}) - service_rentals >= {interval.format('rentals')})")
+
+
 class BikeDAO:
     def __init__(self, db: Database):
         self.db = db
@@ -178,24 +562,166 @@ class BikeDAO:
                 type TEXT,
                 status TEXT,
                 price_per_hour REAL,
-                last_maintenance_date DATETIME
+                last_maintenance_date DATETIME,
+                model_key TEXT,
+                rented_seconds INTEGER NOT NULL DEFAULT 0,
+                rentals_count INTEGER NOT NULL DEFAULT 0,
+                service_seconds INTEGER NOT NULL DEFAULT 0,
+                service_rentals INTEGER NOT NULL DEFAULT 0,
+                service_due INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # model_key – модель у нижньому регістрі для пошуку за префіксом
+        if self.db.add_column_if_missing("bikes", "model_key", "TEXT"):
+            cursor.execute("SELECT id, model FROM bikes")
+            cursor.executemany("UPDATE bikes SET model_key = ? WHERE id = ?",
+                               [(row["model"].lower(), row["id"]) for row in cursor.fetchall()])
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bikes_status_model_key ON bikes(status, model_key)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bikes_status_serial ON bikes(status, serial_number)")
+        # Інтервали обслуговування за типами велосипедів; '' – типовий інтервал
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS service_intervals (
+                bike_type TEXT PRIMARY KEY,
+                hours REAL NOT NULL,
+                rentals INTEGER NOT NULL
             )
         ''')
+        cursor.execute("INSERT OR IGNORE INTO service_intervals (bike_type, hours, rentals) VALUES ('', ?, ?)",
+                       (DEFAULT_SERVICE_HOURS, DEFAULT_SERVICE_RENTALS))
         self.db.commit()
 
-    def add_bike(self, model, serial_number, bike_type, price_per_hour):
+    def migrate_odometers(self):
+        """
+        Додає до старих баз лічильники наробітку велосипедів (секунди в оренді, кількість завершених оренд)
+        і заповнює їх один раз з історії оренд; наробіток до last_maintenance_date вважається обслуговуваним.
+        Далі лічильники й позначку service_due підтримують тригери таблиць rentals і bikes.
+        """
         cursor = self.db.get_cursor()
+        if self.db.add_column_if_missing("bikes", "rented_seconds", "INTEGER NOT NULL DEFAULT 0"):
+            for column in ("rentals_count", "service_seconds", "service_rentals", "service_due"):
+                self.db.add_column_if_missing("bikes", column, "INTEGER NOT NULL DEFAULT 0")
+            completed = "FROM rentals r WHERE r.bike_id = bikes.id AND r.end_time IS NOT NULL"
+            serviced = completed + " AND r.end_time <= CAST(strftime('%s', bikes.last_maintenance_date, 'utc') AS INTEGER)"
+            cursor.execute(f'''
+                UPDATE bikes SET
+                    rented_seconds = (SELECT COALESCE(SUM(MAX(r.end_time - r.start_time, 0)), 0) {completed}),
+                    rentals_count = (SELECT COUNT(*) {completed}),
+                    service_seconds = (SELECT COALESCE(SUM(MAX(r.end_time - r.start_time, 0)), 0) {serviced}),
+                    service_rentals = (SELECT COUNT(*) {serviced})
+            ''')
+            cursor.execute(f"UPDATE bikes SET service_due = {service_due_sql('rented_seconds', 'rentals_count')}")
+        # Список велосипедів, що потребують обслуговування, читається лише з цього часткового індексу
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bikes_service_due ON bikes(id) WHERE service_due = 1")
+        # Повернення з ремонту – це обслуговування: наробіток від нього рахується заново
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_bikes_serviced AFTER UPDATE OF status ON bikes
+            WHEN OLD.status = '{SERVICE_STATUS}' AND NEW.status != '{SERVICE_STATUS}'
+            BEGIN
+                UPDATE bikes SET service_seconds = rented_seconds, service_rentals = rentals_count, service_due = 0,
+                                 last_maintenance_date = datetime('now','localtime')
+                WHERE id = NEW.id;
+            END
+        ''')
+        self.db.commit()
+
+    def set_service_interval(self, bike_type, hours, rentals):
+        """Інтервал обслуговування для типу ('' – типовий); позначки service_due перераховуються."""
+        def command(cursor):
+            cursor.execute('''
+                INSERT INTO service_intervals (bike_type, hours, rentals) VALUES (?, ?, ?)
+                ON CONFLICT (bike_type) DO UPDATE SET hours = excluded.hours, rentals = excluded.rentals
+            ''', (bike_type, hours, rentals))
+            cursor.execute(f"UPDATE bikes SET service_due = {service_due_sql('rented_seconds', 'rentals_count')}")
         try:
+            self.db.write(command)
+            return True, "Інтервал обслуговування збережено."
+        except Exception as e:
+            print("Error saving service interval:", e)
+            return False, "Помилка збереження інтервалу: " + str(e)
+
+    def get_service_intervals(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT bike_type, hours, rentals FROM service_intervals ORDER BY bike_type")
+        return [tuple(row) for row in cursor.fetchall()]
+
+    def get_odometer(self, bike_id):
+        """Наробіток велосипеда без сканування історії: години й оренди загалом і від обслуговування."""
+        cursor = self.db.read_cursor()
+        cursor.execute('''
+            SELECT rented_seconds, rentals_count, service_seconds, service_rentals, service_due, last_maintenance_date
+            FROM bikes WHERE id = ?
+        ''', (bike_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {"hours": round(row["rented_seconds"] / 3600, 1), "rentals": row["rentals_count"],
+                "hours_since_service": round((row["rented_seconds"] - row["service_seconds"]) / 3600, 1),
+                "rentals_since_service": row["rentals_count"] - row["service_rentals"],
+                "service_due": bool(row["service_due"]), "last_maintenance_date": row["last_maintenance_date"]}
+
+    def get_due_for_service(self, limit=50):
+        """
+        Велосипеди з позначкою service_due, крім тих, що вже в ремонті: (id, модель, серійний номер, тип,
+        годин від обслуговування, оренд від обслуговування). Читається частковий індекс idx_bikes_service_due.
+        """
+        cursor = self.db.read_cursor()
+        cursor.execute(f'''
+            SELECT id, model, serial_number, type, (rented_seconds - service_seconds) / 3600.0,
+                   rentals_count - service_rentals
+            FROM bikes
+            WHERE service_due = 1 AND status != '{SERVICE_STATUS}'
+            ORDER BY id
+            LIMIT ?
+        ''', (limit,))
+        return [tuple(row[:4]) + (round(row[4], 1), row[5]) for row in cursor.fetchall()]
+
+    def count_due_for_service(self):
+        cursor = self.db.read_cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM bikes WHERE service_due = 1 AND status != '{SERVICE_STATUS}'")
+        return cursor.fetchone()[0]
+
+    def add_bike(self, model, serial_number, bike_type, price_per_hour):
+        def insert(cursor):
             cursor.execute('''
-                INSERT INTO bikes (model, serial_number, type, status, price_per_hour)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (model, serial_number, bike_type, "Доступний", price_per_hour))
-            self.db.commit()
+                INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (model, serial_number, bike_type, "Доступний", price_per_hour, model.lower()))
+            return cursor.lastrowid
+        try:
+            bike_id = self.db.write(insert)
+            self.db.changes.emit("bike", bike_id, "insert")
             return True
         except Exception as e:
             print("Error adding bike:", e)
             return False
 
+    def import_bikes(self, rows):
+        """
+        Масовий імпорт велосипедів з ітерованого rows (model, serial_number, type, price_per_hour)
+        в одній транзакції. Повертає (кількість доданих, повідомлення); при помилці не додається жоден запис.
+        """
+        cursor = self.db.get_cursor()
+        bike_ids = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for model, serial_number, bike_type, price_per_hour in rows:
+                if not model:
+                    raise ValueError(f"Порожня модель велосипеда у записі {len(bike_ids) + 1}.")
+                cursor.execute('''
+                    INSERT INTO bikes (model, serial_number, type, status, price_per_hour, model_key)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (model, serial_number, bike_type, "Доступний", float(price_per_hour), model.lower()))
+                bike_ids.append(cursor.lastrowid)
+            self.db.commit()
+        except Exception as e:
+            self.db.connection.rollback()
+            print("Error importing bikes:", e)
+            return 0, "Помилка імпорту велосипедів: " + str(e)
+        with self.db.changes.batch():
+            for bike_id in bike_ids:
+                self.db.changes.emit("bike", bike_id, "insert")
+        return len(bike_ids), f"Імпортовано велосипедів: {len(bike_ids)}"
+
     def update_bike(self, bike_id, model=None, serial_number=None, bike_type=None, status=None, price_per_hour=None):
         cursor = self.db.get_cursor()
         fields = []
@@ -203,6 +729,8 @@ class BikeDAO:
         if model is not None:
             fields.append("model = ?")
             values.append(model)
+            fields.append("model_key = ?")
+            values.append(model.lower())
         if serial_number is not None:
             fields.append("serial_number = ?")
             values.append(serial_number)
@@ -222,6 +750,7 @@ class BikeDAO:
         try:
             cursor.execute(query, tuple(values))
             self.db.commit()
+            self.db.changes.emit("bike", bike_id, "update")
             return True
         except Exception as e:
             print("Error updating bike:", e)
@@ -232,10 +761,26 @@ class BikeDAO:
         try:
             cursor.execute("DELETE FROM bikes WHERE id = ?", (bike_id,))
             self.db.commit()
+            if cursor.rowcount > 0:
+                self.db.changes.emit("bike", bike_id, "delete")
             return True, "Велосипед видалено."
         except Exception as e:
             return False, str(e)
 
+    def get_by_id(self, bike_id):
+        cursor = self.db.get_cursor()
+        cursor.execute("SELECT id, model, serial_number, type, status, price_per_hour FROM bikes WHERE id = ?",
+                       (bike_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return Bike(row["id"], row["model"], row["serial_number"], row["type"], row["status"], row["price_per_hour"])
+
+    def count_available(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT COUNT(*) FROM bikes WHERE status = 'Доступний'")
+        return cursor.fetchone()[0]
+
     def get_all(self):
         cursor = self.db.get_cursor()
         cursor.execute("SELECT id, model, serial_number, type, status, price_per_hour FROM bikes")
@@ -261,7 +806,7 @@ class BikeDAO:
         return bikes
 
     def search(self, search_text, bike_type, status):
-        cursor = self.db.get_cursor()
+        cursor = self.db.read_cursor()
         query = "SELECT id, model, serial_number, type, status, price_per_hour FROM bikes WHERE 1=1"
         values = []
         if search_text:
@@ -283,11 +828,31 @@ class BikeDAO:
                               row["type"], row["status"], row["price_per_hour"]))
         return bikes
 
+    def search_available_prefix(self, prefix, limit=20):
+        """Доступні велосипеди, модель або серійний номер яких починається з prefix (діапазони по індексах)."""
+        cursor = self.db.read_cursor()
+        model_low, model_high = prefix_range(prefix.strip().lower())
+        serial_low, serial_high = prefix_range(prefix.strip())
+        cursor.execute('''
+            SELECT id, model, serial_number, type, status, price_per_hour FROM (
+                SELECT * FROM bikes WHERE status = 'Доступний' AND model_key >= ? AND model_key < ?
+                ORDER BY model_key LIMIT ?
+            )
+            UNION
+            SELECT id, model, serial_number, type, status, price_per_hour FROM (
+                SELECT * FROM bikes WHERE status = 'Доступний' AND serial_number >= ? AND serial_number < ?
+                ORDER BY serial_number LIMIT ?
+            )
+            ORDER BY model, serial_number
+            LIMIT ?
+        ''', (model_low, model_high, limit, serial_low, serial_high, limit, limit))
+        return [Bike(row["id"], row["model"], row["serial_number"], row["type"], row["status"],
+                     row["price_per_hour"]) for row in cursor.fetchall()]
+
     def update_bike_status(self, bike_id, status):
-        cursor = self.db.get_cursor()
         try:
-            cursor.execute("UPDATE bikes SET status = ? WHERE id = ?", (status, bike_id))
-            self.db.commit()
+            self.db.write(lambda cursor: cursor.execute("UPDATE bikes SET status = ? WHERE id = ?", (status, bike_id)))
+            self.db.changes.emit("bike", bike_id, "update")
             return True
         except Exception as e:
             print("Error updating bike status:", e)
@@ -297,33 +862,171 @@ class BikeDAO:
 # ===== DAO для оренд =====
 
 class RentalDAO:
-    def __init__(self, db: Database, bike_dao: BikeDAO):
+    def __init__(self, db: Database, bike_dao: BikeDAO, pricing: PricingEngine):
         self.db = db
         self.bike_dao = bike_dao
+        self.pricing = pricing
 
-    def create_table(self):
-        cursor = self.db.get_cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS rentals (
+    def create_rentals_table(self, cursor, name):
+        # Час зберігається як ціле число секунд Unix: порівняння за діапазонами йдуть по індексу
+        # без DATE()/розбору рядків, а DAO повертає готові datetime
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {name} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 client_id INTEGER NOT NULL,
                 bike_id INTEGER NOT NULL,
-                start_time DATETIME NOT NULL,
+                start_time INTEGER NOT NULL,
                 duration INTEGER,
-                end_time DATETIME,
+                end_time INTEGER,
                 status TEXT,
                 total_cost REAL,
                 discount REAL DEFAULT 0,
                 is_paid INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT (datetime('now','localtime')),
+                created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                penalty_intervals_charged INTEGER NOT NULL DEFAULT 0,
+                group_id INTEGER,
                 FOREIGN KEY(client_id) REFERENCES clients(id),
                 FOREIGN KEY(bike_id) REFERENCES bikes(id)
             )
         ''')
+
+    def create_table(self):
+        cursor = self.db.get_cursor()
+        self.create_rentals_table(cursor, "rentals")
+        self.migrate_epoch_timestamps()
+        # Кількість уже нарахованих штрафних інтервалів зберігається в базі, тому перезапуск
+        # програми не призводить до повторного нарахування
+        self.db.add_column_if_missing("rentals", "penalty_intervals_charged", "INTEGER NOT NULL DEFAULT 0")
+        self.db.add_column_if_missing("rentals", "group_id", "INTEGER")
+        # Індекси для звітів за періодами
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rentals_start_time ON rentals(start_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rentals_end_time ON rentals(end_time)")
+        # Індекс для посторінкової історії клієнта
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rentals_client_start ON rentals(client_id, start_time)")
+        # Оренди групи та перерахунок спільного рахунку
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rentals_group ON rentals(group_id) WHERE group_id IS NOT NULL")
+        # Частковий індекс за очікуваним часом завершення активних оренд для перевірки прострочених
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_rentals_active_due ON rentals(start_time + duration * 3600)
+            WHERE status = 'Активна'
+        ''')
+        # Представлення з часом у форматі 'YYYY-MM-DD HH:MM:SS' для зовнішніх читачів старої схеми
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS rentals_text AS
+            SELECT id, client_id, bike_id,
+                   datetime(start_time, 'unixepoch', 'localtime') AS start_time, duration,
+                   datetime(end_time, 'unixepoch', 'localtime') AS end_time,
+                   status, total_cost, discount, is_paid,
+                   datetime(created_at, 'unixepoch', 'localtime') AS created_at
+            FROM rentals
+        ''')
+        # Тригери підтримують накопичені показники клієнта при будь-якій зміні оренд
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rentals_client_insert AFTER INSERT ON rentals
+            BEGIN
+                UPDATE clients SET rentals_count = rentals_count + 1,
+                                   total_spent = total_spent + COALESCE(NEW.total_cost, 0),
+                                   last_rental_at = MAX(COALESCE(last_rental_at, 0), NEW.start_time)
+                WHERE id = NEW.client_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rentals_client_cost AFTER UPDATE OF total_cost ON rentals
+            WHEN COALESCE(NEW.total_cost, 0) != COALESCE(OLD.total_cost, 0)
+            BEGIN
+                UPDATE clients SET total_spent = total_spent + COALESCE(NEW.total_cost, 0) - COALESCE(OLD.total_cost, 0)
+                WHERE id = NEW.client_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rentals_client_delete AFTER DELETE ON rentals
+            BEGIN
+                UPDATE clients SET rentals_count = rentals_count - 1,
+                                   total_spent = total_spent - COALESCE(OLD.total_cost, 0),
+                                   last_rental_at = (SELECT MAX(start_time) FROM rentals WHERE client_id = OLD.client_id)
+                WHERE id = OLD.client_id;
+            END
+        ''')
+        # Наробіток велосипеда додається при завершенні оренди (або вставці вже завершеної), а перевищення
+        # інтервалу обслуговування одразу ставить позначку service_due
+        seconds = "MAX(NEW.end_time - NEW.start_time, 0)"
+        odometer = f'''
+            UPDATE bikes SET rented_seconds = rented_seconds + {seconds},
+                             rentals_count = rentals_count + 1,
+                             service_due = service_due OR {service_due_sql(f"rented_seconds + {seconds}", "rentals_count + 1")}
+            WHERE id = NEW.bike_id;
+        '''
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_rentals_bike_complete AFTER UPDATE OF end_time ON rentals
+            WHEN OLD.end_time IS NULL AND NEW.end_time IS NOT NULL
+            BEGIN {odometer} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_rentals_bike_insert AFTER INSERT ON rentals
+            WHEN NEW.end_time IS NOT NULL
+            BEGIN {odometer} END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rentals_bike_delete AFTER DELETE ON rentals
+            WHEN OLD.end_time IS NOT NULL
+            BEGIN
+                UPDATE bikes SET rented_seconds = rented_seconds - MAX(OLD.end_time - OLD.start_time, 0),
+                                 rentals_count = rentals_count - 1
+                WHERE id = OLD.bike_id;
+            END
+        ''')
         self.db.commit()
 
-    def get_rental_history_for_client(self, client_id):
+    def migrate_epoch_timestamps(self):
+        """
+        Переводить стовпці часу старої бази з TEXT 'YYYY-MM-DD HH:MM:SS' (місцевий час) на INTEGER.
+        SQLite не змінює тип стовпця через ALTER, тому таблиця перебудовується в одній транзакції:
+        нова таблиця, копіювання з перетворенням, заміна. Старі індекси й тригери видаляються
+        разом зі старою таблицею і створюються заново в create_table.
+        Повертає True, якщо міграцію виконано.
+        """
+        if self.db.column_types("rentals").get("start_time") == "INTEGER":
+            return False
         cursor = self.db.get_cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            self.create_rentals_table(cursor, "rentals_epoch")
+            # Модифікатор 'utc' трактує рядок як місцевий час, як і datetime.timestamp()
+            cursor.execute('''
+                INSERT INTO rentals_epoch (id, client_id, bike_id, start_time, duration, end_time,
+                                           status, total_cost, discount, is_paid, created_at)
+                SELECT id, client_id, bike_id,
+                       CAST(strftime('%s', start_time, 'utc') AS INTEGER), duration,
+                       CAST(strftime('%s', end_time, 'utc') AS INTEGER),
+                       status, total_cost, discount, is_paid,
+                       CAST(strftime('%s', created_at, 'utc') AS INTEGER)
+                FROM rentals
+            ''')
+            cursor.execute("DROP VIEW IF EXISTS rentals_text")
+            cursor.execute("DROP TABLE rentals")
+            cursor.execute("ALTER TABLE rentals_epoch RENAME TO rentals")
+            if "last_rental_at" in self.db.column_types("clients"):
+                cursor.execute('''
+                    UPDATE clients SET last_rental_at = CAST(strftime('%s', last_rental_at, 'utc') AS INTEGER)
+                    WHERE typeof(last_rental_at) = 'text'
+                ''')
+            self.db.commit()
+            return True
+        except Exception as e:
+            self.db.connection.rollback()
+            print("Error migrating rental timestamps:", e)
+            raise
+
+    def row_to_rental(self, row):
+        return Rental(
+            row["id"], row["client_id"], row["bike_id"],
+            from_epoch(row["start_time"]), row["duration"], from_epoch(row["end_time"]),
+            row["status"], row["total_cost"], row["discount"],
+            from_epoch(row["created_at"])
+        )
+
+    def get_rental_history_for_client(self, client_id):
+        cursor = self.db.read_cursor()
         query = """
             SELECT r.*, b.model as bike_model 
             FROM rentals r
@@ -335,32 +1038,52 @@ class RentalDAO:
         rows = cursor.fetchall()
         rentals = []
         for row in rows:
-            rental = Rental(
-                row["id"],
-                row["client_id"],
-                row["bike_id"],
-                row["start_time"],
-                row["duration"],
-                row["end_time"],
-                row["status"],
-                row["total_cost"],
-                row["discount"],
-                row["created_at"]
-            )
+            rental = self.row_to_rental(row)
             rental.bike_model = row["bike_model"] if "bike_model" in row.keys() else ""
             rentals.append(rental)
         return rentals
 
+    def get_rental_history_page(self, client_id, limit=50, after=None):
+        """
+        Одна сторінка історії оренд клієнта (від новіших до старіших) з keyset-пагінацією.
+        after – курсор (start_time, id) останнього рядка попередньої сторінки.
+        Повертає (rentals, next_cursor); next_cursor дорівнює None, якщо це остання сторінка.
+        """
+        cursor = self.db.read_cursor()
+        query = """
+            SELECT r.*, b.model as bike_model 
+            FROM rentals r
+            LEFT JOIN bikes b ON r.bike_id = b.id
+            WHERE r.client_id = ?
+        """
+        values = [client_id]
+        if after is not None:
+            query += " AND (r.start_time, r.id) < (?, ?)"
+            values.extend(after)
+        query += " ORDER BY r.start_time DESC, r.id DESC LIMIT ?"
+        values.append(limit + 1)
+        cursor.execute(query, tuple(values))
+        rows = cursor.fetchall()
+        rentals = []
+        for row in rows[:limit]:
+            rental = self.row_to_rental(row)
+            rental.bike_model = row["bike_model"]
+            rentals.append(rental)
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = (rows[limit - 1]["start_time"], rows[limit - 1]["id"])
+        return rentals, next_cursor
+
     def get_income_today(self):
         try:
-            cursor = self.db.get_cursor()
+            cursor = self.db.read_cursor()
             today_str = datetime.now().strftime("%Y-%m-%d")
             query = """
                 SELECT SUM(total_cost) AS income 
                 FROM rentals 
-                WHERE status = 'Завершена' AND DATE(end_time) = ?
+                WHERE status = 'Завершена' AND end_time >= ? AND end_time < ?
             """
-            cursor.execute(query, (today_str,))
+            cursor.execute(query, day_bounds(today_str, today_str))
             row = cursor.fetchone()
             income = row["income"] if row["income"] is not None else 0
             return income
@@ -373,6 +1096,8 @@ class RentalDAO:
         try:
             cursor.execute("DELETE FROM rentals WHERE id = ?", (rental_id,))
             self.db.commit()
+            if cursor.rowcount > 0:
+                self.db.changes.emit("rental", rental_id, "delete")
             return True, "Оренду скасовано."
         except Exception as e:
             return False, str(e)
@@ -380,13 +1105,17 @@ class RentalDAO:
     def create_rental(self, client_id, bike_id, start_time_str, duration, discount):
         cursor = self.db.get_cursor()
         try:
-            price = self.calculate_rental_price(bike_id, duration, discount)
+            start_time = to_epoch(start_time_str)
+            if start_time is None:
+                return None, "Невірний формат часу початку оренди."
+            price = self.calculate_rental_price(bike_id, duration, discount, from_epoch(start_time))
             cursor.execute('''
                 INSERT INTO rentals (client_id, bike_id, start_time, duration, total_cost, discount, status)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (client_id, bike_id, start_time_str, duration, price, discount, "Активна"))
+            ''', (client_id, bike_id, start_time, duration, price, discount, "Активна"))
             rental_id = cursor.lastrowid
             self.db.commit()
+            self.db.changes.emit("rental", rental_id, "insert")
             self.bike_dao.update_bike_status(bike_id, "В оренді")
             return rental_id, "Оренду створено успішно."
         except Exception as e:
@@ -400,10 +1129,11 @@ class RentalDAO:
             if row is None:
                 return False, "Оренду не знайдено."
             bike_id = row["bike_id"]
-            end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            end_time = to_epoch(datetime.now())
             cursor.execute("UPDATE rentals SET status = ?, end_time = ? WHERE id = ?",
                            ("Завершена", end_time, rental_id))
             self.db.commit()
+            self.db.changes.emit("rental", rental_id, "update")
             self.bike_dao.update_bike_status(bike_id, "Доступний")
             return True, "Оренду завершено успішно."
         except Exception as e:
@@ -412,53 +1142,158 @@ class RentalDAO:
     def extend_rental(self, rental_id, additional_duration):
         cursor = self.db.get_cursor()
         try:
-            cursor.execute("SELECT duration FROM rentals WHERE id = ?", (rental_id,))
+            cursor.execute("SELECT start_time, duration, total_cost FROM rentals WHERE id = ?", (rental_id,))
             row = cursor.fetchone()
             if row:
-                new_duration = row[0] + additional_duration
+                new_duration = row["duration"] + additional_duration
                 cursor.execute("SELECT bike_id, discount FROM rentals WHERE id = ?", (rental_id,))
                 bike_info = cursor.fetchone()
                 if bike_info:
                     bike_id, discount = bike_info
-                    new_cost = self.calculate_rental_price(bike_id, new_duration, discount)
-                    cursor.execute("UPDATE rentals SET duration = ?, total_cost = ? WHERE id = ?",
-                                   (new_duration, new_cost, rental_id))
+                    # Додаткові години оплачуються за поточним тарифом від очікуваного завершення,
+                    # вже оплачений строк не переоцінюється
+                    extra = self.calculate_rental_price(bike_id, additional_duration, discount,
+                                                        from_epoch(row["start_time"] + row["duration"] * 3600))
+                    new_cost = round(row["total_cost"] + extra, 2)
+                    # Штрафні інтервали рахуються від очікуваного завершення: після продовження
+                    # лічильник зсувається разом із ним, і оплачена продовженням прострочка не штрафується
+                    cursor.execute('''
+                        UPDATE rentals SET duration = ?, total_cost = ?,
+                                           penalty_intervals_charged = MAX(penalty_intervals_charged - ?, 0)
+                        WHERE id = ?
+                    ''', (new_duration, new_cost, additional_duration * 3600 // PENALTY_INTERVAL, rental_id))
+                    # Чи перевищить велосипед інтервал обслуговування, якщо оренда триватиме весь новий строк
+                    cursor.execute(f'''
+                        SELECT service_due = 0 AND {service_due_sql("rented_seconds + ?", "rentals_count + 1")}
+                        FROM bikes WHERE id = ?
+                    ''', (new_duration * 3600, bike_id))
+                    due = cursor.fetchone()
                     self.db.commit()
+                    self.db.changes.emit("rental", rental_id, "update")
+                    if due and due[0]:
+                        return True, "Оренду продовжено успішно. Після повернення велосипед потребуватиме обслуговування."
                     return True, "Оренду продовжено успішно."
             return False, "Оренду не знайдено."
         except Exception as e:
             return False, str(e)
 
+    def get_activity_rows(self, rental_ids=None, limit=20):
+        """
+        Оренди з іменем клієнта й моделлю велосипеда для стрічки подій:
+        задані rental_ids або останні limit за id (зворотний обхід первинного ключа).
+        """
+        cursor = self.db.read_cursor()
+        query = '''
+            SELECT r.id, r.status, r.start_time, r.end_time, c.name AS client_name, b.model AS bike_model
+            FROM rentals r
+            LEFT JOIN clients c ON c.id = r.client_id
+            LEFT JOIN bikes b ON b.id = r.bike_id
+        '''
+        if rental_ids is None:
+            cursor.execute(query + " ORDER BY r.id DESC LIMIT ?", (limit,))
+        else:
+            placeholders = ", ".join("?" * len(rental_ids))
+            cursor.execute(query + f" WHERE r.id IN ({placeholders}) ORDER BY r.id", tuple(rental_ids))
+        return cursor.fetchall()
+
+    def get_by_id(self, rental_id):
+        cursor = self.db.get_cursor()
+        cursor.execute("SELECT * FROM rentals WHERE id = ?", (rental_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return self.row_to_rental(row)
+
+    def count_active(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT COUNT(*) FROM rentals WHERE status = 'Активна'")
+        return cursor.fetchone()[0]
+
     def get_active(self):
         cursor = self.db.get_cursor()
         cursor.execute("SELECT * FROM rentals WHERE status = 'Активна'")
-        rows = cursor.fetchall()
-        rentals = []
-        for row in rows:
-            rentals.append(Rental(
-                row["id"], row["client_id"], row["bike_id"],
-                row["start_time"], row["duration"], row["end_time"],
-                row["status"], row["total_cost"], row["discount"],
-                row["created_at"]
-            ))
-        return rentals
+        return [self.row_to_rental(row) for row in cursor.fetchall()]
+
+    def get_by_group(self, group_id):
+        cursor = self.db.get_cursor()
+        cursor.execute("SELECT * FROM rentals WHERE group_id = ? ORDER BY id", (group_id,))
+        return [self.row_to_rental(row) for row in cursor.fetchall()]
+
+    def get_due(self, moment, since=None):
+        """
+        Активні оренди, очікуваний час завершення яких настав до moment (datetime),
+        а якщо задано since – не раніше since.
+        Умова записана тим самим виразом, що й частковий індекс idx_rentals_active_due,
+        тому перевірка прострочених читає лише потрібні рядки індексу.
+        """
+        cursor = self.db.get_cursor()
+        query = "SELECT * FROM rentals WHERE status = 'Активна' AND start_time + duration * 3600 <= ?"
+        values = [to_epoch(moment)]
+        if since is not None:
+            query += " AND start_time + duration * 3600 > ?"
+            values.append(to_epoch(since))
+        query += " ORDER BY start_time + duration * 3600"
+        cursor.execute(query, tuple(values))
+        return [self.row_to_rental(row) for row in cursor.fetchall()]
+
+    def accrue_overdue_penalties(self, moment, interval_seconds=PENALTY_INTERVAL, rate=1.2):
+        """
+        Нараховує штраф за кожен повний інтервал прострочки (interval_seconds) активних оренд
+        на момент moment: rate × погодинна ціна велосипеда за інтервал.
+        Усі оренди оновлюються одним UPDATE в одній транзакції; penalty_intervals_charged
+        зберігає кількість уже нарахованих інтервалів, тому кожен інтервал оплачується один раз.
+        Повертає змінені рядки (id, client_id, bike_id, penalty_intervals_charged, penalty, total_cost),
+        де penalty – загальна сума штрафу за оренду.
+        """
+        cursor = self.db.get_cursor()
+        now = to_epoch(moment)
+        try:
+            cursor.execute('''
+                UPDATE rentals SET
+                    total_cost = total_cost + ((? - (start_time + duration * 3600)) / ? - penalty_intervals_charged)
+                                 * (SELECT price_per_hour FROM bikes WHERE bikes.id = rentals.bike_id) * ?,
+                    penalty_intervals_charged = (? - (start_time + duration * 3600)) / ?
+                WHERE status = 'Активна'
+                  AND start_time + duration * 3600 <= ? - ?
+                  AND (? - (start_time + duration * 3600)) / ? > penalty_intervals_charged
+                RETURNING id, client_id, bike_id, penalty_intervals_charged,
+                          penalty_intervals_charged * (SELECT price_per_hour FROM bikes WHERE bikes.id = rentals.bike_id)
+                          * ? AS penalty,
+                          total_cost
+            ''', (now, interval_seconds, rate, now, interval_seconds, now, interval_seconds,
+                  now, interval_seconds, rate))
+            rows = cursor.fetchall()
+            self.db.commit()
+        except Exception as e:
+            self.db.connection.rollback()
+            print("Error accruing overdue penalties:", e)
+            return []
+        with self.db.changes.batch():
+            for row in rows:
+                self.db.changes.emit("rental", row["id"], "update")
+        return rows
 
-    def calculate_rental_price(self, bike_id, duration, discount):
+    def quote_rental(self, bike_id, duration, discount, moment=None):
+        """
+        (вартість, коефіцієнт) оренди велосипеда на duration годин від moment (типово – зараз)
+        за динамічним тарифом PricingEngine; None, якщо велосипеда немає.
+        """
         cursor = self.db.get_cursor()
-        cursor.execute("SELECT price_per_hour FROM bikes WHERE id = ?", (bike_id,))
+        cursor.execute("SELECT price_per_hour, type FROM bikes WHERE id = ?", (bike_id,))
         row = cursor.fetchone()
         if row:
-            base_price = row[0]
-            total = base_price * duration
-            if discount:
-                total -= total * (discount / 100.0)
-            return round(total, 2)
+            return self.pricing.quote(row["price_per_hour"], row["type"], duration, discount,
+                                      parse_datetime(moment) or datetime.now())
         return None
 
+    def calculate_rental_price(self, bike_id, duration, discount, moment=None):
+        quote = self.quote_rental(bike_id, duration, discount, moment)
+        return quote[0] if quote else None
+
     def update_total_cost(self, rental_id, new_total):
-        cursor = self.db.get_cursor()
-        cursor.execute("UPDATE rentals SET total_cost = ? WHERE id = ?", (new_total, rental_id))
-        self.db.commit()
+        self.db.write(lambda cursor: cursor.execute("UPDATE rentals SET total_cost = ? WHERE id = ?",
+                                                    (new_total, rental_id)))
+        self.db.changes.emit("rental", rental_id, "update")
 
 
 # ===== DAO для рахунків (Invoice) =====
@@ -476,11 +1311,65 @@ class InvoiceDAO:
                 invoice_date DATETIME DEFAULT (datetime('now','localtime')),
                 amount REAL,
                 status TEXT DEFAULT 'pending',
+                group_id INTEGER,
                 FOREIGN KEY(Rentals) REFERENCES rentals(id)
             )
         ''')
+        # group_id заповнюється для спільного рахунку групової оренди
+        self.db.add_column_if_missing("invoices", "group_id", "INTEGER")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_rental ON invoices(Rentals)")
         self.db.commit()
 
+    def iter_invoices(self, start_date, end_date, batch_size=500):
+        """
+        Потоково повертає рахунки за орендами, що почалися в межах [start_date, end_date],
+        у вигляді словників для друку: дані рахунку, клієнта та рядки lines (оренди рахунку;
+        для групової оренди – усі оренди групи). Рядки дочитуються одним запитом на порцію.
+        """
+        cursor = self.db.read_cursor()
+        cursor.execute('''
+            SELECT i.id, i.invoice_date, i.amount, i.status, i.group_id, i.Rentals AS rental_id,
+                   c.name AS client_name, c.phone AS client_phone, c.document AS client_document
+            FROM rentals r
+            JOIN invoices i ON i.Rentals = r.id
+            LEFT JOIN clients c ON c.id = r.client_id
+            WHERE r.start_time >= ? AND r.start_time < ?
+            ORDER BY r.start_time, i.id
+        ''', day_bounds(start_date, end_date))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            invoices = [dict(row) for row in rows]
+            lines = self.get_invoice_lines(
+                [invoice["rental_id"] for invoice in invoices if invoice["group_id"] is None],
+                list({invoice["group_id"] for invoice in invoices if invoice["group_id"] is not None}))
+            for invoice in invoices:
+                key = ("group", invoice["group_id"]) if invoice["group_id"] is not None else ("rental", invoice["rental_id"])
+                invoice["lines"] = lines.get(key, [])
+                yield invoice
+
+    def get_invoice_lines(self, rental_ids, group_ids):
+        """Рядки рахунків: {("rental", id) або ("group", id): [оренди]}."""
+        lines = {}
+        cursor = self.db.read_cursor()
+        query = '''
+            SELECT r.id AS rental_id, r.group_id, b.model AS bike_model, b.serial_number,
+                   r.start_time, r.duration, r.discount, r.total_cost
+            FROM rentals r
+            LEFT JOIN bikes b ON b.id = r.bike_id
+        '''
+        for column, ids in (("id", rental_ids), ("group_id", group_ids)):
+            if not ids:
+                continue
+            cursor.execute(query + f" WHERE r.{column} IN ({', '.join('?' * len(ids))}) ORDER BY r.id", ids)
+            for row in cursor.fetchall():
+                line = dict(row)
+                line["start_time"] = from_epoch(line["start_time"])
+                key = ("group", row["group_id"]) if column == "group_id" else ("rental", row["rental_id"])
+                lines.setdefault(key, []).append(line)
+        return lines
+
     def generate_invoice(self, rental_id):
         cursor = self.db.get_cursor()
         cursor.execute("SELECT total_cost FROM rentals WHERE id = ?", (rental_id,))
@@ -493,6 +1382,7 @@ class InvoiceDAO:
             cursor.execute("INSERT INTO invoices (Rentals, amount) VALUES (?, ?)", (rental_id, amount))
             invoice_id = cursor.lastrowid
             self.db.commit()
+            self.db.changes.emit("invoice", invoice_id, "insert")
             return invoice_id, "Рахунок створено."
         except Exception as e:
             return None, str(e)
@@ -500,6 +1390,18 @@ class InvoiceDAO:
 
 # ===== DAO для платежів =====
 
+# Допустимі способи оплати; ключі підсумків розрахунків за днями
+PAYMENT_METHODS = ("Карткою", "Готівкою")
+UTILIZATION_REPORT = "Завантаженість за годинами тижня"
+FORECAST_REPORT = "Прогноз попиту за типами"
+CLIENT_REPORT = "Аналіз клієнтської бази"
+REPORT_TYPES = ("Оренди за період", "Аналіз використання велосипедів", "Дохід за періодами",
+                CLIENT_REPORT, "Популярність типів велосипедів", UTILIZATION_REPORT,
+                FORECAST_REPORT)
+# Звіти, що обчислюються в Python над усією історією періоду: їх не переглядають «наживо» з таймера
+COMPUTED_REPORTS = (CLIENT_REPORT, UTILIZATION_REPORT, FORECAST_REPORT)
+
+
 class PaymentDAO:
     def __init__(self, db: Database):
         self.db = db
@@ -518,23 +1420,376 @@ class PaymentDAO:
                 FOREIGN KEY(rental_id) REFERENCES rentals(id)
             )
         ''')
+        # Індекси журналу платежів: за датою та за способом оплати і датою
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_date ON payments(payment_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_method_date ON payments(payment_method, payment_date)")
+        # Підсумки за днями та способами оплати, які add_payment оновлює разом із самим платежем
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'payment_settlements'")
+        settlements_exist = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS payment_settlements (
+                day TEXT NOT NULL,
+                payment_method TEXT NOT NULL,
+                total REAL NOT NULL DEFAULT 0,
+                payments_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, payment_method)
+            ) WITHOUT ROWID
+        ''')
+        if not settlements_exist:
+            # Одноразове заповнення підсумків з уже проведених платежів старої бази
+            cursor.execute('''
+                INSERT INTO payment_settlements (day, payment_method, total, payments_count)
+                SELECT DATE(payment_date), COALESCE(payment_method, ''), SUM(amount), COUNT(*)
+                FROM payments WHERE DATE(payment_date) IS NOT NULL
+                GROUP BY DATE(payment_date), COALESCE(payment_method, '')
+            ''')
         self.db.commit()
 
+    def insert_payment(self, cursor, invoice_id, rental_id, amount, payment_method):
+        """
+        Записує платіж і додає його до підсумку дня в поточній транзакції (без commit).
+        Повертає id платежу.
+        """
+        payment_date = datetime.now().strftime(DATETIME_FORMAT)
+        cursor.execute('''
+            INSERT INTO payments (invoice_id, rental_id, amount, payment_date, payment_method)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (invoice_id, rental_id, amount, payment_date, payment_method))
+        payment_id = cursor.lastrowid
+        cursor.execute('''
+            INSERT INTO payment_settlements (day, payment_method, total, payments_count)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (day, payment_method) DO UPDATE SET
+                total = total + excluded.total,
+                payments_count = payments_count + 1
+        ''', (payment_date[:10], payment_method, amount))
+        return payment_id
+
     def add_payment(self, invoice_id, rental_id, amount, payment_method):
+        if payment_method not in PAYMENT_METHODS:
+            return False, "Невідомий спосіб оплати."
+        try:
+            payment_id = self.db.write(
+                lambda cursor: self.insert_payment(cursor, invoice_id, rental_id, amount, payment_method))
+            self.db.changes.emit("payment", payment_id, "insert")
+            return True, "Платіж зафіксовано."
+        except Exception as e:
+            return False, str(e)
+
+    def get_payments(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT * FROM payments")
+        return cursor.fetchall()
+
+    def get_ledger_page(self, start_date=None, end_date=None, payment_method=None, limit=100, after=None):
+        """
+        Сторінка журналу платежів (від новіших до старіших) з фільтрами за датами 'YYYY-MM-DD'
+        та способом оплати. after – курсор (payment_date, id) останнього рядка попередньої сторінки.
+        Повертає (rows, next_cursor); next_cursor дорівнює None, якщо це остання сторінка.
+        """
+        conditions = []
+        values = []
+        if payment_method is not None:
+            conditions.append("payment_method = ?")
+            values.append(payment_method)
+        if start_date is not None:
+            conditions.append("payment_date >= ?")
+            values.append(start_date)
+        if end_date is not None:
+            conditions.append("payment_date < DATE(?, '+1 day')")
+            values.append(end_date)
+        if after is not None:
+            conditions.append("(payment_date, id) < (?, ?)")
+            values.extend(after)
+        query = "SELECT id, invoice_id, rental_id, amount, payment_date, payment_method FROM payments"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY payment_date DESC, id DESC LIMIT ?"
+        values.append(limit + 1)
+        cursor = self.db.read_cursor()
+        cursor.execute(query, tuple(values))
+        rows = cursor.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1]["payment_date"], rows[-1]["id"])
+        return rows, next_cursor
+
+    def get_settlements(self, start_date, end_date, payment_method=None):
+        """Підсумки за кожен день і спосіб оплати в межах [start_date, end_date]."""
+        query = '''
+            SELECT day, payment_method, total, payments_count FROM payment_settlements
+            WHERE day >= ? AND day <= ?
+        '''
+        values = [start_date, end_date]
+        if payment_method is not None:
+            query += " AND payment_method = ?"
+            values.append(payment_method)
+        query += " ORDER BY day, payment_method"
+        cursor = self.db.read_cursor()
+        cursor.execute(query, tuple(values))
+        return cursor.fetchall()
+
+    def get_settlement_totals(self, start_date, end_date):
+        """Суми та кількість платежів за період за кожним способом оплати (закриття зміни/місяця)."""
+        cursor = self.db.read_cursor()
+        cursor.execute('''
+            SELECT payment_method, ROUND(SUM(total), 2) AS total, SUM(payments_count) AS payments_count
+            FROM payment_settlements
+            WHERE day >= ? AND day <= ?
+            GROUP BY payment_method
+            ORDER BY payment_method
+        ''', (start_date, end_date))
+        return {row["payment_method"]: (row["total"], row["payments_count"]) for row in cursor.fetchall()}
+
+
+# ===== DAO для групових оренд =====
+
+class RentalGroupDAO:
+    """
+    Групові оренди: кілька велосипедів одного клієнта оформлюються, продовжуються та завершуються
+    однією транзакцією, а на всю групу виписується один спільний рахунок.
+    """
+
+    def __init__(self, db: Database, payment_dao: PaymentDAO, pricing: PricingEngine):
+        self.db = db
+        self.payment_dao = payment_dao
+        self.pricing = pricing
+
+    def create_table(self):
+        cursor = self.db.get_cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rental_groups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_id INTEGER NOT NULL,
+                invoice_id INTEGER,
+                created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                FOREIGN KEY(client_id) REFERENCES clients(id),
+                FOREIGN KEY(invoice_id) REFERENCES invoices(id)
+            )
+        ''')
+        self.db.commit()
+
+    @staticmethod
+    def placeholders(values):
+        return ", ".join("?" * len(values))
+
+    def create_group(self, client_id, bike_ids, start_time_str, duration, discount, payment_method=None):
+        """
+        Створює оренди для всіх bike_ids, переводить велосипеди в статус "В оренді" та виписує
+        спільний рахунок (і, якщо задано payment_method, платіж на всю суму) в одній транзакції.
+        Повертає (group_id, повідомлення); якщо хоч один велосипед недоступний, нічого не змінюється.
+        """
+        bike_ids = list(dict.fromkeys(bike_ids))
+        if not bike_ids:
+            return None, "Не вибрано жодного велосипеда."
+        start_time = to_epoch(start_time_str)
+        if start_time is None:
+            return None, "Невірний формат часу початку оренди."
+        marks = self.placeholders(bike_ids)
+        cursor = self.db.get_cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Тариф – той самий, що показала кнопка розрахунку: завантаженість до видачі велосипедів групи
+            cursor.execute(f"SELECT id, price_per_hour, type FROM bikes WHERE id IN ({marks})", bike_ids)
+            moment = from_epoch(start_time)
+            costs = {row["id"]: self.pricing.quote(row["price_per_hour"], row["type"], duration, discount, moment)[0]
+                     for row in cursor.fetchall()}
+            cursor.execute(f"UPDATE bikes SET status = 'В оренді' WHERE id IN ({marks}) AND status = 'Доступний'",
+                           bike_ids)
+            if cursor.rowcount != len(bike_ids):
+                self.db.connection.rollback()
+                return None, "Деякі з вибраних велосипедів уже недоступні."
+            cursor.execute("INSERT INTO rental_groups (client_id) VALUES (?)", (client_id,))
+            group_id = cursor.lastrowid
+            costs = [costs[bike_id] for bike_id in bike_ids]
+            cursor.executemany('''
+                INSERT INTO rentals (client_id, bike_id, start_time, duration, total_cost, discount, status, group_id)
+                VALUES (?, ?, ?, ?, ?, ?, 'Активна', ?)
+            ''', [(client_id, bike_id, start_time, duration, cost, discount, group_id)
+                  for bike_id, cost in zip(bike_ids, costs)])
+            cursor.execute("SELECT id FROM rentals WHERE group_id = ? ORDER BY id", (group_id,))
+            rental_ids = [row["id"] for row in cursor.fetchall()]
+            total = round(sum(costs), 2)
+            # Спільний рахунок посилається на першу оренду групи та на саму групу
+            cursor.execute("INSERT INTO invoices (Rentals, amount, group_id) VALUES (?, ?, ?)",
+                           (rental_ids[0], total, group_id))
+            invoice_id = cursor.lastrowid
+            cursor.execute("UPDATE rental_groups SET invoice_id = ? WHERE id = ?", (invoice_id, group_id))
+            payment_id = None
+            if payment_method:
+                if payment_method not in PAYMENT_METHODS:
+                    raise ValueError("Невідомий спосіб оплати.")
+                payment_id = self.payment_dao.insert_payment(cursor, invoice_id, rental_ids[0], total, payment_method)
+            self.db.commit()
+        except Exception as e:
+            self.db.connection.rollback()
+            return None, str(e)
+        with self.db.changes.batch():
+            for rental_id in rental_ids:
+                self.db.changes.emit("rental", rental_id, "insert")
+            for bike_id in bike_ids:
+                self.db.changes.emit("bike", bike_id, "update")
+            self.db.changes.emit("invoice", invoice_id, "insert")
+            if payment_id is not None:
+                self.db.changes.emit("payment", payment_id, "insert")
+        return group_id, f"Групову оренду створено: {len(bike_ids)} велосипедів на суму {total:.2f} грн."
+
+    def extend_rentals(self, rental_ids, additional_duration):
+        """Продовжує всі активні оренди rental_ids та оновлює суми спільних рахунків їхніх груп."""
+        rental_ids = list(dict.fromkeys(rental_ids))
+        if not rental_ids:
+            return False, "Не вибрано жодної оренди."
+        marks = self.placeholders(rental_ids)
+        cursor = self.db.get_cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f'''
+                SELECT r.id, r.start_time, r.duration, r.discount, r.total_cost, r.group_id, b.price_per_hour, b.type
+                FROM rentals r JOIN bikes b ON b.id = r.bike_id
+                WHERE r.id IN ({marks}) AND r.status = 'Активна'
+            ''', rental_ids)
+            rows = cursor.fetchall()
+            if len(rows) != len(rental_ids):
+                self.db.connection.rollback()
+                return False, "Деякі з вибраних оренд уже завершено або не знайдено."
+            updates = []
+            for row in rows:
+                # Як і в RentalDAO.extend_rental: додаткові години – за тарифом від очікуваного завершення
+                extra, _ = self.pricing.quote(row["price_per_hour"], row["type"], additional_duration, row["discount"],
+                                              from_epoch(row["start_time"] + row["duration"] * 3600))
+                updates.append((row["duration"] + additional_duration, round(row["total_cost"] + extra, 2), row["id"]))
+            # Як і для однієї оренди, лічильник штрафних інтервалів зсувається разом з очікуваним завершенням
+            cursor.executemany('''
+                UPDATE rentals SET duration = ?, total_cost = ?,
+                                   penalty_intervals_charged = MAX(penalty_intervals_charged - ?, 0)
+                WHERE id = ?
+            ''', [(duration, cost, additional_duration * 3600 // PENALTY_INTERVAL, rental_id)
+                  for duration, cost, rental_id in updates])
+            group_ids = list({row["group_id"] for row in rows if row["group_id"] is not None})
+            invoice_ids = []
+            if group_ids:
+                cursor.execute(f'''
+                    UPDATE invoices SET amount = (SELECT ROUND(SUM(total_cost), 2) FROM rentals
+                                                  WHERE rentals.group_id = invoices.group_id)
+                    WHERE group_id IN ({self.placeholders(group_ids)}) AND status = 'pending'
+                    RETURNING id
+                ''', group_ids)
+                invoice_ids = [row["id"] for row in cursor.fetchall()]
+            self.db.commit()
+        except Exception as e:
+            self.db.connection.rollback()
+            return False, str(e)
+        with self.db.changes.batch():
+            for rental_id in rental_ids:
+                self.db.changes.emit("rental", rental_id, "update")
+            for invoice_id in invoice_ids:
+                self.db.changes.emit("invoice", invoice_id, "update")
+        return True, f"Продовжено оренд: {len(rental_ids)}."
+
+    def complete_rentals(self, rental_ids):
+        """Завершує всі активні оренди rental_ids і звільняє їхні велосипеди."""
+        rental_ids = list(dict.fromkeys(rental_ids))
+        if not rental_ids:
+            return False, "Не вибрано жодної оренди."
+        cursor = self.db.get_cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f'''
+                UPDATE rentals SET status = 'Завершена', end_time = ?
+                WHERE id IN ({self.placeholders(rental_ids)}) AND status = 'Активна'
+                RETURNING bike_id
+            ''', [to_epoch(datetime.now())] + rental_ids)
+            bike_ids = [row["bike_id"] for row in cursor.fetchall()]
+            if len(bike_ids) != len(rental_ids):
+                self.db.connection.rollback()
+                return False, "Деякі з вибраних оренд уже завершено або не знайдено."
+            cursor.execute(f"UPDATE bikes SET status = 'Доступний' WHERE id IN ({self.placeholders(bike_ids)})",
+                           bike_ids)
+            self.db.commit()
+        except Exception as e:
+            self.db.connection.rollback()
+            return False, str(e)
+        with self.db.changes.batch():
+            for rental_id in rental_ids:
+                self.db.changes.emit("rental", rental_id, "update")
+            for bike_id in bike_ids:
+                self.db.changes.emit("bike", bike_id, "update")
+        return True, f"Завершено оренд: {len(rental_ids)}."
+
+    def get_group(self, group_id):
+        cursor = self.db.get_cursor()
+        cursor.execute("SELECT id, client_id, invoice_id, created_at FROM rental_groups WHERE id = ?", (group_id,))
+        return cursor.fetchone()
+
+
+# ===== DAO для бронювань =====
+
+class ReservationDAO:
+    def __init__(self, db: Database):
+        self.db = db
+
+    def create_table(self):
+        cursor = self.db.get_cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reservations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_id INTEGER NOT NULL,
+                bike_id INTEGER NOT NULL,
+                start_time DATETIME NOT NULL,
+                end_time DATETIME NOT NULL,
+                status TEXT DEFAULT 'Активна',
+                created_at DATETIME DEFAULT (datetime('now','localtime')),
+                FOREIGN KEY(client_id) REFERENCES clients(id),
+                FOREIGN KEY(bike_id) REFERENCES bikes(id)
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_status_end ON reservations(status, end_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_bike_start ON reservations(bike_id, start_time)")
+        self.db.commit()
+
+    def add_reservation(self, client_id, bike_id, start_time_str, end_time_str):
         cursor = self.db.get_cursor()
         try:
             cursor.execute('''
-                INSERT INTO payments (invoice_id, rental_id, amount, payment_method)
+                INSERT INTO reservations (client_id, bike_id, start_time, end_time)
                 VALUES (?, ?, ?, ?)
-            ''', (invoice_id, rental_id, amount, payment_method))
+            ''', (client_id, bike_id, start_time_str, end_time_str))
+            reservation_id = cursor.lastrowid
             self.db.commit()
-            return True, "Платіж зафіксовано."
+            self.db.changes.emit("reservation", reservation_id, "insert")
+            return reservation_id, "Бронювання створено."
         except Exception as e:
-            return False, str(e)
+            return None, str(e)
 
-    def get_payments(self):
+    def set_status(self, reservation_id, status, current_status="Активна"):
         cursor = self.db.get_cursor()
-        cursor.execute("SELECT * FROM payments")
+        try:
+            cursor.execute("UPDATE reservations SET status = ? WHERE id = ? AND status = ?",
+                           (status, reservation_id, current_status))
+            self.db.commit()
+            if cursor.rowcount > 0:
+                self.db.changes.emit("reservation", reservation_id, "update")
+            return cursor.rowcount > 0
+        except Exception as e:
+            print("Error updating reservation status:", e)
+            return False
+
+    def get_upcoming(self, now_str):
+        """Активні бронювання, що ще не закінчилися."""
+        cursor = self.db.get_cursor()
+        cursor.execute('''
+            SELECT id, client_id, bike_id, start_time, end_time FROM reservations
+            WHERE status = 'Активна' AND end_time > ?
+        ''', (now_str,))
+        return cursor.fetchall()
+
+    def get_overlapping(self, bike_id, start_time_str, end_time_str):
+        cursor = self.db.get_cursor()
+        cursor.execute('''
+            SELECT id, client_id FROM reservations
+            WHERE bike_id = ? AND status = 'Активна' AND start_time < ? AND end_time > ?
+        ''', (bike_id, end_time_str, start_time_str))
         return cursor.fetchall()
 
 
@@ -545,10 +1800,20 @@ class BikeRentalModel:
         self.db = Database(db_path)
         self.client_dao = ClientDAO(self.db)
         self.bike_dao = BikeDAO(self.db)
-        self.rental_dao = RentalDAO(self.db, self.bike_dao)
+        self.pricing = PricingEngine(self.db)
+        self.rental_dao = RentalDAO(self.db, self.bike_dao, self.pricing)
         self.invoice_dao = InvoiceDAO(self.db)
         self.payment_dao = PaymentDAO(self.db)
+        self.reservation_dao = ReservationDAO(self.db)
+        self.rental_group_dao = RentalGroupDAO(self.db, self.payment_dao, self.pricing)
+        self.reservation_index = ReservationIndex()
+        self.changes = self.db.changes
+        self.backups = BackupManager(self.db)
+        self.replication = Replicator(self.db)
+        self.activity = RecentActivity()
         self.create_tables()
+        self.rebuild_reservation_index()
+        self.seed_recent_activity()
 
     def create_tables(self):
         self.client_dao.create_table()
@@ -556,11 +1821,19 @@ class BikeRentalModel:
         self.rental_dao.create_table()
         self.invoice_dao.create_table()
         self.payment_dao.create_table()
+        self.reservation_dao.create_table()
+        self.rental_group_dao.create_table()
+        self.client_dao.migrate_aggregates()
+        self.bike_dao.migrate_odometers()
+        self.pricing.create_tables()
 
     # Методи для роботи з клієнтами
     def add_client(self, name, phone, email, document):
         return self.client_dao.add_client(name, phone, email, document)
 
+    def import_clients(self, rows):
+        return self.client_dao.import_clients(rows)
+
     def update_client(self, client_id, name=None, phone=None, email=None, document=None):
         return self.client_dao.update_client(client_id, name, phone, email, document)
 
@@ -570,16 +1843,34 @@ class BikeRentalModel:
     def get_all_clients(self):
         return self.client_dao.get_all()
 
+    def get_client(self, client_id):
+        return self.client_dao.get_by_id(client_id)
+
+    def count_clients(self):
+        return self.client_dao.count()
+
     def search_clients(self, search_text):
         return self.client_dao.search(search_text)
 
+    def search_clients_prefix(self, prefix, limit=20):
+        return self.client_dao.search_prefix(prefix, limit)
+
     def get_client_rental_history(self, client_id):
         return self.rental_dao.get_rental_history_for_client(client_id)
 
+    def get_client_rental_history_page(self, client_id, limit=50, after=None):
+        return self.rental_dao.get_rental_history_page(client_id, limit, after)
+
+    def get_client_aggregates(self, client_id):
+        return self.client_dao.get_aggregates(client_id)
+
     # Методи для роботи з велосипедами
     def add_bike(self, model, serial_number, bike_type, price_per_hour):
         return self.bike_dao.add_bike(model, serial_number, bike_type, price_per_hour)
 
+    def import_bikes(self, rows):
+        return self.bike_dao.import_bikes(rows)
+
     def update_bike(self, bike_id, model=None, serial_number=None, bike_type=None, status=None, price_per_hour=None):
         return self.bike_dao.update_bike(bike_id, model, serial_number, bike_type, status, price_per_hour)
 
@@ -589,41 +1880,329 @@ class BikeRentalModel:
     def get_all_bikes(self):
         return self.bike_dao.get_all()
 
+    def get_bike(self, bike_id):
+        return self.bike_dao.get_by_id(bike_id)
+
+    def count_available_bikes(self):
+        return self.bike_dao.count_available()
+
+    # Наробіток і обслуговування велосипедів
+    def get_bike_odometer(self, bike_id):
+        return self.bike_dao.get_odometer(bike_id)
+
+    def get_bikes_due_for_service(self, limit=50):
+        return self.bike_dao.get_due_for_service(limit)
+
+    def count_bikes_due_for_service(self):
+        return self.bike_dao.count_due_for_service()
+
+    def get_service_intervals(self):
+        return self.bike_dao.get_service_intervals()
+
+    def set_service_interval(self, bike_type, hours, rentals):
+        return self.bike_dao.set_service_interval(bike_type, hours, rentals)
+
     def get_available_bikes(self):
         return self.bike_dao.get_available()
 
     def search_bikes(self, search_text, bike_type, status):
         return self.bike_dao.search(search_text, bike_type, status)
 
+    def search_available_bikes_prefix(self, prefix, limit=20):
+        return self.bike_dao.search_available_prefix(prefix, limit)
+
     # Методи для роботи з орендою
     def get_income_today(self):
         return self.rental_dao.get_income_today()
 
     def create_rental(self, client_id, bike_id, start_time_str, duration, discount):
-        return self.rental_dao.create_rental(client_id, bike_id, start_time_str, duration, discount)
+        start = parse_datetime(start_time_str)
+        own_reservations = []
+        if start is not None:
+            end = start + timedelta(hours=duration)
+            if self.reservation_index.has_conflict(bike_id, start, end):
+                own_reservations = self.get_client_reservations_in_way(client_id, bike_id, start, end)
+                if own_reservations is None:
+                    return None, "Велосипед заброньовано або зайнятий на цей час."
+        rental_id, msg = self.rental_dao.create_rental(client_id, bike_id, start_time_str, duration, discount)
+        if rental_id:
+            # Бронювання виконані лише тоді, коли оренду справді створено
+            for row in own_reservations:
+                self.reservation_dao.set_status(row["id"], "Виконана")
+                self.reservation_index.remove(("reservation", row["id"]))
+        if rental_id and start is not None:
+            self.reservation_index.add(bike_id, start, end, ("rental", rental_id))
+        if rental_id:
+            self.record_activity("create", [rental_id])
+        return rental_id, msg
 
     def complete_rental(self, rental_id):
-        return self.rental_dao.complete_rental(rental_id)
+        result = self.rental_dao.complete_rental(rental_id)
+        if result[0]:
+            self.reservation_index.remove(("rental", rental_id))
+            self.record_activity("complete", [rental_id])
+        return result
 
     def extend_rental(self, rental_id, additional_duration):
-        return self.rental_dao.extend_rental(rental_id, additional_duration)
+        interval = self.reservation_index.get_interval(("rental", rental_id))
+        if interval is not None:
+            bike_id, start, end = interval
+            # Продовження не повинно заходити на чуже бронювання
+            self.reservation_index.remove(("rental", rental_id))
+            new_end = end + timedelta(hours=additional_duration)
+            if self.reservation_index.has_conflict(bike_id, start, new_end):
+                self.reservation_index.add(bike_id, start, end, ("rental", rental_id))
+                return False, "Продовження неможливе: велосипед заброньовано на цей час."
+            result = self.rental_dao.extend_rental(rental_id, additional_duration)
+            self.reservation_index.add(bike_id, start, new_end if result[0] else end, ("rental", rental_id))
+        else:
+            result = self.rental_dao.extend_rental(rental_id, additional_duration)
+        if result[0]:
+            self.record_activity("extend", [rental_id])
+        return result
 
     def delete_rental(self, rental_id):
-        return self.rental_dao.delete_rental(rental_id)
+        result = self.rental_dao.delete_rental(rental_id)
+        if result[0]:
+            self.reservation_index.remove(("rental", rental_id))
+        return result
 
     def get_active_rentals(self):
         return self.rental_dao.get_active()
 
-    def calculate_rental_price(self, bike_id, duration, discount):
-        return self.rental_dao.calculate_rental_price(bike_id, duration, discount)
+    # Методи для роботи з груповими орендами
+    def create_group_rental(self, client_id, bike_ids, start_time_str, duration, discount, payment_method=None):
+        start = parse_datetime(start_time_str)
+        if start is not None:
+            end = start + timedelta(hours=duration)
+            busy = [bike_id for bike_id in bike_ids if self.reservation_index.has_conflict(bike_id, start, end)]
+            if busy:
+                return None, f"Велосипеди заброньовано або зайняті на цей час (ID: {', '.join(map(str, busy))})."
+        group_id, msg = self.rental_group_dao.create_group(client_id, bike_ids, start_time_str, duration, discount,
+                                                           payment_method)
+        if group_id:
+            rentals = self.rental_dao.get_by_group(group_id)
+            for rental in rentals:
+                end = rental.start_time + timedelta(hours=rental.duration)
+                self.reservation_index.add(rental.bike_id, rental.start_time, end, ("rental", rental.id))
+            self.record_activity("create", [rental.id for rental in rentals])
+        return group_id, msg
+
+    def get_group_rentals(self, group_id):
+        return self.rental_dao.get_by_group(group_id)
+
+    def extend_rentals(self, rental_ids, additional_duration):
+        """Продовжує кілька оренд однією транзакцією, якщо жодне продовження не заходить на бронювання."""
+        intervals = {}
+        for rental_id in rental_ids:
+            interval = self.reservation_index.get_interval(("rental", rental_id))
+            if interval is not None:
+                intervals[rental_id] = interval
+                self.reservation_index.remove(("rental", rental_id))
+
+        def restore(extra):
+            for rental_id, (bike_id, start, end) in intervals.items():
+                self.reservation_index.add(bike_id, start, end + extra, ("rental", rental_id))
+
+        extra = timedelta(hours=additional_duration)
+        if any(self.reservation_index.has_conflict(bike_id, start, end + extra)
+               for bike_id, start, end in intervals.values()):
+            restore(timedelta(0))
+            return False, "Продовження неможливе: деякі велосипеди заброньовано на цей час."
+        result = self.rental_group_dao.extend_rentals(rental_ids, additional_duration)
+        restore(extra if result[0] else timedelta(0))
+        if result[0]:
+            self.record_activity("extend", rental_ids)
+        return result
+
+    def complete_rentals(self, rental_ids):
+        result = self.rental_group_dao.complete_rentals(rental_ids)
+        if result[0]:
+            for rental_id in rental_ids:
+                self.reservation_index.remove(("rental", rental_id))
+            self.record_activity("complete", rental_ids)
+        return result
+
+    def get_due_rentals(self, moment, since=None):
+        return self.rental_dao.get_due(moment, since)
+
+    # Стрічка останніх подій оренд
+    def seed_recent_activity(self):
+        """Заповнює буфер останніми орендами за id: завершені – подією завершення, решта – створення."""
+        events = []
+        for row in self.rental_dao.get_activity_rows(limit=self.activity.size):
+            completed = row["status"] == "Завершена" and row["end_time"] is not None
+            events.append((row["id"], "complete" if completed else "create", row["client_name"] or "",
+                           row["bike_model"] or "", from_epoch(row["end_time"] if completed else row["start_time"])))
+        self.activity.seed(events)
+
+    def record_activity(self, kind, rental_ids):
+        """Додає до буфера подію kind для кожної з оренд rental_ids з поточним часом."""
+        if not rental_ids:
+            return
+        moment = datetime.now()
+        self.activity.record([(row["id"], kind, row["client_name"] or "", row["bike_model"] or "", moment)
+                              for row in self.rental_dao.get_activity_rows(list(rental_ids))])
+
+    def get_recent_activity(self):
+        """Події від найновішої до найстарішої та версія буфера (див. activity.RecentActivity)."""
+        return self.activity.snapshot()
+
+    def accrue_overdue_penalties(self, moment):
+        return self.rental_dao.accrue_overdue_penalties(moment)
+
+    def get_rental(self, rental_id):
+        return self.rental_dao.get_by_id(rental_id)
+
+    def count_active_rentals(self):
+        return self.rental_dao.count_active()
+
+    def calculate_rental_price(self, bike_id, duration, discount, start_time=None):
+        return self.rental_dao.calculate_rental_price(bike_id, duration, discount, start_time)
+
+    def quote_rental(self, bike_id, duration, discount, start_time=None):
+        return self.rental_dao.quote_rental(bike_id, duration, discount, start_time)
+
+    # Динамічне ціноутворення
+    def get_pricing_rules(self):
+        return self.pricing.get_rules()
+
+    def set_pricing_rule(self, bike_type, threshold, surge, min_multiplier, max_multiplier):
+        return self.pricing.set_rule(bike_type, threshold, surge, min_multiplier, max_multiplier)
+
+    def get_pricing_bands(self):
+        return self.pricing.get_bands()
+
+    def add_pricing_band(self, start_hour, end_hour, multiplier):
+        return self.pricing.add_band(start_hour, end_hour, multiplier)
+
+    def delete_pricing_band(self, band_id):
+        return self.pricing.delete_band(band_id)
+
+    def get_bike_type_counts(self):
+        return self.pricing.get_type_counts()
 
     def update_rental_total_cost(self, rental_id, new_total):
         return self.rental_dao.update_total_cost(rental_id, new_total)
 
+    # Методи для роботи з бронюваннями
+    def rebuild_reservation_index(self):
+        """Заново будує індекс зайнятості з майбутніх бронювань та активних оренд."""
+        self.reservation_index.clear()
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for row in self.reservation_dao.get_upcoming(now_str):
+            start = parse_datetime(row["start_time"])
+            end = parse_datetime(row["end_time"])
+            if start is not None and end is not None:
+                self.reservation_index.add(row["bike_id"], start, end, ("reservation", row["id"]))
+        for rental in self.rental_dao.get_active():
+            end = rental.start_time + timedelta(hours=rental.duration or 0)
+            self.reservation_index.add(rental.bike_id, rental.start_time, end, ("rental", rental.id))
+
+    def create_reservation(self, client_id, bike_id, start_time_str, end_time_str):
+        start = parse_datetime(start_time_str)
+        end = parse_datetime(end_time_str)
+        if start is None or end is None or end <= start:
+            return None, "Невірний інтервал бронювання."
+        if self.reservation_index.has_conflict(bike_id, start, end):
+            return None, "Велосипед уже заброньовано або зайнятий на цей час."
+        reservation_id, msg = self.reservation_dao.add_reservation(client_id, bike_id, start_time_str, end_time_str)
+        if reservation_id:
+            self.reservation_index.add(bike_id, start, end, ("reservation", reservation_id))
+        return reservation_id, msg
+
+    def cancel_reservation(self, reservation_id):
+        if self.reservation_dao.set_status(reservation_id, "Скасована"):
+            self.reservation_index.remove(("reservation", reservation_id))
+            return True, "Бронювання скасовано."
+        return False, "Активне бронювання не знайдено."
+
+    def get_client_reservations_in_way(self, client_id, bike_id, start, end):
+        """
+        Бронювання цього ж клієнта на цей велосипед, з якими перетинається інтервал оренди, якщо
+        інших перешкод немає; None, якщо оренду створити не можна. Індекс і статуси не змінюються:
+        бронювання позначає виконаними create_rental після успішного створення оренди.
+        """
+        overlapping = self.reservation_dao.get_overlapping(bike_id, start.strftime("%Y-%m-%d %H:%M:%S"),
+                                                           end.strftime("%Y-%m-%d %H:%M:%S"))
+        if not overlapping or any(row["client_id"] != client_id for row in overlapping):
+            return None
+        removed = []
+        for row in overlapping:
+            interval = self.reservation_index.get_interval(("reservation", row["id"]))
+            if interval is not None:
+                removed.append((row["id"], interval))
+                self.reservation_index.remove(("reservation", row["id"]))
+        blocked = self.reservation_index.has_conflict(bike_id, start, end)
+        for reservation_id, (res_bike_id, res_start, res_end) in removed:
+            self.reservation_index.add(res_bike_id, res_start, res_end, ("reservation", reservation_id))
+        return None if blocked else overlapping
+
+    def prune_reservation_index(self, moment):
+        """Прибирає з індексу зайнятості бронювання, що завершилися до moment."""
+        return self.reservation_index.prune(moment)
+
+    def has_booking_conflict(self, bike_id, start_time_str, end_time_str):
+        start = parse_datetime(start_time_str)
+        end = parse_datetime(end_time_str)
+        return self.reservation_index.has_conflict(bike_id, start, end)
+
+    def get_free_bikes(self, start_time_str, end_time_str):
+        """Велосипеди (крім тих, що на ремонті), вільні протягом усього інтервалу."""
+        start = parse_datetime(start_time_str)
+        end = parse_datetime(end_time_str)
+        bikes = [bike for bike in self.bike_dao.get_all() if bike.status != "Ремонт"]
+        free_ids = set(self.reservation_index.free_bikes([bike.id for bike in bikes], start, end))
+        return [bike for bike in bikes if bike.id in free_ids]
+
     # Методи для роботи зі рахунками
     def generate_invoice(self, rental_id):
         return self.invoice_dao.generate_invoice(rental_id)
 
+    def iter_invoices(self, start_date, end_date):
+        return self.invoice_dao.iter_invoices(start_date, end_date)
+
+    def render_invoices(self, start_date, end_date, output_dir=None, merged=False, workers=None):
+        """Друкує рахунки за період у PDF (окремі файли або один об'єднаний); повертає повідомлення."""
+        from invoice_pdf import render_invoices
+        try:
+            output_dir = output_dir or f"Invoices_{start_date}_{end_date}"
+            filenames = render_invoices(self.iter_invoices(start_date, end_date), output_dir, merged, workers)
+            if not filenames:
+                return "За вибраний період рахунки відсутні."
+            if merged:
+                return f"Рахунки збережено як {filenames[0]}"
+            return f"Збережено рахунків: {len(filenames)} у каталозі {output_dir}"
+        except Exception as e:
+            return "Помилка друку рахунків: " + str(e)
+
+    # Обслуговування бази
+    def run_maintenance(self, analyze=False, optimize=True, vacuum=False):
+        """ANALYZE, PRAGMA optimize та VACUUM у цьому порядку; повертає (успіх, повідомлення)."""
+        done = []
+        try:
+            for name, enabled, operation in (("ANALYZE", analyze, self.db.analyze),
+                                             ("optimize", optimize, self.db.optimize),
+                                             ("VACUUM", vacuum, self.db.vacuum)):
+                if enabled:
+                    operation()
+                    done.append(name)
+            return True, "Виконано: " + (", ".join(done) or "нічого")
+        except Exception as e:
+            print("Error running maintenance:", e)
+            return False, "Помилка обслуговування бази: " + str(e)
+
+    def export_columnar(self, output_dir, tables=None, full=False, batch_size=50000):
+        """
+        Інкрементний експорт таблиць у Parquet з розбиттям за місяцем (bi_export.ColumnarExport):
+        дописуються лише рядки, нові чи змінені з попереднього експорту. Повертає (успіх, повідомлення).
+        """
+        try:
+            from bi_export import ColumnarExport
+        except ImportError as e:
+            return False, "Для експорту в Parquet потрібен пакет pyarrow: " + str(e)
+        return ColumnarExport(self.db, output_dir, batch_size).run(tables, full)
+
     # Методи для роботи з платежами
     def add_payment(self, invoice_id, rental_id, amount, payment_method):
         return self.payment_dao.add_payment(invoice_id, rental_id, amount, payment_method)
@@ -631,108 +2210,276 @@ class BikeRentalModel:
     def get_payments(self):
         return self.payment_dao.get_payments()
 
+    def get_payment_ledger_page(self, start_date=None, end_date=None, payment_method=None, limit=100, after=None):
+        return self.payment_dao.get_ledger_page(start_date, end_date, payment_method, limit, after)
+
+    def get_payment_settlements(self, start_date, end_date, payment_method=None):
+        return self.payment_dao.get_settlements(start_date, end_date, payment_method)
+
+    def get_settlement_totals(self, start_date, end_date):
+        return self.payment_dao.get_settlement_totals(start_date, end_date)
+
+    def get_report_definition(self, report_type):
+        """
+        Повертає (query, count_query, columns, mapping) для типу звіту або None.
+        Обидва запити приймають межі day_bounds(start_date, end_date) у секундах Unix; умови за датами
+        записані як діапазони по самому стовпцю, щоб SQLite міг використати індекси rentals.
+        Перетворення часу в текст виконується лише у списку вибірки.
+        """
+        if report_type == "Оренди за період":
+            query = """
+                SELECT r.id, c.name AS client_name, b.model AS bike_model, 
+                       datetime(r.start_time, 'unixepoch', 'localtime') AS start_time,
+                       r.duration, r.total_cost, r.status
+                FROM rentals r
+                LEFT JOIN clients c ON r.client_id = c.id
+                LEFT JOIN bikes b ON r.bike_id = b.id
+                WHERE r.start_time >= ? AND r.start_time < ?
+                ORDER BY r.start_time ASC
+            """
+            count_query = """
+                SELECT COUNT(*) FROM rentals
+                WHERE start_time >= ? AND start_time < ?
+            """
+            columns = ["ID оренди", "Клієнт", "Велосипед", "Час початку", "Тривалість (год)", "Вартість", "Статус"]
+            mapping = {
+                "ID оренди": "id",
+                "Клієнт": "client_name",
+                "Велосипед": "bike_model",
+                "Час початку": "start_time",
+                "Тривалість (год)": "duration",
+                "Вартість": "total_cost",
+                "Статус": "status"
+            }
+        elif report_type == "Аналіз використання велосипедів":
+            query = """
+                SELECT b.model, COUNT(r.id) AS rentals_count, 
+                       AVG(r.total_cost) AS avg_cost
+                FROM rentals r
+                LEFT JOIN bikes b ON r.bike_id = b.id
+                WHERE r.start_time >= ? AND r.start_time < ?
+                GROUP BY b.model
+                ORDER BY rentals_count DESC
+            """
+            count_query = """
+                SELECT COUNT(DISTINCT b.model)
+                FROM rentals r
+                LEFT JOIN bikes b ON r.bike_id = b.id
+                WHERE r.start_time >= ? AND r.start_time < ?
+            """
+            columns = ["Модель", "Кількість оренд", "Середня вартість"]
+            mapping = {
+                "Модель": "model",
+                "Кількість оренд": "rentals_count",
+                "Середня вартість": "avg_cost"
+            }
+        elif report_type == "Дохід за періодами":
+            query = """
+                SELECT DATE(r.end_time, 'unixepoch', 'localtime') AS rental_date, SUM(r.total_cost) AS total_income
+                FROM rentals r
+                WHERE r.status = 'Завершена' AND r.end_time >= ? AND r.end_time < ?
+                GROUP BY rental_date
+                ORDER BY rental_date ASC
+            """
+            count_query = """
+                SELECT COUNT(DISTINCT DATE(end_time, 'unixepoch', 'localtime')) FROM rentals
+                WHERE status = 'Завершена' AND end_time >= ? AND end_time < ?
+            """
+            columns = ["Дата", "Дохід"]
+            mapping = {
+                "Дата": "rental_date",
+                "Дохід": "total_income"
+            }
+        elif report_type == "Популярність типів велосипедів":
+            query = """
+                SELECT b.type, COUNT(r.id) AS rentals_count
+                FROM bikes b
+                LEFT JOIN rentals r ON b.id = r.bike_id
+                WHERE r.start_time >= ? AND r.start_time < ?
+                GROUP BY b.type
+                ORDER BY rentals_count DESC
+            """
+            count_query = """
+                SELECT COUNT(DISTINCT b.type)
+                FROM rentals r
+                JOIN bikes b ON b.id = r.bike_id
+                WHERE r.start_time >= ? AND r.start_time < ?
+            """
+            columns = ["Тип", "Кількість оренд"]
+            mapping = {
+                "Тип": "type",
+                "Кількість оренд": "rentals_count"
+            }
+        else:
+            return None
+        return query, count_query, columns, mapping
+
+    def get_utilization(self, start_date, end_date):
+        """
+        Частка часу, коли велосипеди були в оренді, у кожній годині тижня за період
+        (по велосипедах, типах і всьому парку) – див. utilization.fleet_utilization.
+        """
+        from utilization import fleet_utilization
+        return fleet_utilization(self.db.read_cursor(), start_date, end_date, day_bounds(start_date, end_date),
+                                 to_epoch(datetime.now()))
+
+    def get_utilization_report(self, start_date, end_date):
+        """Звіт-теплова карта: для кожного типу та всього парку 7 рядків (дні) по 24 години у відсотках."""
+        from utilization import heatmap_rows
+        utilization = self.get_utilization(start_date, end_date)
+        columns = ["Тип", "День"] + [f"{hour:02d}" for hour in range(24)]
+        rows = []
+        types, by_type = utilization["types"]
+        for bike_type, ratios in zip(types, by_type):
+            rows.extend(heatmap_rows(bike_type or "Без типу", ratios))
+        if types:
+            rows.extend(heatmap_rows("Усі велосипеди", utilization["fleet"]))
+        return columns, rows
+
+    def update_demand_history(self, rebuild=False):
+        """Дораховує погодинний ряд попиту (forecasting.DemandHistory); повертає кількість перерахованих годин."""
+        from forecasting import DemandHistory
+        history = DemandHistory(self.db)
+        now = to_epoch(datetime.now())
+        return history.rebuild(now) if rebuild else history.update(now)
+
+    def forecast_demand(self, start_date, end_date, weeks=4, update=True):
+        """
+        Прогноз попиту по типах на weeks тижнів за історією [start_date, end_date]
+        (див. forecasting.forecast_demand); повертає (типи, прогноз або None).
+        update=False – лише читання збереженого ряду без дорахунку (для фонових потоків).
+        """
+        from forecasting import DemandHistory, forecast_demand
+        from utilization import wall_seconds
+        if update:
+            self.update_demand_history()
+        first_hour = wall_seconds(start_date) // 3600
+        end_hour = wall_seconds(end_date) // 3600 + 24
+        # Прогнозується погодинний пік одночасних оренд: від нього залежить потрібний розмір парку
+        types, _, _, peaks = DemandHistory(self.db).load(first_hour, end_hour)
+        return types, forecast_demand(peaks, first_hour, weeks)
+
+    def get_daily_demand_report(self, start_date, end_date):
+        """Денний ряд попиту кожного типу за [start_date, end_date]: пік, велосипедо-години та кількість оренд."""
+        from forecasting import DemandHistory, daily_rows
+        from utilization import wall_seconds
+        self.update_demand_history()
+        first_hour = wall_seconds(start_date) // 3600
+        end_hour = wall_seconds(end_date) // 3600 + 24
+        types, bike_hours, rentals, peaks = DemandHistory(self.db).load(first_hour, end_hour)
+        columns = ["Тип", "Дата", "Пік одночасних оренд", "Велосипедо-години", "Оренд"]
+        return columns, daily_rows(types, bike_hours, rentals, peaks, first_hour)
+
+    def get_forecast_report(self, start_date, end_date, weeks=4, update=True):
+        """Звіт: пікова кількість одночасних оренд кожного типу на наступні тижні та рекомендований парк."""
+        from forecasting import peak_rows
+        columns = ["Тип", "Тиждень з", "Прогноз піку", "Пік (день, година)", "Пік останнього тижня",
+                   "Поточний парк", "Рекомендований парк", "Модель"]
+        types, forecast = self.forecast_demand(start_date, end_date, weeks, update)
+        if forecast is None:
+            return columns, []
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT type, COUNT(*) AS bikes FROM bikes GROUP BY type")
+        fleet_sizes = {row["type"] or "": row["bikes"] for row in cursor.fetchall()}
+        return columns, peak_rows(types, forecast, fleet_sizes)
+
+    def get_client_report(self, start_date, end_date):
+        """
+        Аналітика клієнтів за період: оренди, сума, середня тривалість, улюблений тип, бали RFM
+        і сегмент для кожного клієнта (див. client_analytics.client_segments).
+        """
+        from client_analytics import CLIENT_COLUMNS, client_segments
+        bounds = day_bounds(start_date, end_date)
+        # Давність рахується від кінця періоду, а для поточного періоду – від поточного моменту
+        as_of = min(bounds[1], to_epoch(datetime.now()))
+        return CLIENT_COLUMNS, client_segments(self.db.read_cursor(), bounds, as_of)
+
+    def get_computed_report(self, report_type, start_date, end_date, update=True):
+        """
+        (columns, rows) звітів, що обчислюються в Python, а не одним SQL-запитом; None для решти.
+        update=False – без запису в базу (ряд попиту прогнозу не дораховується).
+        """
+        if report_type == CLIENT_REPORT:
+            return self.get_client_report(start_date, end_date)
+        if report_type == UTILIZATION_REPORT:
+            return self.get_utilization_report(start_date, end_date)
+        if report_type == FORECAST_REPORT:
+            return self.get_forecast_report(start_date, end_date, update=update)
+        return None
+
+    def is_computed_report(self, report_type):
+        return report_type in COMPUTED_REPORTS
+
+    def start_computed_preview(self, report_type, start_date, end_date, limit=100):
+        """
+        Обчислює попередній перегляд звіту з COMPUTED_REPORTS у фоновому потоці лише через read_cursor();
+        повертає Future з (columns, rows, total). Ряд попиту прогнозу тут не дораховується –
+        перед запуском його оновлює update_demand_history() у потоці основного з'єднання.
+        База в пам'яті не має з'єднань для інших потоків, тому для неї звіт рахується одразу.
+        """
+        future = Future()
+
+        def run():
+            try:
+                columns, rows = self.get_computed_report(report_type, start_date, end_date, update=False)
+                future.set_result((columns, rows[:limit], len(rows)))
+            except Exception as e:
+                future.set_exception(e)
+        if self.db.db_path == ":memory:":
+            run()
+        else:
+            threading.Thread(target=run, name="report-preview", daemon=True).start()
+        return future
+
+    def preview_report(self, report_type, start_date, end_date, limit=100):
+        """
+        Швидкий попередній перегляд звіту: перші limit рядків (LIMIT) та оцінка
+        загальної кількості рядків за індексованим запитом.
+        Повертає (columns, rows, total), де rows – списки значень у порядку columns.
+        """
+        computed = self.get_computed_report(report_type, start_date, end_date)
+        if computed is not None:
+            columns, rows = computed
+            return columns, rows[:limit], len(rows)
+        definition = self.get_report_definition(report_type)
+        if definition is None:
+            return [], [], 0
+        query, count_query, columns, mapping = definition
+        bounds = day_bounds(start_date, end_date)
+        cursor = self.db.read_cursor()
+        cursor.execute(query + " LIMIT ?", bounds + (limit,))
+        rows = [[row[mapping[header]] for header in columns] for row in cursor.fetchall()]
+        cursor.execute(count_query, bounds)
+        total = cursor.fetchone()[0] or 0
+        return columns, rows, max(total, len(rows))
+
     def generate_report(self, report_type, start_date, end_date, format):
         try:
             import pandas as pd
             from fpdf import FPDF
+            from pdf_table import PDFTable, get_document_font
             import os
 
-            cursor = self.db.get_cursor()
+            cursor = self.db.read_cursor()
             report_data = []
-            columns = []
-            mapping = {}  # Маппінг: заголовок звіту -> ім'я ключа у даних
-
-            if report_type == "Оренди за період":
-                query = """
-                    SELECT r.id, c.name AS client_name, b.model AS bike_model, 
-                           r.start_time, r.duration, r.total_cost, r.status
-                    FROM rentals r
-                    LEFT JOIN clients c ON r.client_id = c.id
-                    LEFT JOIN bikes b ON r.bike_id = b.id
-                    WHERE DATE(r.start_time) BETWEEN ? AND ?
-                    ORDER BY r.start_time ASC
-                """
-                cursor.execute(query, (start_date, end_date))
-                columns = ["ID оренди", "Клієнт", "Велосипед", "Час початку", "Тривалість (год)", "Вартість", "Статус"]
-                mapping = {
-                    "ID оренди": "id",
-                    "Клієнт": "client_name",
-                    "Велосипед": "bike_model",
-                    "Час початку": "start_time",
-                    "Тривалість (год)": "duration",
-                    "Вартість": "total_cost",
-                    "Статус": "status"
-                }
-            elif report_type == "Аналіз використання велосипедів":
-                query = """
-                    SELECT b.model, COUNT(r.id) AS rentals_count, 
-                           AVG(r.total_cost) AS avg_cost
-                    FROM rentals r
-                    LEFT JOIN bikes b ON r.bike_id = b.id
-                    WHERE DATE(r.start_time) BETWEEN ? AND ?
-                    GROUP BY b.model
-                    ORDER BY rentals_count DESC
-                """
-                cursor.execute(query, (start_date, end_date))
-                columns = ["Модель", "Кількість оренд", "Середня вартість"]
-                mapping = {
-                    "Модель": "model",
-                    "Кількість оренд": "rentals_count",
-                    "Середня вартість": "avg_cost"
-                }
-            elif report_type == "Дохід за періодами":
-                query = """
-                    SELECT DATE(r.end_time) AS rental_date, SUM(r.total_cost) AS total_income
-                    FROM rentals r
-                    WHERE r.status = 'Завершена' AND DATE(r.end_time) BETWEEN ? AND ?
-                    GROUP BY rental_date
-                    ORDER BY rental_date ASC
-                """
-                cursor.execute(query, (start_date, end_date))
-                columns = ["Дата", "Дохід"]
-                mapping = {
-                    "Дата": "rental_date",
-                    "Дохід": "total_income"
-                }
-            elif report_type == "Аналіз клієнтської бази":
-                query = """
-                    SELECT c.name, COUNT(r.id) AS rentals_count, 
-                           COALESCE(SUM(r.total_cost), 0) AS total_spent
-                    FROM clients c
-                    LEFT JOIN rentals r ON c.id = r.client_id
-                    WHERE DATE(r.start_time) BETWEEN ? AND ?
-                    GROUP BY c.name
-                    ORDER BY total_spent DESC
-                """
-                cursor.execute(query, (start_date, end_date))
-                columns = ["Клієнт", "Кількість оренд", "Загальна сума"]
-                mapping = {
-                    "Клієнт": "name",
-                    "Кількість оренд": "rentals_count",
-                    "Загальна сума": "total_spent"
-                }
-            elif report_type == "Популярність типів велосипедів":
-                query = """
-                    SELECT b.type, COUNT(r.id) AS rentals_count
-                    FROM bikes b
-                    LEFT JOIN rentals r ON b.id = r.bike_id
-                    WHERE DATE(r.start_time) BETWEEN ? AND ?
-                    GROUP BY b.type
-                    ORDER BY rentals_count DESC
-                """
-                cursor.execute(query, (start_date, end_date))
-                columns = ["Тип", "Кількість оренд"]
-                mapping = {
-                    "Тип": "type",
-                    "Кількість оренд": "rentals_count"
-                }
-            else:
-                return "Невідомий тип звіту."
 
-            # Збираємо дані звіту
-            rows = cursor.fetchall()
-            for row in rows:
-                report_data.append(dict(row))
+            computed = self.get_computed_report(report_type, start_date, end_date)
+            if computed is not None:
+                columns, rows = computed
+                mapping = {header: header for header in columns}
+                report_data = [dict(zip(columns, row)) for row in rows]
+            else:
+                definition = self.get_report_definition(report_type)
+                if definition is None:
+                    return "Невідомий тип звіту."
+                # Маппінг: заголовок звіту -> ім'я ключа у даних
+                query, _, columns, mapping = definition
+                cursor.execute(query, day_bounds(start_date, end_date))
+
+                # Збираємо дані звіту
+                rows = cursor.fetchall()
+                for row in rows:
+                    report_data.append(dict(row))
             if not report_data:
                 return "За вибраний період дані відсутні."
 
@@ -747,68 +2494,12 @@ class BikeRentalModel:
                 return f"Excel-звіт збережено як {filename}"
             elif format == "PDF":
                 pdf = FPDF(orientation="L")  # Ландшафтний формат для кращої таблиці
+                table_rows = [[data.get(mapping[header], "") for header in columns] for data in report_data]
+                # Шрифт з підтримкою кирилиці та кешовані ширини гліфів підключає рендерер таблиці;
+                # підмножина шрифту замість повного DejaVuSans, якщо в даних немає інших символів
+                table = PDFTable(pdf, get_document_font([columns] + table_rows))
                 pdf.add_page()
-                # Додаємо шрифт з підтримкою кирилиці
-                font_path = os.path.join(os.path.dirname(__file__), "DejaVuSans.ttf")
-                pdf.add_font("DejaVu", "", font_path, uni=True)
-                pdf.set_font("DejaVu", "", 10)
-                # Обчислюємо оптимальну ширину для кожного стовпця на основі заголовків та даних
-                max_widths = []
-                for header in columns:
-                    # Початково беремо ширину заголовка
-                    max_width = pdf.get_string_width(header) + 4  # невеликий запас
-                    key = mapping[header]
-                    for data in report_data:
-                        cell_text = str(data.get(key, ""))
-                        cell_width = pdf.get_string_width(cell_text) + 4
-                        if cell_width > max_width:
-                            max_width = cell_width
-                    max_widths.append(max_width)
-                total_width = sum(max_widths)
-                page_width = pdf.w - 2 * pdf.l_margin
-                # Якщо сумарна оптимальна ширина перевищує доступну ширину сторінки,
-                # масштабувати кожну ширину пропорційно
-                if total_width > page_width:
-                    scale = page_width / total_width
-                    max_widths = [w * scale for w in max_widths]
-
-                # Функція для відтворення рядка таблиці
-                def draw_row(row_data, row_height):
-                    x_start = pdf.get_x()
-                    y_start = pdf.get_y()
-                    for i, header in enumerate(columns):
-                        key = mapping[header]
-                        text = str(row_data.get(key, ""))
-                        pdf.multi_cell(max_widths[i], row_height, text, border=1, align='C', split_only=False)
-                        x_start += max_widths[i]
-                        pdf.set_xy(x_start, y_start)
-                    pdf.ln(row_height)
-
-                # Вивід заголовка таблиці
-                y_before = pdf.get_y()
-                x_before = pdf.get_x()
-                for i, header in enumerate(columns):
-                    pdf.cell(max_widths[i], 10, header, border=1, align='C')
-                pdf.ln()
-                # Вивід рядків звіту
-                for data in report_data:
-                    # Оцінюємо висоту рядка: для кожного стовпця підрахуємо кількість рядків (за умовою переносу)
-                    line_heights = []
-                    for i, header in enumerate(columns):
-                        key = mapping[header]
-                        text = str(data.get(key, ""))
-                        # Оцінка кількості рядків в клітинці
-                        lines = pdf.multi_cell(max_widths[i], 10, text, border=0, split_only=True)
-                        line_heights.append(len(lines))
-                    max_lines = max(line_heights) if line_heights else 1
-                    row_height = 10 * max_lines
-                    # Якщо місце на сторінці не достатнє, додаємо нову сторінку та виводимо заголовок знову
-                    if pdf.get_y() + row_height > pdf.page_break_trigger:
-                        pdf.add_page()
-                        for i, header in enumerate(columns):
-                            pdf.cell(max_widths[i], 10, header, border=1, align='C')
-                        pdf.ln()
-                    draw_row(data, row_height)
+                table.render(columns, table_rows)
                 filename = f"Report_{report_type}_{start_date}_{end_date}.pdf".replace(" ", "_")
                 pdf.output(filename)
                 return f"PDF-звіт збережено як {filename}"
@@ -0,0 +1,255 @@
+import json
+import os
+import tempfile
+from fpdf import FPDF
+
+# ===== Табличний рендерер PDF-звітів =====
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), "DejaVuSans.ttf")
+FONT_FAMILY = "DejaVu"
+
+
+class FontMetrics:
+    """
+    Таблиця ширин гліфів TTF-шрифту в одиницях 1/1000 кегля.
+    Ширини читаються з шрифту один раз і зберігаються у JSON-файлі поруч зі шрифтом,
+    тому наступні запуски не розбирають 700 КБ TTF лише для вимірювання тексту.
+    """
+
+    def __init__(self, font_path=FONT_PATH, cache_path=None):
+        self.font_path = font_path
+        self.cache_path = cache_path or os.path.splitext(font_path)[0] + ".metrics.json"
+        self.widths = {}
+        self.default_width = 0
+        if not self.load_cache():
+            self.load_font()
+            self.save_cache()
+
+    def signature(self):
+        stat = os.stat(self.font_path)
+        return [os.path.basename(self.font_path), stat.st_size, int(stat.st_mtime)]
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("signature") != self.signature():
+                return False
+            self.default_width = data["default_width"]
+            self.widths = {int(code): width for code, width in data["widths"].items()}
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def load_font(self):
+        from fontTools.ttLib import TTFont
+        font = TTFont(self.font_path, lazy=True)
+        scale = 1000 / font["head"].unitsPerEm
+        hmtx = font["hmtx"].metrics
+        self.default_width = round(hmtx[".notdef"][0] * scale, 2)
+        self.widths = {code: round(hmtx[glyph][0] * scale, 2)
+                       for code, glyph in font.getBestCmap().items()}
+        font.close()
+
+    def save_cache(self):
+        # Кеш не обов'язковий: якщо каталог тільки для читання (наприклад, у зібраному exe),
+        # ширини просто залишаються в пам'яті процесу
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"signature": self.signature(), "default_width": self.default_width,
+                           "widths": self.widths}, f)
+        except OSError as e:
+            print("Error saving font metrics cache:", e)
+
+    def string_width(self, text, font_size):
+        """Ширина рядка в одиницях документа для розміру шрифту font_size (теж в одиницях документа)."""
+        widths = self.widths
+        default = self.default_width
+        return sum(widths.get(ord(ch), default) for ch in text) * font_size / 1000
+
+
+_metrics_cache = {}
+
+# Символи, що трапляються в документах програми: латиниця, кирилиця, типографські знаки, № та ₴
+DOCUMENT_UNICODES = (list(range(0x20, 0x7F)) + list(range(0xA0, 0x180)) + list(range(0x400, 0x530))
+                     + list(range(0x2010, 0x2050)) + [0x20B4, 0x2116])
+
+
+def get_font_metrics(font_path=FONT_PATH):
+    """Повертає спільний для процесу екземпляр FontMetrics для вказаного шрифту."""
+    metrics = _metrics_cache.get(font_path)
+    if metrics is None:
+        metrics = FontMetrics(font_path)
+        _metrics_cache[font_path] = metrics
+    return metrics
+
+
+DOCUMENT_CHARS = frozenset(map(chr, DOCUMENT_UNICODES))
+
+
+def get_document_font(rows, font_path=FONT_PATH):
+    """
+    Шрифт для таблиці з рядками rows: кешована підмножина (get_subset_font), якщо всі символи клітинок
+    входять до DOCUMENT_UNICODES, інакше – повний шрифт, щоб не втратити гліфи (наприклад, емодзі в імені).
+    Без fontTools теж використовується повний шрифт.
+    """
+    for cells in rows:
+        for value in cells:
+            if not DOCUMENT_CHARS.issuperset(str(value)):
+                return font_path
+    try:
+        return get_subset_font(font_path)
+    except ImportError:
+        return font_path
+
+
+def get_subset_font(font_path=FONT_PATH, unicodes=DOCUMENT_UNICODES):
+    """
+    Шлях до підмножини шрифту з гліфами unicodes, збереженої поруч зі шрифтом (*.subset.ttf).
+    FPDF розбирає шрифт у кожному документі заново, тому для великої кількості невеликих PDF
+    (рахунки) спільний файл-підмножина в кілька разів зменшує час add_font та вбудовування.
+    Файл перебудовується, якщо він старіший за сам шрифт; якщо каталог лише для читання,
+    підмножина зберігається в тимчасовому каталозі.
+    """
+    subset_path = os.path.splitext(font_path)[0] + ".subset.ttf"
+    candidates = [subset_path, os.path.join(tempfile.gettempdir(), os.path.basename(subset_path))]
+    for path in candidates:
+        try:
+            if os.path.getmtime(path) >= os.path.getmtime(font_path):
+                return path
+        except OSError:
+            pass
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    options = subset.Options()
+    options.notdef_outline = True
+    options.recommended_glyphs = True
+    options.name_IDs = ["*"]
+    options.layout_features = []
+    font = TTFont(font_path)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    for path in candidates:
+        # Запис через тимчасовий файл, щоб паралельні процеси не прочитали недописаний шрифт
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            font.save(temp_path)
+            os.replace(temp_path, path)
+            return path
+        except OSError as e:
+            print("Error saving subset font:", e)
+    return font_path
+
+
+class PDFTable:
+    """
+    Рендерер таблиць для FPDF з однопрохідним переносом рядків.
+    Кожна клітинка вимірюється один раз за кешованими ширинами гліфів; ця ж ширина
+    використовується і для підбору ширини стовпців, і для переносу, а текст виводиться
+    напряму через text()/rect() без повторної розкладки multi_cell.
+    Заголовок таблиці повторюється на кожній новій сторінці.
+    """
+
+    def __init__(self, pdf: FPDF, font_path=FONT_PATH, font_size=10, line_height=10, padding=2):
+        self.pdf = pdf
+        self.metrics = get_font_metrics(font_path)
+        self.line_height = line_height
+        self.padding = padding
+        if FONT_FAMILY.lower() not in pdf.fonts:
+            pdf.add_font(FONT_FAMILY, "", font_path)
+        pdf.set_font(FONT_FAMILY, "", font_size)
+        # Розриви сторінок контролюємо самі, щоб не розривати рядок таблиці
+        pdf.set_auto_page_break(False)
+
+    def text_width(self, text):
+        return self.metrics.string_width(text, self.pdf.font_size)
+
+    def compute_widths(self, columns, measured_rows):
+        """Ширини стовпців за найширшим вмістом; масштабуються під ширину сторінки."""
+        pad = 2 * self.padding
+        widths = [self.text_width(header) + pad for header in columns]
+        for cells in measured_rows:
+            for i, (_, width) in enumerate(cells):
+                if width + pad > widths[i]:
+                    widths[i] = width + pad
+        page_width = self.pdf.w - self.pdf.l_margin - self.pdf.r_margin
+        total_width = sum(widths)
+        if total_width > page_width:
+            scale = page_width / total_width
+            widths = [w * scale for w in widths]
+        return widths
+
+    def wrap(self, text, text_width, max_width):
+        """Розбиває текст на рядки шириною не більше max_width (жадібно, по словах)."""
+        if text_width <= max_width:
+            return [text]
+        lines = []
+        current = ""
+        current_width = 0
+        space_width = self.text_width(" ")
+        for word in text.split(" "):
+            word_width = self.text_width(word)
+            if current and current_width + space_width + word_width <= max_width:
+                current += " " + word
+                current_width += space_width + word_width
+                continue
+            if current:
+                lines.append(current)
+            # Слово, що не вміщується в стовпець, розбиваємо посимвольно
+            while word_width > max_width and len(word) > 1:
+                cut = 1
+                while cut < len(word) and self.text_width(word[:cut + 1]) <= max_width:
+                    cut += 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = self.text_width(word)
+            current, current_width = word, word_width
+        lines.append(current)
+        return lines
+
+    def draw_cells(self, texts, widths, height, lines_per_cell=None):
+        pdf = self.pdf
+        x = pdf.l_margin
+        y = pdf.get_y()
+        line_height = self.line_height
+        # Базова лінія тексту у межах рядка висотою line_height (як у FPDF.cell)
+        baseline = 0.5 * line_height + 0.3 * pdf.font_size
+        for i, width in enumerate(widths):
+            pdf.rect(x, y, width, height)
+            lines = lines_per_cell[i] if lines_per_cell else [(texts[i], self.text_width(texts[i]))]
+            for n, (line, line_width) in enumerate(lines):
+                pdf.text(x + (width - line_width) / 2, y + n * line_height + baseline, line)
+            x += width
+        pdf.set_xy(pdf.l_margin, y + height)
+
+    def draw_header(self, columns, widths):
+        self.draw_cells(columns, widths, self.line_height)
+
+    def render(self, columns, rows):
+        """
+        Виводить таблицю з заголовками columns і рядками rows (послідовності значень).
+        Сторінку документ повинен мати вже додану.
+        """
+        # Єдиний прохід вимірювання: текст і його ширина для кожної клітинки
+        measured = [[(str(value), self.text_width(str(value))) for value in row] for row in rows]
+        widths = self.compute_widths(columns, measured)
+        inner = [w - 2 * self.padding for w in widths]
+        page_bottom = self.pdf.h - self.pdf.b_margin
+        self.draw_header(columns, widths)
+        for cells in measured:
+            lines_per_cell = []
+            max_lines = 1
+            for i, (text, width) in enumerate(cells):
+                if width <= inner[i]:
+                    lines_per_cell.append([(text, width)])
+                else:
+                    lines = [(line, self.text_width(line)) for line in self.wrap(text, width, inner[i])]
+                    lines_per_cell.append(lines)
+                    max_lines = max(max_lines, len(lines))
+            row_height = self.line_height * max_lines
+            if self.pdf.get_y() + row_height > page_bottom:
+                self.pdf.add_page()
+                self.draw_header(columns, widths)
+            self.draw_cells(None, widths, row_height, lines_per_cell)
+        return widths
@@ -0,0 +1,240 @@
+import threading
+import time
+
+# ===== Динамічне ціноутворення =====
+# Погодинна ціна велосипеда множиться на коефіцієнт його типу: надбавку за завантаженістю парку
+# (лічильники bike_type_counts, які ведуть тригери таблиці bikes – без підрахунку по всій таблиці)
+# і коефіцієнт часового діапазону доби (pricing_bands); результат обмежують межі правила типу
+# (pricing_rules, '' – типове правило). Типові налаштування нейтральні: без надбавки й діапазонів
+# коефіцієнт дорівнює 1, тобто ціна збігається з фіксованою price_per_hour × години.
+
+AVAILABLE_STATUS = "Доступний"
+REPAIR_STATUS = "Ремонт"
+# Типове правило: надбавка вимкнена, межі коефіцієнта 0.5–2
+DEFAULT_RULE = (0.7, 0.0, 0.5, 2.0)
+# Скільки секунд живе закешований коефіцієнт: зміни з інших з'єднань (інша каса, реплікація)
+# не проходять через стрічку змін цього процесу
+QUOTE_TTL = 30
+
+
+def band_contains(start_hour, end_hour, hour):
+    """Чи належить година діапазону [start_hour, end_hour); діапазон може переходити через північ."""
+    if start_hour < end_hour:
+        return start_hour <= hour < end_hour
+    return hour >= start_hour or hour < end_hour
+
+
+def surge_multiplier(available, total, repair, rule, band_multiplier=1.0):
+    """
+    Коефіцієнт ціни для типу: завантаженість – частка зайнятих серед велосипедів, що не в ремонті.
+    Понад поріг threshold надбавка лінійно зростає до surge при повній завантаженості;
+    добуток з коефіцієнтом діапазону обмежується [min_multiplier, max_multiplier].
+    """
+    threshold, surge, min_multiplier, max_multiplier = rule
+    fleet = total - repair
+    utilization = 1.0 - available / fleet if fleet > 0 else 1.0
+    extra = surge * max(utilization - threshold, 0.0) / (1.0 - threshold)
+    return round(min(max(band_multiplier * (1.0 + extra), min_multiplier), max_multiplier), 4)
+
+
+class PricingEngine:
+    """
+    Розрахунок вартості оренди з динамічним коефіцієнтом, спільний для кнопки «Розрахувати»
+    та оформлення оренд. Коефіцієнти кешуються за парою (тип, діапазон доби); кеш скидається
+    зміною велосипедів у стрічці змін, зміною налаштувань або через QUOTE_TTL секунд.
+    """
+
+    def __init__(self, db, ttl=QUOTE_TTL):
+        self.db = db
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.quotes = {}
+        self.config = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        db.changes.subscribe(self.on_change, ("bike",))
+
+    def create_tables(self):
+        cursor = self.db.get_cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pricing_rules (
+                bike_type TEXT PRIMARY KEY,
+                threshold REAL NOT NULL,
+                surge REAL NOT NULL,
+                min_multiplier REAL NOT NULL,
+                max_multiplier REAL NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO pricing_rules (bike_type, threshold, surge, min_multiplier, max_multiplier)
+            VALUES ('', ?, ?, ?, ?)
+        ''', DEFAULT_RULE)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pricing_bands (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_hour INTEGER NOT NULL,
+                end_hour INTEGER NOT NULL,
+                multiplier REAL NOT NULL
+            )
+        ''')
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bike_type_counts'")
+        backfill = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bike_type_counts (
+                bike_type TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                available INTEGER NOT NULL DEFAULT 0,
+                repair INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        if backfill:
+            # Єдиний повний підрахунок – при першому запуску на старій базі, далі лічильники ведуть тригери
+            cursor.execute(f'''
+                INSERT INTO bike_type_counts (bike_type, total, available, repair)
+                SELECT COALESCE(type, ''), COUNT(*), SUM(status IS '{AVAILABLE_STATUS}'), SUM(status IS '{REPAIR_STATUS}')
+                FROM bikes GROUP BY COALESCE(type, '')
+            ''')
+        add = f'''
+            INSERT OR IGNORE INTO bike_type_counts (bike_type) VALUES (COALESCE(NEW.type, ''));
+            UPDATE bike_type_counts SET total = total + 1, available = available + (NEW.status IS '{AVAILABLE_STATUS}'),
+                                        repair = repair + (NEW.status IS '{REPAIR_STATUS}')
+            WHERE bike_type = COALESCE(NEW.type, '');
+        '''
+        remove = f'''
+            UPDATE bike_type_counts SET total = total - 1, available = available - (OLD.status IS '{AVAILABLE_STATUS}'),
+                                        repair = repair - (OLD.status IS '{REPAIR_STATUS}')
+            WHERE bike_type = COALESCE(OLD.type, '');
+        '''
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bike_type_counts_insert AFTER INSERT ON bikes BEGIN {add} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bike_type_counts_delete AFTER DELETE ON bikes BEGIN {remove} END")
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_bike_type_counts_update AFTER UPDATE OF status, type ON bikes
+            WHEN OLD.status IS NOT NEW.status OR OLD.type IS NOT NEW.type
+            BEGIN {remove} {add} END
+        ''')
+        self.db.commit()
+
+    # --- Кеш ---
+    def on_change(self, entity, entity_id, operation):
+        # Зміна статусу чи типу будь-якого велосипеда може зсунути завантаженість його типу
+        with self.lock:
+            self.quotes.clear()
+            self.generation += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.quotes.clear()
+            self.generation += 1
+            self.config = None
+
+    def load_config(self):
+        """Правила й діапазони (невеликі таблиці) читаються цілком і зберігаються до інвалідації або TTL."""
+        now = time.monotonic()
+        config = self.config
+        if config is not None and config[2] > now:
+            return config
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT bike_type, threshold, surge, min_multiplier, max_multiplier FROM pricing_rules")
+        rules = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        cursor.execute("SELECT id, start_hour, end_hour, multiplier FROM pricing_bands ORDER BY start_hour, id")
+        bands = [tuple(row) for row in cursor.fetchall()]
+        config = (rules, bands, now + self.ttl)
+        self.config = config
+        return config
+
+    def band_for(self, moment):
+        """(id, коефіцієнт) першого діапазону, що містить годину moment; (0, 1.0), якщо такого немає."""
+        for band_id, start_hour, end_hour, multiplier in self.load_config()[1]:
+            if band_contains(start_hour, end_hour, moment.hour):
+                return band_id, multiplier
+        return 0, 1.0
+
+    def multiplier(self, bike_type, moment):
+        bike_type = bike_type or ""
+        band_id, band_multiplier = self.band_for(moment)
+        key = (bike_type, band_id)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.quotes.get(key)
+            if cached is not None and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            generation = self.generation
+        rules = self.load_config()[0]
+        rule = rules.get(bike_type) or rules.get("") or DEFAULT_RULE
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT total, available, repair FROM bike_type_counts WHERE bike_type = ?", (bike_type,))
+        row = cursor.fetchone()
+        total, available, repair = tuple(row) if row else (0, 0, 0)
+        value = surge_multiplier(available, total, repair, rule, band_multiplier)
+        with self.lock:
+            # Якщо кеш скинули під час розрахунку, значення могло застаріти – не зберігаємо його
+            if generation == self.generation:
+                self.quotes[key] = (value, now + self.ttl)
+        return value
+
+    # --- Розрахунок ---
+    def quote(self, price_per_hour, bike_type, duration, discount, moment):
+        """(вартість зі знижкою у відсотках, застосований коефіцієнт) для duration годин від moment."""
+        multiplier = self.multiplier(bike_type, moment)
+        total = price_per_hour * multiplier * duration
+        if discount:
+            total -= total * (discount / 100.0)
+        return round(total, 2), multiplier
+
+    # --- Налаштування ---
+    def set_rule(self, bike_type, threshold, surge, min_multiplier, max_multiplier):
+        """Правило типу ('' – типове): поріг завантаженості 0..1, надбавка при повній завантаженості, межі коефіцієнта."""
+        if not 0 <= threshold < 1 or surge < 0 or not 0 < min_multiplier <= max_multiplier:
+            return False, "Невірні параметри правила ціноутворення."
+
+        def command(cursor):
+            cursor.execute('''
+                INSERT INTO pricing_rules (bike_type, threshold, surge, min_multiplier, max_multiplier)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (bike_type) DO UPDATE SET threshold = excluded.threshold, surge = excluded.surge,
+                    min_multiplier = excluded.min_multiplier, max_multiplier = excluded.max_multiplier
+            ''', (bike_type or "", threshold, surge, min_multiplier, max_multiplier))
+        try:
+            self.db.write(command)
+        except Exception as e:
+            print("Error saving pricing rule:", e)
+            return False, "Помилка збереження правила: " + str(e)
+        self.invalidate()
+        return True, "Правило ціноутворення збережено."
+
+    def add_band(self, start_hour, end_hour, multiplier):
+        """Діапазон доби [start_hour, end_hour) з коефіцієнтом; end_hour < start_hour – через північ."""
+        if not (0 <= start_hour < 24 and 0 <= end_hour <= 24) or start_hour == end_hour or multiplier <= 0:
+            return False, "Невірні параметри діапазону."
+        try:
+            self.db.write(lambda cursor: cursor.execute(
+                "INSERT INTO pricing_bands (start_hour, end_hour, multiplier) VALUES (?, ?, ?)",
+                (start_hour, end_hour, multiplier)))
+        except Exception as e:
+            print("Error adding pricing band:", e)
+            return False, "Помилка додавання діапазону: " + str(e)
+        self.invalidate()
+        return True, "Діапазон додано."
+
+    def delete_band(self, band_id):
+        try:
+            self.db.write(lambda cursor: cursor.execute("DELETE FROM pricing_bands WHERE id = ?", (band_id,)))
+        except Exception as e:
+            print("Error deleting pricing band:", e)
+            return False, "Помилка видалення діапазону: " + str(e)
+        self.invalidate()
+        return True, "Діапазон видалено."
+
+    def get_rules(self):
+        return sorted((bike_type,) + rule for bike_type, rule in self.load_config()[0].items())
+
+    def get_bands(self):
+        return list(self.load_config()[1])
+
+    def get_type_counts(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT bike_type, total, available, repair FROM bike_type_counts ORDER BY bike_type")
+        return [tuple(row) for row in cursor.fetchall()]
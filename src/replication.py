@@ -0,0 +1,452 @@
+import gzip
+import json
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+
+# ===== Реплікація між пунктами прокату =====
+# Кожен пункт веде власну базу. Тригери записують у replication_log, які рядки змінено (таблиця, id,
+# час у мілісекундах); export_batch складає зі змін після попереднього експорту файл-пакет JSON Lines
+# (gzip) з поточним станом цих рядків, а apply_batch застосовує пакет іншого пункту в одній транзакції.
+# Рядок у всіх базах визначається глобальним ключем (пункт походження, id у пункті походження);
+# replica_map зіставляє його з локальним id, тож id різних пунктів не перетинаються, а посилання
+# (клієнт і велосипед оренди, оренда рахунку, рахунок і оренда платежу) перекладаються при застосуванні.
+#
+# Правила конфліктів:
+#   - перемагає пізніша зміна рядка за (час зміни, ідентифікатор пункту) – «останній запис виграє»;
+#   - видалений рядок не відновлюється пізнішим оновленням з іншого пункту;
+#   - зміна з посиланням на невідомий чи видалений рядок не застосовується.
+# Відхилені зміни записуються в replication_conflicts для перегляду.
+# Пакети одного пункту застосовуються по порядку; повторне застосування пакета нічого не змінює.
+# Час порівнюється між різними комп'ютерами, тож годинники пунктів мають бути синхронізовані.
+
+BATCH_FORMAT = 1
+# Стовпці, що передаються (накопичені показники клієнта рахують тригери кожної бази, а групи оренд
+# і спільні рахунки лишаються локальними), та посилання: стовпець -> таблиця. Порядок таблиць –
+# порядок застосування: рядок з'являється раніше за рядки, що на нього посилаються.
+REPLICATED_TABLES = {
+    "clients": {"columns": ("name", "phone", "email", "document", "created_at", "name_key"), "refs": {}},
+    "bikes": {"columns": ("model", "serial_number", "type", "status", "price_per_hour", "last_maintenance_date",
+                          "model_key"), "refs": {}},
+    "rentals": {"columns": ("client_id", "bike_id", "start_time", "duration", "end_time", "status", "total_cost",
+                            "discount", "is_paid", "created_at", "penalty_intervals_charged"),
+                "refs": {"client_id": "clients", "bike_id": "bikes"}},
+    "invoices": {"columns": ("Rentals", "invoice_date", "amount", "status"), "refs": {"Rentals": "rentals"}},
+    "payments": {"columns": ("invoice_id", "rental_id", "amount", "payment_date", "payment_method"),
+                 "refs": {"invoice_id": "invoices", "rental_id": "rentals"}},
+}
+NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def batch_name(site_id, first_seq, last_seq):
+    return f"{site_id}_{first_seq:012d}-{last_seq:012d}.jsonl.gz"
+
+
+class Replicator:
+    """
+    Журнал змін поточної бази, експорт пакетів і застосування пакетів інших пунктів.
+    Облік змін встановлюється першим викликом install() (або export_batch/apply_batch): тоді ж
+    наявні рядки потрапляють до журналу, щоб перший пакет містив усю базу пункту.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def is_installed(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'replication_state'")
+        return cursor.fetchone() is not None
+
+    def install(self, site_id=None):
+        """Створює таблиці й тригери обліку змін; повертає ідентифікатор пункту."""
+        if self.is_installed():
+            return self.site_id()
+        site_id = site_id or uuid.uuid4().hex[:12]
+        # Схема змінюється через основне з'єднання, як у create_table DAO
+        cursor = self.db.get_cursor()
+        try:
+            cursor.execute('''
+                CREATE TABLE replication_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    site_id TEXT NOT NULL,
+                    applying INTEGER NOT NULL DEFAULT 0,
+                    exported_seq INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute("INSERT INTO replication_state (id, site_id) VALUES (1, ?)", (site_id,))
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    changed_at INTEGER NOT NULL
+                )
+            ''')
+            # Остання локальна зміна рядка – для розв'язання конфліктів
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_replication_log_row
+                ON replication_log(table_name, row_id, changed_at)
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replica_map (
+                    table_name TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    origin_id INTEGER NOT NULL,
+                    local_id INTEGER NOT NULL,
+                    version_at INTEGER NOT NULL,
+                    version_site TEXT NOT NULL,
+                    PRIMARY KEY (table_name, origin, origin_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_replica_map_local ON replica_map(table_name, local_id)")
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_peers (
+                    site_id TEXT PRIMARY KEY,
+                    applied_seq INTEGER NOT NULL,
+                    applied_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_conflicts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    site_id TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    origin_id INTEGER NOT NULL,
+                    reason TEXT NOT NULL,
+                    payload TEXT,
+                    recorded_at TEXT DEFAULT (datetime('now','localtime'))
+                )
+            ''')
+            for table, spec in REPLICATED_TABLES.items():
+                # Під час застосування чужого пакета зміни не журналюються, інакше вони поверталися б назад
+                when = "WHEN (SELECT applying FROM replication_state WHERE id = 1) = 0"
+                columns = ", ".join(spec["columns"])
+                for event, target, row in (("INSERT", "", "NEW"), ("UPDATE", f" OF {columns}", "NEW"),
+                                           ("DELETE", "", "OLD")):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_replication_{event.lower()}
+                        AFTER {event}{target} ON {table} {when}
+                        BEGIN
+                            INSERT INTO replication_log (table_name, row_id, changed_at)
+                            VALUES ('{table}', {row}.id, {NOW_MS});
+                        END
+                    ''')
+                cursor.execute(f'''
+                    INSERT INTO replication_log (table_name, row_id, changed_at)
+                    SELECT '{table}', id, {NOW_MS} FROM {table} ORDER BY id
+                ''')
+            self.db.commit()
+        except Exception:
+            self.db.connection.rollback()
+            raise
+        return site_id
+
+    def site_id(self):
+        cursor = self.db.read_cursor()
+        cursor.execute("SELECT site_id FROM replication_state WHERE id = 1")
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def status(self):
+        """Стан реплікації: пункт, журнал, межа експорту, застосовані пакети інших пунктів, конфлікти."""
+        if not self.is_installed():
+            return None
+        cursor = self.db.read_cursor()
+        cursor.execute('''
+            SELECT s.site_id, s.exported_seq, (SELECT COALESCE(MAX(seq), 0) FROM replication_log),
+                   (SELECT COUNT(*) FROM replication_conflicts)
+            FROM replication_state s WHERE s.id = 1
+        ''')
+        site_id, exported_seq, last_seq, conflicts = cursor.fetchone()
+        cursor.execute("SELECT site_id, applied_seq, applied_at FROM replication_peers ORDER BY site_id")
+        return {"site_id": site_id, "exported_seq": exported_seq, "last_seq": last_seq,
+                "pending": last_seq - exported_seq, "conflicts": conflicts,
+                "peers": [tuple(row) for row in cursor.fetchall()]}
+
+    # --- Експорт ---
+    def snapshot(self):
+        """З'єднання з відкритою транзакцією читання: усі запити експорту бачать один стан бази."""
+        if self.db.db_path == ":memory:":
+            return self.db.connection, False
+        connection = sqlite3.connect(self.db.db_path)
+        connection.execute("BEGIN")
+        return connection, True
+
+    def changed_rows(self, connection, table, site_id, first_seq, last_seq):
+        """
+        Рядки таблиці, змінені в журналі між first_seq і last_seq, у поточному стані (кілька змін рядка
+        згортаються в одну). Для видалених рядків стовпці порожні. Посилання повертаються глобальними
+        ключами через replica_map.
+        """
+        spec = REPLICATED_TABLES[table]
+        select = [f"t.{column}" for column in spec["columns"]]
+        joins = []
+        for index, (column, target) in enumerate(spec["refs"].items()):
+            joins.append(f"LEFT JOIN replica_map r{index} ON r{index}.table_name = '{target}' "
+                         f"AND r{index}.local_id = t.{column}")
+            select.append(f"COALESCE(r{index}.origin, :site), COALESCE(r{index}.origin_id, t.{column})")
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(f'''
+            SELECT l.seq, l.changed_at, t.id IS NOT NULL, COALESCE(m.origin, :site), COALESCE(m.origin_id, l.row_id),
+                   {", ".join(select)}
+            FROM (SELECT row_id, MAX(seq) AS seq, MAX(changed_at) AS changed_at
+                  FROM replication_log
+                  WHERE seq > :first AND seq <= :last AND table_name = :table
+                  GROUP BY row_id) l
+            LEFT JOIN {table} t ON t.id = l.row_id
+            LEFT JOIN replica_map m ON m.table_name = :table AND m.local_id = l.row_id
+            {" ".join(joins)}
+            ORDER BY l.seq
+        ''', {"site": site_id, "first": first_seq, "last": last_seq, "table": table})
+        columns = spec["columns"]
+        refs = [columns.index(column) for column in spec["refs"]]
+        for row in cursor:
+            seq, changed_at, exists, origin, origin_id = row[:5]
+            values = list(row[5:5 + len(columns)])
+            for offset, position in enumerate(refs):
+                base = 5 + len(columns) + offset * 2
+                values[position] = [row[base], row[base + 1]]
+            yield {"seq": seq, "table": table, "origin": origin, "id": origin_id, "at": changed_at,
+                   "row": dict(zip(columns, values)) if exists else None}
+
+    def export_batch(self, output_dir, since=None):
+        """
+        Записує зміни після since (типово – після попереднього експорту) у файл-пакет у output_dir.
+        Повертає (шлях або None, повідомлення).
+        """
+        try:
+            site_id = self.install()
+            connection, own = self.snapshot()
+            try:
+                first_seq, last_seq = connection.execute('''
+                    SELECT s.exported_seq, (SELECT COALESCE(MAX(seq), 0) FROM replication_log)
+                    FROM replication_state s WHERE s.id = 1
+                ''').fetchone()
+                if since is not None:
+                    first_seq = since
+                if last_seq <= first_seq:
+                    return None, "Нових змін для експорту немає."
+                os.makedirs(output_dir, exist_ok=True)
+                path = os.path.join(output_dir, batch_name(site_id, first_seq + 1, last_seq))
+                changes = 0
+                # Незавершений файл має суфікс .part і не застосовується
+                with gzip.open(path + ".part", "wt", encoding="utf-8", compresslevel=6) as file:
+                    header = {"format": BATCH_FORMAT, "site": site_id, "first_seq": first_seq + 1,
+                              "last_seq": last_seq, "created": datetime.now().isoformat(timespec="seconds")}
+                    file.write(ENCODER.encode(header) + "\n")
+                    for table in REPLICATED_TABLES:
+                        for change in self.changed_rows(connection, table, site_id, first_seq, last_seq):
+                            file.write(ENCODER.encode(change) + "\n")
+                            changes += 1
+                os.replace(path + ".part", path)
+            finally:
+                if own:
+                    connection.close()
+
+            def command(cursor):
+                cursor.execute("UPDATE replication_state SET exported_seq = MAX(exported_seq, ?) WHERE id = 1",
+                               (last_seq,))
+            self.db.write(command)
+            return path, f"Пакет змін збережено: {path} (змін: {changes})"
+        except Exception as e:
+            print("Error exporting replication batch:", e)
+            return None, "Помилка експорту змін: " + str(e)
+
+    # --- Застосування ---
+    def read_batch(self, path):
+        """Заголовок пакета та ітератор змін; файл читається потоково."""
+        file = gzip.open(path, "rt", encoding="utf-8")
+        header = json.loads(file.readline())
+        if header.get("format") != BATCH_FORMAT:
+            file.close()
+            raise ValueError(f"Невідомий формат пакета: {header.get('format')}")
+
+        def changes():
+            with file:
+                for line in file:
+                    yield json.loads(line)
+        return header, changes()
+
+    def apply_batch(self, path):
+        """
+        Застосовує пакет іншого пункту в одній транзакції. Пакети одного пункту мають іти по порядку;
+        уже застосовані зміни пропускаються. Повертає (успіх, повідомлення).
+        """
+        try:
+            own_site = self.install()
+            header, changes = self.read_batch(path)
+            site_id = header["site"]
+            if site_id == own_site:
+                return False, "Пакет створено в цій самій базі."
+            cursor = self.db.read_cursor()
+            cursor.execute("SELECT applied_seq FROM replication_peers WHERE site_id = ?", (site_id,))
+            row = cursor.fetchone()
+            applied_seq = row[0] if row else 0
+            if header["last_seq"] <= applied_seq:
+                return True, f"Пакет {os.path.basename(path)} уже застосовано."
+            if header["first_seq"] > applied_seq + 1:
+                return False, (f"Бракує попереднього пакета пункту {site_id}: застосовано зміни до {applied_seq}, "
+                               f"пакет починається з {header['first_seq']}.")
+            # Запис іде через основне з'єднання, а не групову фіксацію: позначка applying має
+            # діяти лише в транзакції цього пакета
+            cursor = self.db.get_cursor()
+            try:
+                cursor.execute("UPDATE replication_state SET applying = 1 WHERE id = 1")
+                applier = BatchApplier(cursor, own_site, site_id)
+                for change in changes:
+                    if change["seq"] > applied_seq:
+                        applier.apply(change)
+                applier.refresh_settlements()
+                cursor.execute('''
+                    INSERT INTO replication_peers (site_id, applied_seq, applied_at) VALUES (?, ?, ?)
+                    ON CONFLICT (site_id) DO UPDATE SET applied_seq = excluded.applied_seq,
+                                                        applied_at = excluded.applied_at
+                ''', (site_id, header["last_seq"], datetime.now().isoformat(timespec="seconds")))
+                cursor.execute("UPDATE replication_state SET applying = 0 WHERE id = 1")
+                self.db.commit()
+            except Exception:
+                self.db.connection.rollback()
+                raise
+            return True, (f"Пакет {os.path.basename(path)} застосовано: змін {applier.applied}, "
+                          f"конфліктів {applier.conflicts}.")
+        except Exception as e:
+            print("Error applying replication batch:", e)
+            return False, "Помилка застосування змін: " + str(e)
+
+    def apply_batches(self, paths):
+        """Застосовує кілька пакетів у порядку імен файлів (пункт, номери змін); повертає (успіх, повідомлення)."""
+        messages = []
+        for path in sorted(paths, key=os.path.basename):
+            ok, message = self.apply_batch(path)
+            messages.append(message)
+            if not ok:
+                return False, "\n".join(messages)
+        return True, "\n".join(messages)
+
+
+class BatchApplier:
+    """Застосування змін одного пакета курсором відкритої транзакції."""
+
+    def __init__(self, cursor, own_site, site_id):
+        self.cursor = cursor
+        self.own_site = own_site
+        self.site_id = site_id
+        self.local_ids = {}  # (таблиця, пункт, id) -> локальний id у межах пакета
+        self.payment_days = set()
+        self.applied = 0
+        self.conflicts = 0
+
+    def mapping(self, table, origin, origin_id):
+        """(локальний id, версія (час, пункт) або None) для глобального ключа; (None, None) для невідомого рядка."""
+        if origin == self.own_site:
+            self.cursor.execute("SELECT version_at, version_site FROM replica_map "
+                                "WHERE table_name = ? AND origin = ? AND origin_id = ?", (table, origin, origin_id))
+            row = self.cursor.fetchone()
+            return origin_id, (tuple(row) if row else None)
+        self.cursor.execute("SELECT local_id, version_at, version_site FROM replica_map "
+                            "WHERE table_name = ? AND origin = ? AND origin_id = ?", (table, origin, origin_id))
+        row = self.cursor.fetchone()
+        return (row[0], (row[1], row[2])) if row else (None, None)
+
+    def local_version(self, table, local_id, stored):
+        """Пізніша з версій: остання локальна зміна з журналу або остання застосована зміна з пакета."""
+        self.cursor.execute("SELECT MAX(changed_at) FROM replication_log WHERE table_name = ? AND row_id = ?",
+                            (table, local_id))
+        changed_at = self.cursor.fetchone()[0]
+        versions = [version for version in (stored, (changed_at, self.own_site) if changed_at else None) if version]
+        return max(versions) if versions else None
+
+    def resolve(self, table, key):
+        origin, origin_id = key
+        cache_key = (table, origin, origin_id)
+        if cache_key not in self.local_ids:
+            local_id, _ = self.mapping(table, origin, origin_id)
+            if local_id is not None:
+                self.cursor.execute(f"SELECT 1 FROM {table} WHERE id = ?", (local_id,))
+                if self.cursor.fetchone() is None:
+                    local_id = None
+            self.local_ids[cache_key] = local_id
+        return self.local_ids[cache_key]
+
+    def conflict(self, change, reason):
+        self.conflicts += 1
+        self.cursor.execute('''
+            INSERT INTO replication_conflicts (site_id, table_name, origin, origin_id, reason, payload)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (self.site_id, change["table"], change["origin"], change["id"], reason,
+              json.dumps(change, ensure_ascii=False)))
+
+    def apply(self, change):
+        table, origin, origin_id, row = change["table"], change["origin"], change["id"], change["row"]
+        spec = REPLICATED_TABLES[table]
+        version = (change["at"], self.site_id)
+        local_id, stored = self.mapping(table, origin, origin_id)
+        if stored == version:
+            return
+        exists = False
+        if local_id is not None:
+            self.cursor.execute(f"SELECT 1 FROM {table} WHERE id = ?", (local_id,))
+            exists = self.cursor.fetchone() is not None
+            current = self.local_version(table, local_id, stored)
+            if current is not None and version <= current:
+                self.conflict(change, "Пізніша зміна в цій базі")
+                return
+        if local_id is not None and not exists:
+            if row is not None:
+                self.conflict(change, "Рядок видалено в цій базі")
+            return
+        if table == "payments" and exists:
+            self.cursor.execute("SELECT payment_date FROM payments WHERE id = ?", (local_id,))
+            self.payment_days.add((self.cursor.fetchone()[0] or "")[:10])
+
+        if row is None:
+            if exists:
+                self.cursor.execute(f"DELETE FROM {table} WHERE id = ?", (local_id,))
+                self.remember(table, origin, origin_id, local_id, version)
+                self.local_ids[(table, origin, origin_id)] = None
+                self.applied += 1
+            return
+        values = dict(row)
+        for column, target in spec["refs"].items():
+            if values[column] is not None:
+                values[column] = self.resolve(target, values[column])
+                if values[column] is None:
+                    self.conflict(change, f"Невідомий рядок {target}")
+                    return
+        columns = spec["columns"]
+        if exists:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            self.cursor.execute(f"UPDATE {table} SET {assignments} WHERE id = ?",
+                                [values[column] for column in columns] + [local_id])
+        else:
+            self.cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                                [values[column] for column in columns])
+            local_id = self.cursor.lastrowid
+        self.local_ids[(table, origin, origin_id)] = local_id
+        self.remember(table, origin, origin_id, local_id, version)
+        if table == "payments":
+            self.payment_days.add((values["payment_date"] or "")[:10])
+        self.applied += 1
+
+    def remember(self, table, origin, origin_id, local_id, version):
+        self.cursor.execute('''
+            INSERT INTO replica_map (table_name, origin, origin_id, local_id, version_at, version_site)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (table_name, origin, origin_id) DO UPDATE SET
+                local_id = excluded.local_id, version_at = excluded.version_at, version_site = excluded.version_site
+        ''', (table, origin, origin_id, local_id) + version)
+
+    def refresh_settlements(self):
+        """Перераховує денні підсумки платежів (payment_settlements) для днів, яких торкнувся пакет."""
+        for day in sorted(self.payment_days - {""}):
+            self.cursor.execute("DELETE FROM payment_settlements WHERE day = ?", (day,))
+            self.cursor.execute('''
+                INSERT INTO payment_settlements (day, payment_method, total, payments_count)
+                SELECT ?, COALESCE(payment_method, ''), SUM(amount), COUNT(*)
+                FROM payments WHERE payment_date >= ? AND payment_date < DATE(?, '+1 day')
+                GROUP BY COALESCE(payment_method, '')
+            ''', (day, day, day))
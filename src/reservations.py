@@ -0,0 +1,138 @@
+from bisect import bisect_left, bisect_right
+
+# ===== Індекс інтервалів зайнятості велосипедів =====
+
+
+class BikeIntervals:
+    """
+    Інтервали [start, end) одного велосипеда, впорядковані за початком.
+    max_ends[i] – найпізніше завершення серед перших i + 1 інтервалів, тому перевірка
+    перетину зводиться до одного бінарного пошуку (O(log n)) навіть якщо в даних є накладки.
+    Додавання й видалення зсувають списки і перераховують max_ends від позиції зміни, тобто
+    коштують O(n) у гіршому разі; для додавання в кінець (звичайний випадок) – O(1).
+    Завершені бронювання прибирає prune, щоб списки не росли.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.keys = []
+        self.max_ends = []
+
+    def refresh_max_ends(self, position):
+        del self.max_ends[position:]
+        current = self.max_ends[-1] if self.max_ends else None
+        for end in self.ends[position:]:
+            current = end if current is None or end > current else current
+            self.max_ends.append(current)
+
+    def add(self, start, end, key):
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.keys.insert(position, key)
+        # Нові бронювання здебільшого додаються в кінець, тоді перерахунок – O(1)
+        self.refresh_max_ends(position)
+
+    def remove(self, start, key):
+        position = bisect_left(self.starts, start)
+        while position < len(self.starts) and self.starts[position] == start:
+            if self.keys[position] == key:
+                del self.starts[position]
+                del self.ends[position]
+                del self.keys[position]
+                self.refresh_max_ends(position)
+                return True
+            position += 1
+        return False
+
+    def prune(self, before, kind):
+        """Видаляє інтервали виду kind, що завершилися не пізніше before; повертає їхні ключі."""
+        count = bisect_left(self.starts, before)
+        stale = [position for position in range(count)
+                 if self.ends[position] <= before and self.keys[position][0] == kind]
+        if not stale:
+            return []
+        removed = [self.keys[position] for position in stale]
+        for position in reversed(stale):
+            del self.starts[position]
+            del self.ends[position]
+            del self.keys[position]
+        self.refresh_max_ends(stale[0])
+        return removed
+
+    def overlaps(self, start, end):
+        # Кандидати – інтервали, що почалися до end; перетин є, якщо хоч один із них закінчується після start
+        count = bisect_left(self.starts, end)
+        return count > 0 and self.max_ends[count - 1] > start
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class ReservationIndex:
+    """
+    Індекс зайнятості велосипедів у пам'яті: бронювання та активні оренди як інтервали [start, end).
+    Ключ інтервалу – пара (вид, id), наприклад ("reservation", 5) або ("rental", 12).
+    """
+
+    def __init__(self):
+        self.bikes = {}
+        self.locations = {}  # ключ -> (bike_id, start)
+
+    def clear(self):
+        self.bikes.clear()
+        self.locations.clear()
+
+    def add(self, bike_id, start, end, key):
+        if key in self.locations:
+            self.remove(key)
+        intervals = self.bikes.get(bike_id)
+        if intervals is None:
+            intervals = self.bikes[bike_id] = BikeIntervals()
+        intervals.add(start, end, key)
+        self.locations[key] = (bike_id, start)
+
+    def remove(self, key):
+        location = self.locations.pop(key, None)
+        if location is None:
+            return False
+        bike_id, start = location
+        return self.bikes[bike_id].remove(start, key)
+
+    def prune(self, before):
+        """
+        Прибирає бронювання, що завершилися не пізніше before. Активні оренди лишаються
+        і після очікуваного завершення: прострочений велосипед досі зайнятий.
+        """
+        removed = []
+        for bike_id, intervals in list(self.bikes.items()):
+            for key in intervals.prune(before, "reservation"):
+                self.locations.pop(key, None)
+                removed.append(key)
+            if not intervals:
+                del self.bikes[bike_id]
+        return removed
+
+    def get_interval(self, key):
+        location = self.locations.get(key)
+        if location is None:
+            return None
+        bike_id, start = location
+        intervals = self.bikes[bike_id]
+        position = bisect_left(intervals.starts, start)
+        while intervals.keys[position] != key:
+            position += 1
+        return bike_id, start, intervals.ends[position]
+
+    def has_conflict(self, bike_id, start, end):
+        """Чи перетинається інтервал [start, end) з бронюваннями або орендами велосипеда."""
+        intervals = self.bikes.get(bike_id)
+        return intervals is not None and intervals.overlaps(start, end)
+
+    def free_bikes(self, bike_ids, start, end):
+        """Відбирає з bike_ids велосипеди, вільні протягом усього інтервалу [start, end)."""
+        return [bike_id for bike_id in bike_ids if not self.has_conflict(bike_id, start, end)]
+
+    def __len__(self):
+        return len(self.locations)
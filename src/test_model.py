@@ -1,8 +1,24 @@
 import sys
 import os
+import gzip
+import importlib.util
+import json
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
-from datetime import datetime
-from .model import BikeRentalModel
+from datetime import datetime, timedelta
+
+# Модулі застосунку імпортують один одного абсолютно (програма запускається з каталогу src),
+# тому тести додають цей каталог до шляху і працюють як з src, так і з кореня репозиторію
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model import BikeRentalModel
+from pdf_table import PDFTable, FONT_PATH, get_document_font
+from cli import main as cli_main
+from group_commit import WriterClient, create_authkey_file
+from ui_latency import LatencyRecorder, TimedModel
 
 
 
@@ -79,6 +95,828 @@ class TestBikeRentalModel(unittest.TestCase):
         price_discount = self.model.calculate_rental_price(bike.id, 3, 10)
         self.assertAlmostEqual(price_discount, 135.0, places=2, msg="Невірний розрахунок вартості оренди зі знижкою")
 
+    def test_pdf_table_wraps_long_text_and_adds_pages(self):
+        # Тест однопрохідного переносу тексту та перенесення таблиці на нові сторінки
+        from fpdf import FPDF
+        pdf = FPDF(orientation="L")
+        table = PDFTable(pdf)
+        pdf.add_page()
+        long_text = "Дуже довга назва клієнта " * 10
+        lines = table.wrap(long_text, table.text_width(long_text), 60)
+        self.assertGreater(len(lines), 1, "Довгий текст має переноситися")
+        for line in lines:
+            self.assertLessEqual(table.text_width(line), 60, "Рядок виходить за межі стовпця")
+        rows = [[i, "Клієнт", long_text] for i in range(100)]
+        table.render(["ID", "Клієнт", "Примітка"], rows)
+        self.assertGreater(pdf.page, 1, "Таблиця має займати кілька сторінок")
+        # Звіти беруть підмножину шрифту, а символи поза нею повертають повний шрифт
+        self.assertNotEqual(get_document_font(rows), FONT_PATH)
+        self.assertEqual(get_document_font(rows + [[1, "Клієнт \u4e2d", ""]]), FONT_PATH)
+
+
+    def test_preview_report_limits_rows(self):
+        # Тест попереднього перегляду звіту: LIMIT та загальна кількість рядків
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        client = self.model.get_all_clients()[0]
+        self.model.add_bike("Giant", "SN12345", "Гірський", 50.0)
+        bike = self.model.get_all_bikes()[0]
+        for day in range(1, 8):
+            self.model.create_rental(client.id, bike.id, f"2025-04-0{day} 10:00:00", 2, 0)
+        columns, rows, total = self.model.preview_report("Оренди за період", "2025-04-02", "2025-04-06", 3)
+        self.assertEqual(columns[0], "ID оренди")
+        self.assertEqual(len(rows), 3, "Попередній перегляд має містити не більше 3 рядків")
+        self.assertEqual(total, 5, "Невірна кількість рядків звіту за період")
+        self.assertEqual(rows[0][3], "2025-04-02 10:00:00")
+
+
+    def test_reservation_conflicts(self):
+        # Тест перевірки перетину бронювань та пошуку вільних велосипедів
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_client("Марія Петренко", "+380501234568", "maria@example.com", "Passport124")
+        ivan, maria = self.model.get_all_clients()
+        self.model.add_bike("Giant", "SN12345", "Гірський", 50.0)
+        self.model.add_bike("Trek", "SN12346", "Міський", 40.0)
+        giant, trek = self.model.get_all_bikes()
+        reservation_id, msg = self.model.create_reservation(ivan.id, giant.id, "2030-05-01 10:00:00",
+                                                            "2030-05-01 12:00:00")
+        self.assertIsNotNone(reservation_id, msg)
+        self.assertTrue(self.model.has_booking_conflict(giant.id, "2030-05-01 11:00:00", "2030-05-01 13:00:00"))
+        self.assertFalse(self.model.has_booking_conflict(giant.id, "2030-05-01 12:00:00", "2030-05-01 13:00:00"))
+        free = self.model.get_free_bikes("2030-05-01 09:00:00", "2030-05-01 11:00:00")
+        self.assertEqual([bike.id for bike in free], [trek.id])
+        # Інший клієнт не може орендувати заброньований велосипед, а власник броні – може
+        rental_id, _ = self.model.create_rental(maria.id, giant.id, "2030-05-01 09:00:00", 2, 0)
+        self.assertIsNone(rental_id, "Оренда не повинна перетинатися з чужим бронюванням")
+        # Якщо оренду не вдалося створити, бронювання залишається чинним
+        self.model.rental_dao.create_rental = lambda *args: (None, "Помилка створення оренди")
+        rental_id, _ = self.model.create_rental(ivan.id, giant.id, "2030-05-01 10:00:00", 2, 0)
+        del self.model.rental_dao.create_rental
+        self.assertIsNone(rental_id)
+        self.assertTrue(self.model.has_booking_conflict(giant.id, "2030-05-01 10:00:00", "2030-05-01 12:00:00"))
+        rental_id, msg = self.model.create_rental(ivan.id, giant.id, "2030-05-01 10:00:00", 2, 0)
+        self.assertIsNotNone(rental_id, msg)
+        result, _ = self.model.cancel_reservation(reservation_id)
+        self.assertFalse(result, "Виконане бронювання не можна скасувати")
+        # Завершені бронювання прибираються з індексу, активні оренди – ні
+        self.model.create_reservation(maria.id, trek.id, "2030-05-02 10:00:00", "2030-05-02 12:00:00")
+        removed = self.model.prune_reservation_index(datetime(2030, 5, 2, 12))
+        self.assertEqual([kind for kind, _ in removed], ["reservation"])
+        self.assertFalse(self.model.has_booking_conflict(trek.id, "2030-05-02 10:00:00", "2030-05-02 12:00:00"))
+        self.assertTrue(self.model.has_booking_conflict(giant.id, "2030-05-01 10:00:00", "2030-05-01 12:00:00"))
+
+
+    def test_client_history_pages_and_aggregates(self):
+        # Тест посторінкової історії оренд та накопичених показників клієнта
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        client = self.model.get_all_clients()[0]
+        self.model.add_bike("Giant", "SN12345", "Гірський", 50.0)
+        bike = self.model.get_all_bikes()[0]
+        for day in range(1, 6):
+            self.model.rental_dao.create_rental(client.id, bike.id, f"2025-04-0{day} 10:00:00", 2, 0)
+        aggregates = self.model.get_client_aggregates(client.id)
+        self.assertEqual(aggregates["rentals_count"], 5)
+        self.assertAlmostEqual(aggregates["total_spent"], 500.0, places=2)
+        self.assertEqual(aggregates["last_rental_at"], datetime(2025, 4, 5, 10, 0))
+
+        first_page, cursor = self.model.get_client_rental_history_page(client.id, 2)
+        self.assertEqual([r.start_time.day for r in first_page], [5, 4])
+        second_page, cursor = self.model.get_client_rental_history_page(client.id, 2, cursor)
+        last_page, cursor = self.model.get_client_rental_history_page(client.id, 2, cursor)
+        self.assertEqual(len(second_page) + len(last_page), 3)
+        self.assertIsNone(cursor, "Після останньої сторінки курсор має бути порожнім")
+
+        self.model.extend_rental(first_page[0].id, 1)
+        self.assertAlmostEqual(self.model.get_client_aggregates(client.id)["total_spent"], 550.0, places=2)
+
+
+    def test_change_feed_reports_writes(self):
+        # Тест стрічки змін: DAO повідомляють про записи, batch() групує повтори
+        events = []
+        self.model.changes.subscribe(lambda *event: events.append(event))
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN12345", "Гірський", 50.0)
+        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rental_id, _ = self.model.create_rental(1, 1, start_time, 2, 0)
+        self.model.complete_rental(rental_id)
+        self.assertEqual(events[:3], [("client", 1, "insert"), ("bike", 1, "insert"), ("rental", rental_id, "insert")])
+        self.assertIn(("rental", rental_id, "update"), events)
+
+        events.clear()
+        with self.model.changes.batch():
+            self.model.update_bike(1, status="Ремонт")
+            self.model.update_bike(1, status="Доступний")
+            self.assertEqual(events, [], "Під час batch() сповіщення відкладаються")
+        self.assertEqual(events, [("bike", 1, "update")])
+
+        # Видалення відсутнього запису не породжує подію
+        events.clear()
+        self.model.delete_rental(rental_id + 1)
+        self.model.delete_client(99)
+        self.model.delete_bike(99)
+        self.assertEqual(events, [])
+        self.model.delete_rental(rental_id)
+        self.assertEqual(events, [("rental", rental_id, "delete")])
+
+    def test_epoch_timestamps_migration(self):
+        # Тест міграції стовпців часу rentals з TEXT на секунди Unix та представлення для старих читачів
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "old.db")
+            connection = sqlite3.connect(path)
+            connection.execute("""
+                CREATE TABLE rentals (id INTEGER PRIMARY KEY AUTOINCREMENT, client_id INTEGER NOT NULL,
+                    bike_id INTEGER NOT NULL, start_time DATETIME NOT NULL, duration INTEGER, end_time DATETIME,
+                    status TEXT, total_cost REAL, discount REAL DEFAULT 0, is_paid INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT (datetime('now','localtime')))
+            """)
+            connection.execute("INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, total_cost) "
+                               "VALUES (1, 1, '2025-04-05 10:00:00', 2, '2025-04-05 12:30:00', 'Завершена', 100)")
+            connection.commit()
+            connection.close()
+
+            model = BikeRentalModel(path)
+            rental = model.get_rental(1)
+            self.assertEqual(rental.start_time, datetime(2025, 4, 5, 10, 0))
+            self.assertEqual(rental.end_time, datetime(2025, 4, 5, 12, 30))
+            row = model.db.get_cursor().execute("SELECT start_time FROM rentals_text WHERE id = 1").fetchone()
+            self.assertEqual(row["start_time"], "2025-04-05 10:00:00")
+            _, rows, total = model.preview_report("Оренди за період", "2025-04-05", "2025-04-05")
+            self.assertEqual((total, rows[0][3]), (1, "2025-04-05 10:00:00"))
+            model.db.close()
+
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN12345", "Гірський", 50.0)
+        self.model.add_bike("Trek", "SN54321", "Міський", 40.0)
+        now = datetime.now().replace(microsecond=0)
+        overdue_id, _ = self.model.create_rental(1, 1, now - timedelta(hours=3), 2, 0)
+        self.model.create_rental(1, 2, now - timedelta(hours=1), 2, 0)
+        self.assertEqual([r.id for r in self.model.get_due_rentals(now)], [overdue_id])
+
+    def test_overdue_penalties_charged_once(self):
+        # Тест нарахування штрафу: кожен 30-хвилинний інтервал прострочки оплачується один раз
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN12345", "Гірський", 50.0)
+        now = datetime.now().replace(microsecond=0)
+        rental_id, _ = self.model.create_rental(1, 1, now - timedelta(hours=3, minutes=5), 2, 0)
+        rows = self.model.accrue_overdue_penalties(now)
+        self.assertEqual([(row["id"], row["penalty_intervals_charged"]) for row in rows], [(rental_id, 2)])
+        self.assertAlmostEqual(self.model.get_rental(rental_id).total_cost, 100.0 + 2 * 60.0, places=2)
+        self.assertEqual(self.model.accrue_overdue_penalties(now), [], "Повторна перевірка не нараховує штраф")
+        rows = self.model.accrue_overdue_penalties(now + timedelta(minutes=30))
+        self.assertAlmostEqual(rows[0]["penalty"], 180.0, places=2)
+        self.assertAlmostEqual(self.model.get_client_aggregates(1)["total_spent"], 280.0, places=2)
+
+        # Продовження зсуває лічильник: штраф рахується від нового завершення (через 55 хвилин)
+        self.assertTrue(self.model.extend_rental(rental_id, 2)[0])
+        self.assertEqual(self.model.accrue_overdue_penalties(now + timedelta(minutes=30)), [])
+        rows = self.model.accrue_overdue_penalties(now + timedelta(minutes=90))
+        self.assertEqual([row["penalty_intervals_charged"] for row in rows], [1])
+        self.assertAlmostEqual(self.model.get_rental(rental_id).total_cost, 280.0 + 100.0 + 60.0, places=2)
+        self.model.add_bike("Trek", "SN12346", "Міський", 40.0)
+        group_rental_id, _ = self.model.create_rental(1, 2, now - timedelta(hours=3, minutes=5), 2, 0)
+        self.model.accrue_overdue_penalties(now)
+        self.assertTrue(self.model.extend_rentals([group_rental_id], 2)[0])
+        self.assertEqual(self.model.accrue_overdue_penalties(now + timedelta(minutes=30)), [],
+                         "Групове продовження теж зсуває лічильник")
+
+    def test_group_rental_single_transaction(self):
+        # Тест групової оренди: спільний рахунок, продовження та завершення всієї групи
+        self.model.add_client("ТОВ Велотур", "+380501234567", "tour@example.com", "EDRPOU123")
+        for i in range(3):
+            self.model.add_bike("Giant", f"SN{i}", "Гірський", 50.0)
+        self.model.update_bike(3, status="Ремонт")
+        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        group_id, msg = self.model.create_group_rental(1, [1, 2, 3], start_time, 2, 0, "Карткою")
+        self.assertIsNone(group_id, "Група з недоступним велосипедом не створюється")
+        self.assertEqual(self.model.count_active_rentals(), 0)
+
+        group_id, msg = self.model.create_group_rental(1, [1, 2], start_time, 2, 10, "Карткою")
+        self.assertIsNotNone(group_id, msg)
+        rental_ids = [rental.id for rental in self.model.get_group_rentals(group_id)]
+        self.assertEqual(len(rental_ids), 2)
+        self.assertEqual(self.model.count_available_bikes(), 0)
+        invoice = self.model.db.get_cursor().execute("SELECT amount FROM invoices WHERE group_id = ?", (group_id,)).fetchone()
+        self.assertAlmostEqual(invoice["amount"], 180.0, places=2)
+
+        result, msg = self.model.extend_rentals(rental_ids, 1)
+        self.assertTrue(result, msg)
+        invoice = self.model.db.get_cursor().execute("SELECT amount FROM invoices WHERE group_id = ?", (group_id,)).fetchone()
+        self.assertAlmostEqual(invoice["amount"], 270.0, places=2)
+        result, msg = self.model.complete_rentals(rental_ids)
+        self.assertTrue(result, msg)
+        self.assertEqual(self.model.count_active_rentals(), 0)
+        self.assertEqual(self.model.count_available_bikes(), 2)
+
+    def test_payment_ledger_and_settlements(self):
+        # Тест журналу платежів: фільтри, keyset-пагінація та підсумки за днями, що ведуться при оплаті
+        for amount, method in [(100.0, "Карткою"), (50.0, "Готівкою"), (70.0, "Карткою")]:
+            result, msg = self.model.add_payment(1, 1, amount, method)
+            self.assertTrue(result, msg)
+        self.assertFalse(self.model.add_payment(1, 1, 10.0, "Біткоїном")[0], "Невідомий спосіб оплати відхиляється")
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        first_page, cursor = self.model.get_payment_ledger_page(today, today, limit=2)
+        second_page, cursor = self.model.get_payment_ledger_page(today, today, limit=2, after=cursor)
+        self.assertEqual([row["amount"] for row in first_page + second_page], [70.0, 50.0, 100.0])
+        self.assertIsNone(cursor)
+        card_rows, _ = self.model.get_payment_ledger_page(payment_method="Карткою")
+        self.assertEqual(len(card_rows), 2)
+
+        totals = self.model.get_settlement_totals(today, today)
+        self.assertEqual(totals, {"Готівкою": (50.0, 1), "Карткою": (170.0, 2)})
+        self.assertEqual(len(self.model.get_payment_settlements(today, today, "Готівкою")), 1)
+
+    def test_render_invoices_for_period(self):
+        # Тест друку рахунків за період: окремі файли через пул процесів та один об'єднаний PDF
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        for i in range(3):
+            self.model.add_bike("Giant", f"SN{i}", "Гірський", 50.0)
+        rental_id, _ = self.model.create_rental(1, 1, "2025-04-05 10:00:00", 2, 0)
+        self.model.generate_invoice(rental_id)
+        group_id, _ = self.model.create_group_rental(1, [2, 3], "2025-04-06 10:00:00", 1, 0, "Готівкою")
+        invoices = list(self.model.iter_invoices("2025-04-01", "2025-04-30"))
+        self.assertEqual([len(invoice["lines"]) for invoice in invoices], [1, 2])
+        # Шрифт вибирається за текстом рахунків, як і для звітів
+        from invoice_pdf import invoices_font
+        self.assertNotEqual(invoices_font(invoices), FONT_PATH)
+        invoices[1]["client_name"] = "Клієнт \u4e2d"
+        self.assertEqual(invoices_font(invoices), FONT_PATH)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            message = self.model.render_invoices("2025-04-01", "2025-04-30", os.path.join(tmp, "files"), workers=2)
+            self.assertIn("Збережено рахунків: 2", message)
+            self.assertEqual(sorted(os.listdir(os.path.join(tmp, "files"))), ["Invoice_1.pdf", "Invoice_2.pdf"])
+            message = self.model.render_invoices("2025-04-01", "2025-04-30", os.path.join(tmp, "merged"), merged=True)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "merged", "Invoices.pdf")), message)
+
+    def test_online_backup_rotation(self):
+        # Тест онлайн-копіювання файлової бази: перевірена стиснена копія та ротація старих копій
+        with tempfile.TemporaryDirectory() as tmp:
+            model = BikeRentalModel(os.path.join(tmp, "rental.db"))
+            model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+            backups = model.backups
+            backups.keep = 2
+            backups.pages = 1
+            backups.sleep = 0
+            paths = [backups.run()[0] for _ in range(3)]
+            self.assertEqual(backups.list_snapshots(), [paths[2], paths[1]], "Має лишитися 2 найновіші копії")
+            self.assertEqual(backups.progress[0], backups.progress[1])
+
+            restored = os.path.join(tmp, "restored.db")
+            with gzip.open(paths[2], "rb") as source, open(restored, "wb") as target:
+                target.write(source.read())
+            connection = sqlite3.connect(restored)
+            self.assertEqual(connection.execute("SELECT name FROM clients").fetchall(), [("Іван Іванов",)])
+            connection.close()
+
+            # Фонове копіювання не заважає запису з основного з'єднання
+            self.assertTrue(backups.start())
+            model.add_client("Марія Петренко", "+380671112233", "maria@example.com", "Passport456")
+            backups.thread.join()
+            self.assertIsNotNone(backups.result[0], backups.result[1])
+            self.assertEqual(model.count_clients(), 2)
+            model.db.close()
+
+            # Пауза sleep між кроками копіювання, навіть коли база не зайнята
+            started = time.perf_counter()
+            steps = []
+            self.assertEqual(self.model.db.backup(os.path.join(tmp, "throttled.db"), 1, 0.02,
+                                                  lambda copied, total: steps.append(copied)), "ok")
+            self.assertGreater(len(steps), 1)
+            self.assertGreaterEqual(time.perf_counter() - started, 0.02 * (len(steps) - 1))
+            # База в пам'яті недоступна фоновому потоку – копія робиться в поточному
+            self.model.backups.backup_dir = os.path.join(tmp, "memory")
+            self.assertTrue(self.model.backups.start())
+            self.assertIsNotNone(self.model.backups.result[0], self.model.backups.result[1])
+
+    def test_cli_import_and_maintenance(self):
+        # Тест командного рядка: імпорт CSV однією транзакцією та обслуговування бази без GUI
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "cli.db")
+            good = os.path.join(tmp, "clients.csv")
+            with open(good, "w", encoding="utf-8") as file:
+                file.write("name,phone,email,document\nІван Іванов,+380501234567,ivan@example.com,P1\n"
+                           "Марія Петренко,+380671112233,,P2\n")
+            broken = os.path.join(tmp, "broken.csv")
+            with open(broken, "w", encoding="utf-8") as file:
+                file.write("name,phone,email,document\nОлег,+380931112233,,P3\n,+380500000000,,P4\n")
+
+            self.assertEqual(cli_main(["--db", db_path, "import", "clients", good]), 0)
+            self.assertEqual(cli_main(["--db", db_path, "import", "clients", broken]), 1)
+            self.assertEqual(cli_main(["--db", db_path, "maintain", "--analyze", "--vacuum"]), 0)
+            model = BikeRentalModel(db_path)
+            self.assertEqual(model.count_clients(), 2, "Невдалий імпорт не має залишати частину записів")
+            model.db.close()
+
+    def test_read_connections_per_thread(self):
+        # Тест пулу з'єднань для читання: окреме з'єднання на потік, лише зафіксовані дані, заборона запису
+        with tempfile.TemporaryDirectory() as tmp:
+            model = BikeRentalModel(os.path.join(tmp, "pool.db"))
+            model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+            self.assertEqual(model.count_clients(), 1)
+            reader = model.db.read_cursor().connection
+            self.assertIsNot(reader, model.db.connection)
+            with self.assertRaises(sqlite3.OperationalError):
+                reader.execute("DELETE FROM clients")
+
+            # Незафіксований запис не видно з'єднанням для читання
+            model.db.get_cursor().execute("INSERT INTO clients (name, name_key) VALUES ('Тимчасовий', 'тимчасовий')")
+            self.assertEqual(model.count_clients(), 1)
+            model.db.connection.rollback()
+
+            results = {}
+
+            def read_in_thread():
+                results["count"] = model.count_clients()
+                results["connection"] = model.db.read_cursor().connection
+
+            thread = threading.Thread(target=read_in_thread)
+            thread.start()
+            thread.join()
+            self.assertEqual(results["count"], 1)
+            self.assertIsNot(results["connection"], reader)
+            # З'єднання завершеного потоку закривається, коли відкривається наступне
+            thread = threading.Thread(target=model.db.read_cursor)
+            thread.start()
+            thread.join()
+            self.assertEqual(len(model.db.readers), 2)
+            model.db.close()
+
+    def test_group_commit_writer(self):
+        # Тест групової фіксації: записи кількох потоків об'єднуються в пакети, помилка однієї команди не скасовує інших
+        with tempfile.TemporaryDirectory() as tmp:
+            model = BikeRentalModel(os.path.join(tmp, "group_commit.db"))
+            self.assertTrue(model.db.start_group_commit(max_delay=0.01))
+            writer = model.db.group_writer
+            insert = "INSERT INTO clients (name, phone, email, document, name_key) VALUES (?, ?, '', 'ID', ?)"
+            threads = [threading.Thread(target=lambda: [writer.execute(insert, ("Клієнт", "+380500000000", "клієнт"))
+                                                        for _ in range(25)]) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            # Записи DAO тим часом ідуть через основне з'єднання й чекають на блокування, а не падають
+            for _ in range(20):
+                self.assertTrue(model.add_bike("Giant", "SN", "Гірський", 50.0))
+            for thread in threads:
+                thread.join()
+            self.assertEqual(model.count_clients(), 100)
+            self.assertEqual(len(model.get_all_bikes()), 20)
+            self.assertEqual(writer.commands, 100, "DAO не пишуть через потік групової фіксації")
+            self.assertLess(writer.batches, 100, "Записи мають фіксуватися пакетами")
+
+            failing = writer.submit(lambda cursor: cursor.execute("INSERT INTO missing_table VALUES (1)"))
+            passing = writer.submit(lambda cursor: cursor.execute("UPDATE clients SET phone = '1' WHERE id = 1"))
+            with self.assertRaises(sqlite3.OperationalError):
+                failing.result()
+            passing.result()
+            self.assertEqual(model.get_client(1).phone, "1")
+
+            # Запис з іншого процесу: лише іменовані команди й лише з випадковим ключем
+            with self.assertRaises(ValueError):
+                writer.serve(b"bike-rental")
+            key_path = os.path.join(tmp, "kiosk.key")
+            authkey = create_authkey_file(key_path)
+            if os.name == "posix":
+                self.assertEqual(os.stat(key_path).st_mode & 0o777, 0o600)
+            address = writer.serve(authkey)
+            client = WriterClient(address, authkey)
+            client_id, _ = client.execute("add_client", "Кіоск", "+380509999999", "", "ID")
+            self.assertEqual(model.get_client(client_id).name, "Кіоск")
+            with self.assertRaises(sqlite3.DatabaseError):
+                client.execute("DELETE FROM clients")
+            with self.assertRaises(sqlite3.DatabaseError):
+                client.execute("add_client", "Кіоск")
+            self.assertEqual(model.count_clients(), 101)
+            rental_id, _ = model.create_rental(client_id, 1, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 2, 0)
+            self.assertEqual(tuple(client.execute("return_bike", 1)), (1, 1))
+            cursor = model.db.get_cursor()
+            cursor.execute("SELECT status, end_time FROM rentals WHERE id = ?", (rental_id,))
+            status, end_time = cursor.fetchone()
+            self.assertEqual(status, "Завершена", "Повернення в кіоску завершує оренду")
+            self.assertIsNotNone(end_time)
+            self.assertEqual(model.get_bike(1).status, "Доступний")
+            client.close()
+            with self.assertRaises(Exception):
+                WriterClient(address, os.urandom(32))
+            model.db.close()
+
+    def test_hour_of_week_utilization(self):
+        # Тест теплової карти завантаженості: частки годин тижня по велосипеду, типу та звіт
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN1", "Гірський", 50.0)
+        self.model.add_bike("Giant", "SN2", "Гірський", 50.0)
+        # 2025-04-07 – понеділок; оренда з 10:00 до 12:30
+        rental_id, _ = self.model.create_rental(1, 1, "2025-04-07 10:00:00", 3, 0)
+        self.model.db.get_cursor().execute("UPDATE rentals SET status = 'Завершена', end_time = ? WHERE id = ?",
+                                           (int(datetime(2025, 4, 7, 12, 30).timestamp()), rental_id))
+        utilization = self.model.get_utilization("2025-04-07", "2025-04-13")
+        bike_ids, by_bike = utilization["bikes"]
+        self.assertEqual(bike_ids, [1, 2])
+        self.assertEqual(list(by_bike[0][9:14]), [0.0, 1.0, 1.0, 0.5, 0.0])
+        self.assertEqual(by_bike[1].sum(), 0)
+        self.assertEqual(list(utilization["types"][1][0][10:13]), [0.5, 0.5, 0.25])
+
+        columns, rows, total = self.model.preview_report("Завантаженість за годинами тижня", "2025-04-07", "2025-04-13")
+        self.assertEqual(total, 14, "7 днів для типу 'Гірський' та 7 для всього парку")
+        self.assertEqual(rows[0][:2] + rows[0][2 + 10:2 + 13], ["Гірський", "Пн", 50, 50, 25])
+
+    def test_demand_forecast(self):
+        # Тест прогнозу попиту: погодинний ряд, сезонний профіль і інкрементний дорахунок ряду
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN1", "Міський", 40.0)
+        self.model.add_bike("Giant", "SN2", "Міський", 40.0)
+        self.model.add_bike("Trek", "SN3", "Гірський", 50.0)
+        cursor = self.model.db.get_cursor()
+
+        def add_finished(bike_id, start, hours):
+            cursor.execute("INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, "
+                           "total_cost, discount) VALUES (1, ?, ?, ?, ?, 'Завершена', 100, 0)",
+                           (bike_id, int(start.timestamp()), hours, int((start + timedelta(hours=hours)).timestamp())))
+
+        # Чотири тижні з 2025-03-03 (понеділок): щоп'ятниці обидва міські велосипеди з 17:00 до 19:00,
+        # щовівторка гірський з 09:00 до 10:00
+        for week in range(4):
+            friday = datetime(2025, 3, 7, 17) + timedelta(weeks=week)
+            add_finished(1, friday, 2)
+            add_finished(2, friday, 2)
+            add_finished(3, datetime(2025, 3, 4, 9) + timedelta(weeks=week), 1)
+        # Дві одночасні півгодинні оренди до початку історії прогнозу: середнє за годину 1, але пік – 2
+        add_finished(1, datetime(2025, 2, 27, 12), 0.5)
+        add_finished(2, datetime(2025, 2, 27, 12), 0.5)
+        self.model.db.commit()
+
+        columns, rows = self.model.get_forecast_report("2025-03-03", "2025-03-30", weeks=2)
+        self.assertEqual(len(rows), 4, "2 типи × 2 тижні")
+        by_type = {row[0]: dict(zip(columns, row)) for row in rows if row[1] == "2025-03-31"}
+        self.assertEqual(by_type["Міський"]["Прогноз піку"], 2.0)
+        self.assertEqual(by_type["Міський"]["Пік (день, година)"], "Пт 17:00")
+        self.assertEqual(by_type["Міський"]["Рекомендований парк"], 2)
+        self.assertEqual(by_type["Гірський"]["Пік (день, година)"], "Вт 09:00")
+
+        # Денний ряд: пік, велосипедо-години та кількість оренд по типах за кожну добу
+        columns, rows = self.model.get_daily_demand_report("2025-03-03", "2025-03-09")
+        self.assertEqual(len(rows), 2 * 7)
+        daily = {(row[0], row[1]): row[2:] for row in rows}
+        self.assertEqual(daily[("Міський", "2025-03-07")], [2.0, 4.0, 2])
+        self.assertEqual(daily[("Гірський", "2025-03-04")], [1.0, 1.0, 1])
+        self.assertEqual(daily[("Міський", "2025-03-06")], [0, 0.0, 0])
+        columns, rows = self.model.get_daily_demand_report("2025-02-27", "2025-02-27")
+        self.assertEqual(rows[1], ["Міський", "2025-02-27", 2, 1.0, 2], "Пік – одночасні оренди, а не середнє")
+
+        # Нова оренда потрапляє в ряд без повного перерахунку; результат збігається з rebuild()
+        add_finished(3, datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3), 2)
+        self.model.db.commit()
+        self.assertLessEqual(self.model.update_demand_history(), 30, "Перераховуються лише останні години")
+        query = "SELECT bike_type, hour, bike_hours, rentals, peak FROM demand_hourly ORDER BY bike_type, hour"
+        cursor.execute(query)
+        incremental = [tuple(row) for row in cursor.fetchall()]
+        self.model.update_demand_history(rebuild=True)
+        cursor.execute(query)
+        self.assertEqual(incremental, [tuple(row) for row in cursor.fetchall()])
+        self.assertEqual(sum(row[2] for row in incremental), 4 * 2 * 2 + 1 + 4 + 2)
+
+    def test_client_segments_report(self):
+        # Тест аналітики клієнтів: однойменні клієнти окремо, клієнти без оренд, RFM та порційна обробка
+        from client_analytics import client_segments
+        from model import day_bounds
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_client("Іван Іванов", "+380671112233", "ivan2@example.com", "Passport456")
+        self.model.add_client("Марія Петренко", "+380931234567", "maria@example.com", "Passport789")
+        self.model.add_bike("Giant", "SN1", "Гірський", 50.0)
+        self.model.add_bike("Trek", "SN2", "Міський", 40.0)
+        cursor = self.model.db.get_cursor()
+        for client_id, bike_id, start, hours, cost in ((1, 1, datetime(2025, 4, 1, 10), 2, 100),
+                                                       (1, 1, datetime(2025, 4, 20, 10), 3, 150),
+                                                       (1, 2, datetime(2025, 4, 25, 10), 1, 40),
+                                                       (2, 2, datetime(2025, 4, 2, 10), 4, 160)):
+            cursor.execute("INSERT INTO rentals (client_id, bike_id, start_time, duration, end_time, status, "
+                           "total_cost, discount) VALUES (?, ?, ?, ?, ?, 'Завершена', ?, 0)",
+                           (client_id, bike_id, int(start.timestamp()), hours,
+                            int((start + timedelta(hours=hours)).timestamp()), cost))
+        self.model.db.commit()
+
+        columns, rows, total = self.model.preview_report("Аналіз клієнтської бази", "2025-04-01", "2025-04-30")
+        self.assertEqual(total, 3, "Клієнт без оренд теж у звіті")
+        by_id = {row[0]: dict(zip(columns, row)) for row in rows}
+        self.assertEqual(by_id[1]["Кількість оренд"], 3)
+        self.assertEqual(by_id[1]["Загальна сума"], 290)
+        self.assertEqual(by_id[1]["Середня тривалість (год)"], 2.0)
+        self.assertEqual(by_id[1]["Улюблений тип"], "Гірський")
+        self.assertEqual(by_id[1]["Днів від останньої оренди"], 5)
+        self.assertEqual(by_id[2]["Загальна сума"], 160, "Однойменні клієнти не об'єднуються")
+        self.assertEqual(by_id[3]["Сегмент"], "Без оренд")
+        self.assertEqual(rows[0][0], 1, "Сортування за сумою")
+
+        bounds = day_bounds("2025-04-01", "2025-04-30")
+        self.assertEqual(client_segments(self.model.db.read_cursor(), bounds, bounds[1], chunk_size=1),
+                         client_segments(self.model.db.read_cursor(), bounds, bounds[1]))
+
+    def test_recent_activity_ring_buffer(self):
+        # Тест стрічки останніх подій: заповнення запитом, події з записів моделі та обмежений розмір
+        from activity import RecentActivity
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        for number in range(4):
+            self.model.add_bike(f"Giant {number}", f"SN{number}", "Гірський", 50.0)
+        first_id, _ = self.model.create_rental(1, 1, "2025-04-07 10:00:00", 2, 0)
+        self.model.complete_rental(first_id)
+        self.model.create_rental(1, 2, "2025-04-07 11:00:00", 2, 0)
+
+        self.model.activity = RecentActivity(size=3)
+        self.model.seed_recent_activity()
+        events, version = self.model.get_recent_activity()
+        self.assertEqual([(event[0], event[1]) for event in events], [(2, "create"), (1, "complete")])
+
+        self.model.extend_rental(2, 1)
+        third_id, _ = self.model.create_rental(1, 3, "2025-04-07 12:00:00", 2, 0)
+        events, new_version = self.model.get_recent_activity()
+        self.assertGreater(new_version, version)
+        self.assertEqual([(event[0], event[1]) for event in events], [(third_id, "create"), (2, "extend"), (2, "create")],
+                         "Найстаріша подія витісняється з буфера")
+        self.assertEqual(events[0][2:4], ("Іван Іванов", "Giant 2"))
+
+    def test_ui_latency_recorder(self):
+        # Тест інструментування обробників: вкладені слоти, час моделі, зависання та JSON-звіт
+        recorder = LatencyRecorder(stall_threshold=0.05, beat_interval=0.01)
+        model = TimedModel(self.model, recorder)
+        inner = recorder.wrap_slot("inner", lambda: model.count_clients())
+
+        def outer():
+            model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+            return inner()
+        outer = recorder.wrap_slot("outer", outer)
+        for _ in range(3):
+            outer()
+        self.assertEqual(model.count_clients(), 3, "Поза обробником модель працює як звичайно")
+        summary = {row["handler"]: row for row in recorder.summary()}
+        self.assertEqual(list(summary), ["outer"], "Вкладений слот входить у час зовнішнього")
+        self.assertEqual(summary["outer"]["calls"], 3)
+        self.assertLessEqual(summary["outer"]["model_p95_ms"], summary["outer"]["max_ms"])
+
+        recorder.add_repaint(0.004)
+        self.assertEqual(recorder.samples["outer"][-1][2], 0.004, "Перемальовування після обробника")
+        recorder.last_beat -= 0.2
+        recorder.heartbeat()
+        stalls = recorder.stall_list()
+        self.assertEqual(len(stalls), 1)
+        self.assertEqual(stalls[0]["handler"], "outer")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ui_latency.json")
+            ok, _ = recorder.dump(path)
+            self.assertTrue(ok)
+            with open(path, encoding="utf-8") as file:
+                report = json.load(file)
+        self.assertEqual(report["handlers"][0]["handler"], "outer")
+        self.assertEqual(len(report["stalls"]), 1)
+        self.assertEqual(inner(False), 3, "Зайвий аргумент сигналу (checked) не передається обробнику")
+
+    @unittest.skipUnless(importlib.util.find_spec("PyQt5"), "потрібен PyQt5")
+    def test_computed_reports_not_previewed_from_timer(self):
+        # Тест живого перегляду: обчислювані звіти не рахуються з таймера, а кнопка рахує їх у фоновому потоці
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication, QComboBox, QLabel, QPushButton, QTableView
+        from view import MainWindow
+        from controller import BikeRentalController
+        from model import COMPUTED_REPORTS, REPORT_TYPES
+        app = QApplication.instance() or QApplication([])
+        with tempfile.TemporaryDirectory() as tmp:
+            model = BikeRentalModel(os.path.join(tmp, "preview.db"))
+            model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+            view = MainWindow()
+            controller = BikeRentalController(model, view)
+            controller.backup_timer.stop()
+            computed = []
+            original = model.get_computed_report
+
+            def counted(*args, **kwargs):
+                computed.append(threading.current_thread())
+                return original(*args, **kwargs)
+            model.get_computed_report = counted
+            combo = view.reports_tab.findChild(QComboBox, "report_type_combo")
+            label = view.reports_tab.findChild(QLabel, "preview_label")
+            table = view.reports_tab.findChild(QTableView, "preview_table")
+            for report_type in COMPUTED_REPORTS:
+                combo.setCurrentIndex(REPORT_TYPES.index(report_type))
+                controller.preview_timer.timeout.emit()
+                self.assertIn("Переглянути", label.text())
+            self.assertEqual(computed, [], "Таймер не запускає обчислення звітів")
+
+            combo.setCurrentIndex(REPORT_TYPES.index(COMPUTED_REPORTS[0]))
+            # Справжній сигнал clicked(bool) через обгорнутий слот без аргументів
+            view.reports_tab.findChild(QPushButton, "preview_btn").click()
+            self.assertIsNotNone(controller.preview_future, "Кнопка запускає обчислення")
+            controller.preview_future.result(timeout=10)
+            controller.show_computed_preview()
+            self.assertEqual(len(computed), 1)
+            self.assertIsNot(computed[0], threading.main_thread(), "Звіт рахується у фоновому потоці")
+            self.assertEqual(table.model().rowCount(), 1)
+            controller.overdue_timer.stop()
+            view.close()
+            if model.backups.thread is not None:
+                model.backups.thread.join()
+            model.db.close()
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "потрібен pyarrow")
+    def test_incremental_parquet_export(self):
+        # Тест інкрементного експорту в Parquet: розбиття за місяцем, межі змін і видалення
+        import pyarrow.parquet as pq
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN1", "Міський", 40.0)
+        self.model.add_bike("Trek", "SN2", "Гірський", 50.0)
+        cursor = self.model.db.get_cursor()
+
+        def add_rental(start):
+            cursor.execute("INSERT INTO rentals (client_id, bike_id, start_time, duration, status, total_cost, "
+                           "discount) VALUES (1, 1, ?, 2, 'Активна', 80, 0)", (int(start.timestamp()),))
+            self.model.db.commit()
+
+        add_rental(datetime(2025, 3, 31, 10))
+        add_rental(datetime(2025, 4, 1, 10))
+        self.model.add_payment(1, 1, 80.0, "Готівкою")
+        with tempfile.TemporaryDirectory() as tmp:
+            ok, _ = self.model.export_columnar(tmp)
+            self.assertTrue(ok)
+            months = sorted(os.listdir(os.path.join(tmp, "rentals")))
+            self.assertEqual(months, ["month=2025-03", "month=2025-04"])
+            self.assertEqual(pq.read_table(os.path.join(tmp, "rentals")).num_rows, 2)
+            self.assertEqual(pq.read_table(os.path.join(tmp, "bikes")).num_rows, 2)
+
+            # Друга хвиля: зміна оренди, нова оренда, новий платіж і видалення велосипеда
+            cursor.execute("UPDATE rentals SET status = 'Завершена' WHERE id = 1")
+            add_rental(datetime(2025, 4, 2, 10))
+            self.model.add_payment(1, 3, 80.0, "Карткою")
+            self.model.delete_bike(2)
+            ok, message = self.model.export_columnar(tmp)
+            self.assertTrue(ok, message)
+            cursor.execute("SELECT table_name, last_value FROM export_watermarks")
+            self.assertEqual(len(cursor.fetchall()), 5)
+            rentals = pq.read_table(os.path.join(tmp, "rentals")).to_pylist()
+            self.assertEqual(len(rentals), 4, "Змінена оренда дописана новою версією")
+            latest = {}
+            for row in sorted(rentals, key=lambda row: row["change_seq"] or 0):
+                latest[row["id"]] = row
+            self.assertEqual(latest[1]["status"], "Завершена")
+            self.assertEqual(latest[3]["start_time"].year, 2025)
+            self.assertEqual(pq.read_table(os.path.join(tmp, "payments")).num_rows, 2)
+            deletions = pq.read_table(os.path.join(tmp, "deletions")).to_pylist()
+            self.assertEqual([(row["table_name"], row["row_id"]) for row in deletions], [("bikes", 2)])
+
+            # Без змін експорт нічого не дописує
+            files = sorted(os.path.join(d, name) for d, _, names in os.walk(tmp) for name in names)
+            self.assertTrue(self.model.export_columnar(tmp)[0])
+            self.assertEqual(sorted(os.path.join(d, name) for d, _, names in os.walk(tmp) for name in names), files)
+
+    def test_replication_batches_between_depots(self):
+        # Тест реплікації: пакет пункту застосовується в центральній базі з перекладом id,
+        # повторне застосування нічого не змінює, конфлікт вирішує пізніша зміна
+        depot, office = self.model, BikeRentalModel(":memory:")
+        depot.replication.install("depot")
+        office.replication.install("office")
+        office.add_client("Марія Петренко", "+380671112233", "maria@example.com", "Passport456")
+        depot.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        depot.add_bike("Giant", "SN1", "Міський", 40.0)
+        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rental_id, _ = depot.create_rental(1, 1, start_time, 2, 0)
+        invoice_id, _ = depot.generate_invoice(rental_id)
+        depot.add_payment(invoice_id, rental_id, 80.0, "Готівкою")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first, _ = depot.replication.export_batch(tmp)
+            ok, message = office.replication.apply_batch(first)
+            self.assertTrue(ok, message)
+            self.assertTrue(office.replication.apply_batch(first)[0])
+            cursor = office.db.get_cursor()
+            cursor.execute('''
+                SELECT c.id, c.name, c.rentals_count, b.serial_number, p.amount
+                FROM rentals r JOIN clients c ON c.id = r.client_id JOIN bikes b ON b.id = r.bike_id
+                JOIN payments p ON p.rental_id = r.id
+            ''')
+            self.assertEqual([tuple(row) for row in cursor.fetchall()], [(2, "Іван Іванов", 1, "SN1", 80.0)])
+            cursor.execute("SELECT total, payments_count FROM payment_settlements")
+            self.assertEqual([tuple(row) for row in cursor.fetchall()], [(80.0, 1)])
+
+            # Обидві бази змінюють клієнта; пізніша зміна (офісу) перемагає в обох
+            depot.complete_rental(rental_id)
+            depot.update_client(1, email="old@example.com")
+            time.sleep(0.01)
+            office.update_client(2, email="new@example.com")
+            second, _ = depot.replication.export_batch(tmp)
+            self.assertTrue(office.replication.apply_batch(second)[0])
+            back, _ = office.replication.export_batch(tmp)
+            self.assertTrue(depot.replication.apply_batch(back)[0])
+            self.assertEqual(office.get_client(2).email, "new@example.com")
+            self.assertEqual(depot.get_client(1).email, "new@example.com")
+            self.assertEqual(office.get_client(1).name, "Марія Петренко", "Клієнт офісу не потрапляє до пункту")
+            cursor.execute("SELECT status FROM rentals WHERE id = 1")
+            self.assertEqual(cursor.fetchone()[0], "Завершена")
+            cursor.execute("SELECT reason FROM replication_conflicts")
+            self.assertEqual([row[0] for row in cursor.fetchall()], ["Пізніша зміна в цій базі"])
+
+            # Пакет після пропущеного не застосовується
+            depot.add_client("Петро Коваль", "+380931234567", "", "")
+            depot.replication.export_batch(os.path.join(tmp, "lost"))
+            depot.add_client("Олена Шевчук", "+380971234567", "", "")
+            third, _ = depot.replication.export_batch(tmp)
+            ok, message = office.replication.apply_batch(third)
+            self.assertFalse(ok)
+            self.assertIn("Бракує", message)
+        office.db.close()
+
+    def test_bike_odometer_and_service_due(self):
+        # Тест наробітку велосипеда: лічильники при завершенні, попередження при продовженні,
+        # позначка обслуговування та скидання після ремонту
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_bike("Giant", "SN1", "Міський", 40.0)
+        self.model.set_service_interval("Міський", 3, 10)
+        two_hours_ago = (datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S")
+
+        rental_id, _ = self.model.create_rental(1, 1, two_hours_ago, 2, 0)
+        self.model.complete_rental(rental_id)
+        odometer = self.model.get_bike_odometer(1)
+        self.assertAlmostEqual(odometer["hours"], 2.0, delta=0.01)
+        self.assertEqual(odometer["rentals"], 1)
+        self.assertFalse(odometer["service_due"])
+        self.assertEqual(self.model.get_bikes_due_for_service(), [])
+
+        rental_id, _ = self.model.create_rental(1, 1, two_hours_ago, 1, 0)
+        ok, message = self.model.extend_rental(rental_id, 1)
+        self.assertTrue(ok)
+        self.assertIn("обслуговування", message)
+        self.model.complete_rental(rental_id)
+        due = self.model.get_bikes_due_for_service()
+        self.assertEqual([(row[0], row[5]) for row in due], [(1, 2)])
+        self.assertEqual(self.model.count_bikes_due_for_service(), 1)
+
+        # Ремонт прибирає велосипед зі списку, повернення з ремонту – нове обслуговування
+        self.model.update_bike(1, status="Ремонт")
+        self.assertEqual(self.model.count_bikes_due_for_service(), 0)
+        self.model.update_bike(1, status="Доступний")
+        odometer = self.model.get_bike_odometer(1)
+        self.assertFalse(odometer["service_due"])
+        self.assertEqual(odometer["rentals_since_service"], 0)
+        self.assertEqual(odometer["rentals"], 2)
+        self.assertIsNotNone(odometer["last_maintenance_date"])
+
+    def test_dynamic_pricing_by_utilization_and_bands(self):
+        # Тест динамічного тарифу: лічильники типів, надбавка за завантаженістю, діапазони доби, межі та кеш
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        for i in range(5):
+            self.model.add_bike("Giant", f"SN{i}", "Гірський", 100.0)
+        self.model.add_bike("Trek", "SN9", "Міський", 40.0)
+        self.model.update_bike(5, status="Ремонт")
+        self.assertEqual(self.model.get_bike_type_counts(), [("Гірський", 5, 4, 1), ("Міський", 1, 1, 0)])
+        self.assertFalse(self.model.set_pricing_rule("Гірський", 1.5, 1.0, 1.0, 1.6)[0])
+        self.assertTrue(self.model.set_pricing_rule("Гірський", 0.5, 1.0, 1.0, 1.6)[0])
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.assertEqual(self.model.quote_rental(4, 2, 0, now), (200.0, 1.0))
+        rental_ids = [self.model.create_rental(1, bike_id, now, 2, 0)[0] for bike_id in (1, 2, 3)]
+        self.assertEqual([self.model.get_rental(rental_id).total_cost for rental_id in rental_ids], [200.0] * 3)
+        self.assertEqual(self.model.get_bike_type_counts()[0], ("Гірський", 5, 1, 1))
+
+        # Зайнято 3 з 4 справних: завантаженість 0.75, надбавка 1.0 × (0.75 - 0.5) / 0.5
+        evening = datetime.now().replace(hour=20, minute=30)
+        morning = datetime.now().replace(hour=10, minute=0)
+        hits = self.model.pricing.hits
+        self.assertEqual(self.model.quote_rental(4, 2, 0, morning), (300.0, 1.5))
+        self.assertEqual(self.model.calculate_rental_price(4, 2, 10, morning), 270.0)
+        self.assertEqual(self.model.pricing.hits, hits + 1, "Повторний розрахунок береться з кешу")
+        self.assertEqual(self.model.quote_rental(6, 1, 0, morning), (40.0, 1.0), "Інші типи без надбавки")
+
+        # Вечірній діапазон ×1.2 обмежується max_multiplier 1.6
+        self.assertTrue(self.model.add_pricing_band(20, 22, 1.2)[0])
+        self.assertEqual(self.model.quote_rental(4, 2, 0, evening), (320.0, 1.6))
+        self.assertEqual(self.model.quote_rental(4, 2, 0, morning), (300.0, 1.5))
+        self.assertTrue(self.model.delete_pricing_band(self.model.get_pricing_bands()[0][0])[0])
+
+        # Продовження оплачує лише додаткову годину за поточним тарифом
+        self.model.extend_rental(rental_ids[1], 1)
+        self.assertEqual(self.model.get_rental(rental_ids[1]).total_cost, 350.0)
+
+        # Повернення велосипеда скидає кеш: завантаженість 0.5 – без надбавки
+        self.model.complete_rental(rental_ids[0])
+        self.assertEqual(self.model.quote_rental(4, 2, 0, morning), (200.0, 1.0))
+
+    def test_prefix_search_for_pickers(self):
+        # Тест пошуку за префіксом для полів вибору клієнта та велосипеда
+        self.model.add_client("Іван Іванов", "+380501234567", "ivan@example.com", "Passport123")
+        self.model.add_client("Марія Петренко", "+380671112233", "maria@example.com", "Passport456")
+        self.assertEqual([c.name for c in self.model.search_clients_prefix("іВА")], ["Іван Іванов"])
+        self.assertEqual([c.name for c in self.model.search_clients_prefix("+38067")], ["Марія Петренко"])
+        # Пошук за прізвищем, частиною подвійного прізвища та кількома словами в будь-якому порядку
+        self.assertEqual([c.name for c in self.model.search_clients_prefix("Петрен")], ["Марія Петренко"])
+        self.model.add_client("Олена Коваль-Шевчук", "+380931112233", "olena@example.com", "Passport789")
+        self.assertEqual([c.name for c in self.model.search_clients_prefix("шевч")], ["Олена Коваль-Шевчук"])
+        self.assertEqual([c.name for c in self.model.search_clients_prefix("петренко мар")], ["Марія Петренко"])
+        self.assertEqual(self.model.search_clients_prefix("петренко ів"), [])
+        self.model.update_client(2, name="Марія Бойко")
+        self.assertEqual(self.model.search_clients_prefix("петренко"), [])
+        self.assertEqual([c.name for c in self.model.search_clients_prefix("бой")], ["Марія Бойко"])
+
+        self.model.add_bike("Giant Talon", "SN1", "Гірський", 50.0)
+        self.model.add_bike("Giant Escape", "SN2", "Міський", 40.0)
+        self.model.update_bike(2, status="Ремонт")
+        bikes = self.model.search_available_bikes_prefix("giant")
+        self.assertEqual([b.model for b in bikes], ["Giant Talon"], "Велосипеди не в статусі 'Доступний' не пропонуються")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,203 @@
+import functools
+import inspect
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from math import ceil
+
+# ===== Затримки обробників інтерфейсу =====
+# Модуль не залежить від Qt: контролер обгортає свої слоти (wrap_slot) і модель (TimedModel),
+# таймер головного потоку викликає heartbeat(), а застосунок повідомляє час перемальовування
+# (add_repaint). Окремий потік-сторож помічає зависання циклу подій і знімає стек головного потоку.
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль за найближчим рангом для відсортованого списку (0 для порожнього)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(ceil(fraction * len(sorted_values)) - 1, 0))]
+
+
+class LatencyRecorder:
+    """
+    Ковзні вибірки останніх window викликів кожного обробника: загальний час, час у викликах
+    моделі та час перемальовування Qt одразу після обробника (до repaint_window секунд).
+    Вкладені виклики інших обгорнутих слотів вважаються частиною зовнішнього обробника.
+    Зависанням вважається пауза між heartbeat() більша за stall_threshold секунд.
+    """
+
+    def __init__(self, window=500, stall_threshold=0.25, beat_interval=0.1, repaint_window=0.5, max_stalls=100):
+        self.window = window
+        self.stall_threshold = stall_threshold
+        self.beat_interval = beat_interval
+        self.repaint_window = repaint_window
+        self.samples = {}
+        self.stalls = deque(maxlen=max_stalls)
+        self.lock = threading.Lock()
+        self.current = None
+        self.in_model = False
+        self.model_time = 0.0
+        self.last_handler = None
+        self.last_sample = None
+        self.last_end = 0.0
+        self.last_beat = time.perf_counter()
+        self.stall_handler = None
+        self.stall_stack = None
+        self.main_thread_id = threading.main_thread().ident
+        self.watchdog = None
+        self.stopped = threading.Event()
+
+    # --- Обробники та модель ---
+    def wrap_slot(self, name, function):
+        # Qt передає слоту аргументи сигналу (clicked(bool) – checked), тому обгортка, як і сам PyQt
+        # для звичайних методів, відкидає позиційні аргументи, яких обробник не приймає
+        parameters = inspect.signature(function).parameters.values()
+        if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+            limit = None
+        else:
+            limit = sum(parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+                        for parameter in parameters)
+
+        @functools.wraps(function)
+        def slot(*args, **kwargs):
+            args = args[:limit]
+            if self.current is not None:
+                return function(*args, **kwargs)
+            self.current = name
+            self.model_time = 0.0
+            self.last_sample = None
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.finish(name, time.perf_counter() - started)
+        return slot
+
+    def finish(self, name, wall):
+        sample = [wall, self.model_time, 0.0]
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(sample)
+        self.current = None
+        self.last_handler = name
+        self.last_sample = sample
+        self.last_end = time.perf_counter()
+
+    def wrap_model_call(self, function):
+        @functools.wraps(function)
+        def call(*args, **kwargs):
+            # Поза обробником і у вкладених викликах моделі час не рахується (або вже рахується)
+            if self.current is None or self.in_model:
+                return function(*args, **kwargs)
+            self.in_model = True
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.model_time += time.perf_counter() - started
+                self.in_model = False
+        return call
+
+    def add_repaint(self, seconds):
+        """Час перемальовування додається до останнього обробника, якщо той завершився нещодавно."""
+        sample = self.last_sample
+        if sample is None or self.current is not None:
+            return
+        if time.perf_counter() - self.last_end > self.repaint_window:
+            self.last_sample = None
+            return
+        sample[2] += seconds
+
+    # --- Сторож циклу подій ---
+    def heartbeat(self):
+        """Викликається таймером головного потоку кожні beat_interval секунд."""
+        now = time.perf_counter()
+        gap = now - self.last_beat - self.beat_interval
+        self.last_beat = now
+        if gap > self.stall_threshold:
+            with self.lock:
+                self.stalls.append({"time": datetime.now().isoformat(timespec="seconds"),
+                                    "duration_ms": round(gap * 1000, 1),
+                                    "handler": self.stall_handler or self.last_handler,
+                                    "stack": self.stall_stack})
+        self.stall_handler = None
+        self.stall_stack = None
+
+    def start_watchdog(self):
+        if self.watchdog is not None:
+            return
+        self.last_beat = time.perf_counter()
+        self.stopped.clear()
+        self.watchdog = threading.Thread(target=self.watch, name="ui-latency-watchdog", daemon=True)
+        self.watchdog.start()
+
+    def stop_watchdog(self):
+        if self.watchdog is not None:
+            self.stopped.set()
+            self.watchdog.join()
+            self.watchdog = None
+
+    def watch(self):
+        while not self.stopped.wait(self.stall_threshold / 2):
+            if self.stall_stack is not None:
+                continue
+            if time.perf_counter() - self.last_beat - self.beat_interval > self.stall_threshold:
+                # Стек знімається під час зависання: видно, що саме виконує головний потік
+                frame = sys._current_frames().get(self.main_thread_id)
+                self.stall_handler = self.current
+                self.stall_stack = "".join(traceback.format_stack(frame)[-8:]) if frame is not None else None
+
+    # --- Підсумки ---
+    def summary(self):
+        """Перцентилі по обробниках у мілісекундах, від найповільнішого (за p95)."""
+        with self.lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+        rows = []
+        for name, values in samples.items():
+            wall, model, repaint = (sorted(column) for column in zip(*values))
+            rows.append({"handler": name, "calls": len(values),
+                         "p50_ms": round(percentile(wall, 0.5) * 1000, 1),
+                         "p95_ms": round(percentile(wall, 0.95) * 1000, 1),
+                         "p99_ms": round(percentile(wall, 0.99) * 1000, 1),
+                         "max_ms": round(wall[-1] * 1000, 1),
+                         "model_p95_ms": round(percentile(model, 0.95) * 1000, 1),
+                         "repaint_p95_ms": round(percentile(repaint, 0.95) * 1000, 1)})
+        rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+        return rows
+
+    def stall_list(self):
+        with self.lock:
+            return list(self.stalls)
+
+    def dump(self, path):
+        """Зберігає підсумки та зависання у JSON; повертає (успіх, повідомлення)."""
+        report = {"generated": datetime.now().isoformat(timespec="seconds"),
+                  "stall_threshold_ms": round(self.stall_threshold * 1000),
+                  "handlers": self.summary(),
+                  "stalls": self.stall_list()}
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            return True, f"Діагностику збережено: {path}"
+        except Exception as e:
+            print("Error saving UI latency report:", e)
+            return False, "Помилка збереження діагностики: " + str(e)
+
+
+class TimedModel:
+    """Замісник моделі для контролера: виклики її методів з обробників рахуються як час моделі."""
+
+    def __init__(self, model, recorder):
+        self.model = model
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        value = getattr(self.model, name)
+        if callable(value) and not name.startswith("_"):
+            return self.recorder.wrap_model_call(value)
+        return value
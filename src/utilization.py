@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+# ===== Завантаженість парку за годинами тижня =====
+
+HOURS_PER_WEEK = 168
+# 1970-01-01 (початок відліку часу Unix) – четвер, тож понеділок 00:00 зсунутий на 72 години
+EPOCH_WEEK_OFFSET_HOURS = 72
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд")
+
+
+def hour_of_week(hours):
+    """Номер години тижня (0 – понеділок 00:00) для годин від початку відліку."""
+    return (hours + EPOCH_WEEK_OFFSET_HOURS) % HOURS_PER_WEEK
+
+
+def wall_seconds(date_str):
+    """Місцева дата 'YYYY-MM-DD' як секунди настінного часу (без поправки на часовий пояс)."""
+    return int((datetime.strptime(date_str, "%Y-%m-%d") - datetime(1970, 1, 1)).total_seconds())
+
+
+def epoch_to_wall(epochs):
+    """
+    Секунди Unix -> секунди настінного місцевого часу. Зсув часового поясу (з урахуванням літнього
+    часу) обчислюється один раз на кожну годину діапазону, а не для кожного значення.
+    """
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if epochs.size == 0:
+        return epochs
+    hours = epochs // 3600
+    first = int(hours.min())
+    epoch_start = datetime(1970, 1, 1)
+    offsets = np.array([int((datetime.fromtimestamp(hour * 3600) - epoch_start).total_seconds()) - hour * 3600
+                        for hour in range(first, int(hours.max()) + 1)], dtype=np.int64)
+    return epochs + offsets[hours - first]
+
+
+def merge_overlaps(starts, ends, groups):
+    """
+    Об'єднує інтервали, що перекриваються в межах групи (велосипед не може бути зайнятий двічі).
+    Повертає неперетинні (starts, ends, groups): початок кожного інтервалу зсувається за кінець
+    попередніх інтервалів групи, порожні інтервали відкидаються.
+    """
+    if starts.size == 0:
+        return starts, ends, groups
+    order = np.lexsort((starts, groups))
+    starts, ends, groups = starts[order], ends[order], groups[order]
+    # Зсув за групою розносить групи на спільній осі, тож накопичений максимум не переходить між ними
+    origin = starts.min()
+    span = int(ends.max() - origin) + 1
+    shift = groups * span - origin
+    reach = np.maximum.accumulate(ends + shift)
+    previous = np.concatenate(([np.iinfo(np.int64).min // 2], reach[:-1])) - shift
+    starts = np.maximum(starts, previous)
+    keep = ends > starts
+    return starts[keep], ends[keep], groups[keep]
+
+
+def occupancy_by_hour_of_week(starts, ends, groups, group_count):
+    """
+    Секунди зайнятості інтервалів [starts, ends) у кожній годині тижня для кожної групи.
+    starts та ends – секунди настінного часу, groups – номери груп 0..group_count-1.
+    Повертає масив (group_count, 168).
+    Неповні перша й остання години інтервалу додаються через bincount з вагами; повні тижні –
+    однаково в усі години групи; залишок повних годин – різницевим масивом на подвоєній осі
+    тижня (інтервал може переходити через неділю) з наступним cumsum. Усе без циклу по інтервалах.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    groups = np.asarray(groups, dtype=np.int64)
+    keep = ends > starts
+    starts, ends, groups = starts[keep], ends[keep], groups[keep]
+    size = group_count * HOURS_PER_WEEK
+    first_hour = starts // 3600
+    last_hour = ends // 3600
+
+    same = first_hour == last_hour
+    occupied = np.zeros(size)
+    occupied += np.bincount(groups[same] * HOURS_PER_WEEK + hour_of_week(first_hour[same]),
+                            weights=ends[same] - starts[same], minlength=size)
+    starts, ends, groups = starts[~same], ends[~same], groups[~same]
+    first_hour, last_hour = first_hour[~same], last_hour[~same]
+    occupied += np.bincount(groups * HOURS_PER_WEEK + hour_of_week(first_hour),
+                            weights=(first_hour + 1) * 3600 - starts, minlength=size)
+    occupied += np.bincount(groups * HOURS_PER_WEEK + hour_of_week(last_hour),
+                            weights=ends - last_hour * 3600, minlength=size)
+    occupied = occupied.reshape(group_count, HOURS_PER_WEEK)
+
+    # Повні години між першою та останньою
+    full_start = first_hour + 1
+    weeks, rest = np.divmod(last_hour - full_start, HOURS_PER_WEEK)
+    occupied += np.bincount(groups, weights=weeks, minlength=group_count)[:, None] * 3600
+    width = 2 * HOURS_PER_WEEK + 1
+    position = groups * width + hour_of_week(full_start)
+    diff = (np.bincount(position, minlength=group_count * width)
+            - np.bincount(position + rest, minlength=group_count * width))
+    counts = np.cumsum(diff.reshape(group_count, width), axis=1)
+    occupied += (counts[:, :HOURS_PER_WEEK] + counts[:, HOURS_PER_WEEK:2 * HOURS_PER_WEEK]) * 3600
+    return occupied
+
+
+def hourly_occupancy(starts, ends, groups, group_count, first_hour, hours):
+    """
+    Секунди зайнятості інтервалів [starts, ends) у кожній годині відрізка [first_hour, first_hour + hours)
+    (години настінного часу від початку відліку) для кожної групи; повертає масив (group_count, hours).
+    Та сама схема, що й в occupancy_by_hour_of_week, лише без згортання в тиждень.
+    """
+    starts = np.maximum(np.asarray(starts, dtype=np.int64), first_hour * 3600)
+    ends = np.minimum(np.asarray(ends, dtype=np.int64), (first_hour + hours) * 3600)
+    groups = np.asarray(groups, dtype=np.int64)
+    keep = ends > starts
+    starts, ends, groups = starts[keep], ends[keep], groups[keep]
+    # Зайва остання клітинка приймає кінці, що припадають рівно на межу відрізка
+    width = hours + 1
+    size = group_count * width
+    first = starts // 3600 - first_hour
+    last = ends // 3600 - first_hour
+    same = first == last
+    occupied = np.zeros(size)
+    occupied += np.bincount(groups[same] * width + first[same], weights=ends[same] - starts[same], minlength=size)
+    starts, ends, groups, first, last = starts[~same], ends[~same], groups[~same], first[~same], last[~same]
+    occupied += np.bincount(groups * width + first, weights=(first + first_hour + 1) * 3600 - starts, minlength=size)
+    occupied += np.bincount(groups * width + last, weights=ends - (last + first_hour) * 3600, minlength=size)
+    diff = (np.bincount(groups * width + first + 1, minlength=size)
+            - np.bincount(groups * width + last, minlength=size))
+    occupied += np.cumsum(diff.reshape(group_count, width), axis=1).ravel() * 3600
+    return occupied.reshape(group_count, width)[:, :hours]
+
+
+def hourly_peaks(starts, ends, groups, group_count, first_hour, hours):
+    """
+    Найбільша кількість одночасних інтервалів [starts, ends) кожної групи в кожній годині відрізка
+    [first_hour, first_hour + hours); повертає масив цілих (group_count, hours).
+    Прохід по подіях: +1 на початку, −1 на кінці, впорядкованих за групою й часом; накопичена сума
+    після останньої події моменту – кількість одночасних інтервалів від цього моменту.
+    Пік години – більше з рівня на її початку та рівнів після подій усередині неї (np.maximum.at).
+    """
+    peaks = np.zeros((group_count, max(hours, 0)), dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    if starts.size == 0 or hours <= 0:
+        return peaks
+    low, high = first_hour * 3600, (first_hour + hours) * 3600
+    times = np.concatenate((starts, np.asarray(ends, dtype=np.int64)))
+    deltas = np.concatenate((np.ones(starts.size, dtype=np.int64), -np.ones(starts.size, dtype=np.int64)))
+    event_groups = np.concatenate((groups, groups)).astype(np.int64)
+    order = np.lexsort((times, event_groups))
+    times, event_groups = times[order], event_groups[order]
+    # Кожен інтервал дає і +1, і −1, тож накопичена сума повертається до нуля на межі груп
+    levels = np.cumsum(deltas[order])
+    # Рівень на початку години – після останньої події групи не пізніше цього моменту
+    origin = min(int(times.min()), low)
+    span = max(int(times.max()), high) - origin + 1
+    keys = event_groups * span + times - origin
+    hour_keys = np.arange(group_count)[:, None] * span + (low - origin) + np.arange(hours) * 3600
+    carried = np.searchsorted(keys, hour_keys.ravel(), side="right") - 1
+    peaks[:] = np.where(carried >= 0, levels[np.maximum(carried, 0)], 0).reshape(group_count, hours)
+    # Проміжні суми між подіями одного моменту (кінець і початок о 12:00) не є станом парку
+    inside = (times >= low) & (times < high) & np.append(keys[1:] != keys[:-1], True)
+    np.maximum.at(peaks, (event_groups[inside], (times[inside] - low) // 3600), levels[inside])
+    return peaks
+
+
+def load_rental_intervals(cursor, start_epoch, end_epoch, now_epoch):
+    """
+    Оренди, що перетинають [start_epoch, end_epoch), як масив (N, 3): bike_id, початок і кінець
+    у секундах Unix. Активні оренди вважаються зайнятими до now_epoch.
+    Перетин шукається по індексу end_time, активні оренди – окремим запитом.
+    """
+    # Звичайні кортежі замість sqlite3.Row: і вибірка, і перетворення на масив у рази швидші
+    cursor.row_factory = None
+    cursor.execute('''
+        SELECT bike_id, start_time, end_time
+        FROM rentals
+        WHERE end_time > ? AND start_time < ?
+        UNION ALL
+        SELECT bike_id, start_time, ?
+        FROM rentals
+        WHERE end_time IS NULL AND status = 'Активна' AND start_time < ?
+    ''', (start_epoch, end_epoch, now_epoch, end_epoch))
+    rows = cursor.fetchall()
+    if not rows:
+        return np.empty((0, 3), dtype=np.int64)
+    return np.array(rows, dtype=np.int64)
+
+
+def fleet_utilization(cursor, start_date, end_date, bounds, now_epoch):
+    """
+    Частка зайнятого часу в кожній годині тижня за період [start_date, end_date] (дати 'YYYY-MM-DD');
+    bounds – ті самі межі в секундах Unix (day_bounds).
+    Повертає словник:
+      "bikes": (ids, масив (n, 168)) – по кожному велосипеду;
+      "types": (назви типів, масив (m, 168)) – середнє по типу з урахуванням розміру парку типу;
+      "fleet": масив (168,) – по всьому парку.
+    """
+    start_epoch, end_epoch = bounds
+    period_start = wall_seconds(start_date)
+    period_end = wall_seconds(end_date) + 86400
+    # Скільки секунд кожної години тижня містить період – знаменник частки
+    available = occupancy_by_hour_of_week([period_start], [period_end], [0], 1)[0]
+
+    cursor.execute("SELECT id, type FROM bikes ORDER BY id")
+    bikes = cursor.fetchall()
+    bike_ids = np.array([row[0] for row in bikes], dtype=np.int64)
+    types = sorted({row[1] or "" for row in bikes})
+    bike_types = np.array([types.index(row[1] or "") for row in bikes], dtype=np.int64)
+
+    intervals = load_rental_intervals(cursor, start_epoch, end_epoch, now_epoch)
+    # Оренди видалених велосипедів не мають рядка в bikes і не враховуються
+    positions = np.searchsorted(bike_ids, intervals[:, 0])
+    known = positions < len(bike_ids)
+    known[known] = bike_ids[positions[known]] == intervals[known, 0]
+    starts, ends, groups = merge_overlaps(np.maximum(epoch_to_wall(intervals[known, 1]), period_start),
+                                          np.minimum(epoch_to_wall(intervals[known, 2]), period_end),
+                                          positions[known])
+    occupied = occupancy_by_hour_of_week(starts, ends, groups, len(bike_ids))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        by_bike = np.nan_to_num(occupied / available)
+        type_sizes = np.bincount(bike_types, minlength=len(types))
+        type_occupied = np.zeros((len(types), HOURS_PER_WEEK))
+        np.add.at(type_occupied, bike_types, occupied)
+        by_type = np.nan_to_num(type_occupied / (type_sizes[:, None] * available))
+        fleet = np.nan_to_num(occupied.sum(axis=0) / (len(bike_ids) * available))
+    return {"bikes": (bike_ids.tolist(), by_bike), "types": (types, by_type), "fleet": fleet}
+
+
+def heatmap_rows(label, ratios):
+    """Рядки звіту: 7 днів тижня по 24 години, значення у відсотках."""
+    percents = np.rint(np.asarray(ratios) * 100).astype(int).reshape(7, 24)
+    return [[label, WEEKDAYS[day]] + percents[day].tolist() for day in range(7)]
+
+
+def recent_period(days, today=None):
+    """Межі (start_date, end_date) останніх days днів, включно з сьогоднішнім."""
+    today = today or datetime.now()
+    return (today - timedelta(days=days - 1)).strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
@@ -1,25 +1,182 @@
 import sys
 import os
-from PyQt5.QtCore import QRegExp, QDateTime, Qt, QTimer
-from PyQt5.QtGui import QRegExpValidator, QIcon, QFont
+from PyQt5.QtCore import QRegExp, QDateTime, Qt, QTimer, QAbstractTableModel, QModelIndex, pyqtSignal, QRectF
+from PyQt5.QtGui import QRegExpValidator, QIcon, QFont, QStandardItemModel, QStandardItem, QPainter, QColor
 from PyQt5.QtWidgets import (
     QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QComboBox, QTableWidget, QTableWidgetItem, QSpinBox,
     QDoubleSpinBox, QDateTimeEdit, QGroupBox, QFormLayout, QMessageBox,
-    QHeaderView, QDialog, QDialogButtonBox, QInputDialog,
+    QHeaderView, QDialog, QDialogButtonBox, QInputDialog, QTableView, QCompleter,
+    QListWidget, QListWidgetItem, QAbstractItemView, QToolTip, QFileDialog,
 )
+from utilization import WEEKDAYS
 def get_icon_path(icon_name):
     # Если приложение запущено из exe, sys._MEIPASS содержит путь к временной директории PyInstaller
     base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
     return os.path.join(base_path, icon_name)
 
+class LookupPicker(QLineEdit):
+    """
+    Поле вибору запису з автодоповненням. Варіанти не зберігаються заздалегідь:
+    при введенні тексту викликається fetch(text) -> [(id, підпис)], що робить запит за префіксом.
+    Зберігається лише ID вибраного запису (currentData()).
+    """
+    selection_changed = pyqtSignal(object)
+
+    def __init__(self, placeholder="", min_chars=1, parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText(placeholder)
+        self.min_chars = min_chars
+        self.fetch = None
+        self.selected_id = None
+        self.options_model = QStandardItemModel(self)
+        self.options_completer = QCompleter(self.options_model, self)
+        # Варіанти вже відфільтровані запитом, тому показуємо їх без додаткової фільтрації
+        self.options_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.options_completer.setMaxVisibleItems(10)
+        self.setCompleter(self.options_completer)
+        self.options_completer.activated[QModelIndex].connect(self.on_activated)
+        self.textEdited.connect(self.on_text_edited)
+
+    def set_fetch(self, fetch):
+        self.fetch = fetch
+
+    def on_text_edited(self, text):
+        if self.selected_id is not None:
+            self.selected_id = None
+            self.selection_changed.emit(None)
+        text = text.strip()
+        if self.fetch is None or len(text) < self.min_chars:
+            self.options_model.clear()
+            return
+        self.options_model.clear()
+        for item_id, label in self.fetch(text):
+            item = QStandardItem(label)
+            item.setData(item_id, Qt.UserRole)
+            self.options_model.appendRow(item)
+        self.options_completer.complete()
+
+    def on_activated(self, index):
+        self.set_selection(index.data(Qt.UserRole), index.data(Qt.DisplayRole))
+
+    def set_selection(self, item_id, label):
+        self.selected_id = item_id
+        self.setText(label)
+        self.selection_changed.emit(item_id)
+
+    def clear_selection(self):
+        self.selected_id = None
+        self.clear()
+        self.options_model.clear()
+        self.selection_changed.emit(None)
+
+    def currentData(self):
+        return self.selected_id
+
+class ReportPreviewModel(QAbstractTableModel):
+    """Модель таблиці попереднього перегляду звіту: QTableView малює лише видимі рядки."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = []
+        self.rows = []
+
+    def set_report(self, columns, rows):
+        self.beginResetModel()
+        self.columns = list(columns)
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            value = self.rows[index.row()][index.column()]
+            return "" if value is None else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.columns):
+            return self.columns[section]
+        return None
+
+class UtilizationHeatmap(QWidget):
+    """Теплова карта завантаженості парку: 7 днів × 24 години, колір клітинки – частка часу в оренді."""
+
+    LABEL_WIDTH = 28
+    HEADER_HEIGHT = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = [0.0] * 168
+        self.setMinimumHeight(160)
+        self.setMouseTracking(True)
+
+    def set_values(self, values):
+        self.values = [float(value) for value in values]
+        self.update()
+
+    def cell_size(self):
+        return (self.width() - self.LABEL_WIDTH) / 24, (self.height() - self.HEADER_HEIGHT) / 7
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        cell_width, cell_height = self.cell_size()
+        for hour in range(0, 24, 3):
+            painter.drawText(QRectF(self.LABEL_WIDTH + hour * cell_width, 0, cell_width * 3, self.HEADER_HEIGHT),
+                             Qt.AlignLeft | Qt.AlignVCenter, f"{hour:02d}")
+        for day in range(7):
+            top = self.HEADER_HEIGHT + day * cell_height
+            painter.drawText(QRectF(0, top, self.LABEL_WIDTH, cell_height), Qt.AlignLeft | Qt.AlignVCenter, WEEKDAYS[day])
+            for hour in range(24):
+                value = min(max(self.values[day * 24 + hour], 0.0), 1.0)
+                # Від білого (вільно) до темно-зеленого (увесь парк в оренді)
+                color = QColor.fromRgbF(1 - 0.85 * value, 1 - 0.45 * value, 1 - 0.85 * value)
+                cell = QRectF(self.LABEL_WIDTH + hour * cell_width, top, cell_width, cell_height)
+                painter.fillRect(cell.adjusted(0.5, 0.5, -0.5, -0.5), color)
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        cell_width, cell_height = self.cell_size()
+        hour = int((event.x() - self.LABEL_WIDTH) // cell_width)
+        day = int((event.y() - self.HEADER_HEIGHT) // cell_height)
+        if 0 <= hour < 24 and 0 <= day < 7:
+            QToolTip.showText(event.globalPos(),
+                              f"{WEEKDAYS[day]} {hour:02d}:00 – {self.values[day * 24 + hour] * 100:.0f}%", self)
+        else:
+            QToolTip.hideText()
+
+
 class RentalHistoryDialog(QDialog):
-    def __init__(self, client_name, rentals, parent=None):
+    """
+    Історія оренд клієнта. Показники в заголовку беруться з накопичених полів клієнта,
+    а самі оренди підвантажуються сторінками через load_page(after) -> (rentals, next_cursor).
+    """
+
+    def __init__(self, client_name, aggregates, load_page, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"Історія оренд клієнта: {client_name}")
         self.resize(700, 400)
+        self.load_page = load_page
+        self.next_cursor = None
         layout = QVBoxLayout(self)
 
+        last_rental = aggregates.get("last_rental_at") or "—"
+        summary_label = QLabel(
+            f"Оренд: {aggregates.get('rentals_count', 0)}    "
+            f"Загальна сума: {aggregates.get('total_spent', 0):.2f} грн    "
+            f"Остання оренда: {last_rental}"
+        )
+        summary_label.setObjectName("summary_label")
+        summary_font = QFont()
+        summary_font.setBold(True)
+        summary_label.setFont(summary_font)
+        layout.addWidget(summary_label)
+
         self.table = QTableWidget(0, 7, self)
         self.table.setHorizontalHeaderLabels([
             "ID оренди", "Модель велосипеда", "Час початку",
@@ -29,18 +186,33 @@ class RentalHistoryDialog(QDialog):
         self.table.verticalHeader().setVisible(False)
         layout.addWidget(self.table)
 
-        # Кнопка закриття діалогу
+        # Кнопки завантаження наступної сторінки та закриття діалогу
         btn_layout = QHBoxLayout()
+        self.more_btn = QPushButton("Завантажити ще")
+        self.more_btn.clicked.connect(lambda: self.load_more())
         close_btn = QPushButton("Закрити")
         close_btn.clicked.connect(self.accept)
         btn_layout.addStretch()
+        btn_layout.addWidget(self.more_btn)
         btn_layout.addWidget(close_btn)
         layout.addLayout(btn_layout)
 
+        # Наступна сторінка підвантажується і при прокрутці до кінця таблиці
+        self.table.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.load_more(first_page=True)
+
+    def load_more(self, first_page=False):
+        if not first_page and self.next_cursor is None:
+            return
+        rentals, self.next_cursor = self.load_page(None if first_page else self.next_cursor)
         self.populate_table(rentals)
+        self.more_btn.setEnabled(self.next_cursor is not None)
+
+    def on_scroll(self, value):
+        if value == self.table.verticalScrollBar().maximum():
+            self.load_more()
 
     def populate_table(self, rentals):
-        self.table.setRowCount(0)
         for rental in rentals:
             row = self.table.rowCount()
             self.table.insertRow(row)
@@ -57,7 +229,127 @@ class RentalHistoryDialog(QDialog):
             self.table.setItem(row, 5, QTableWidgetItem(str(rental.total_cost)))
             self.table.setItem(row, 6, QTableWidgetItem(str(rental.status)))
 
+class LatencyDialog(QDialog):
+    """
+    Діагностика затримок інтерфейсу: перцентилі часу обробників і зафіксовані зависання.
+    load() -> (рядки LatencyRecorder.summary(), список зависань); save(path) -> (успіх, повідомлення).
+    """
+
+    COLUMNS = [("Обробник", "handler"), ("Викликів", "calls"), ("p50, мс", "p50_ms"), ("p95, мс", "p95_ms"),
+               ("p99, мс", "p99_ms"), ("Макс, мс", "max_ms"), ("Модель p95, мс", "model_p95_ms"),
+               ("Перемальовування p95, мс", "repaint_p95_ms")]
+
+    def __init__(self, load, save, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Діагностика інтерфейсу")
+        self.resize(900, 500)
+        self.load = load
+        self.save = save
+        layout = QVBoxLayout(self)
+
+        self.handlers_table = QTableWidget(0, len(self.COLUMNS), self)
+        self.handlers_table.setObjectName("handlers_table")
+        self.handlers_table.setHorizontalHeaderLabels([title for title, _ in self.COLUMNS])
+        self.handlers_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.handlers_table.verticalHeader().setVisible(False)
+        self.handlers_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.handlers_table)
+
+        layout.addWidget(QLabel("Зависання циклу подій (стек – у підказці рядка):"))
+        self.stalls_table = QTableWidget(0, 3, self)
+        self.stalls_table.setObjectName("stalls_table")
+        self.stalls_table.setHorizontalHeaderLabels(["Час", "Тривалість, мс", "Обробник"])
+        self.stalls_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.stalls_table.verticalHeader().setVisible(False)
+        self.stalls_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.stalls_table)
+
+        btn_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Оновити")
+        refresh_btn.clicked.connect(lambda: self.refresh())
+        save_btn = QPushButton("Зберегти JSON")
+        save_btn.clicked.connect(lambda: self.save_json())
+        close_btn = QPushButton("Закрити")
+        close_btn.clicked.connect(self.accept)
+        btn_layout.addStretch()
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addWidget(save_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+        self.refresh()
+
+    def refresh(self):
+        handlers, stalls = self.load()
+        self.handlers_table.setRowCount(len(handlers))
+        for row, handler in enumerate(handlers):
+            for column, (_, key) in enumerate(self.COLUMNS):
+                self.handlers_table.setItem(row, column, QTableWidgetItem(str(handler[key])))
+        self.stalls_table.setRowCount(len(stalls))
+        for row, stall in enumerate(reversed(stalls)):
+            for column, value in enumerate((stall["time"], stall["duration_ms"], stall["handler"] or "—")):
+                item = QTableWidgetItem(str(value))
+                item.setToolTip(stall["stack"] or "")
+                self.stalls_table.setItem(row, column, item)
+
+    def save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Зберегти діагностику", "ui_latency.json", "JSON (*.json)")
+        if not path:
+            return
+        ok, msg = self.save(path)
+        if ok:
+            QMessageBox.information(self, "Діагностика", msg)
+        else:
+            QMessageBox.warning(self, "Діагностика", msg)
+
 # Диалог для додавання клієнта
+class GroupRentalDialog(QDialog):
+    """Вибір кількох доступних велосипедів для групової оренди позначками у списку."""
+
+    def __init__(self, bikes, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Групова оренда")
+        self.resize(450, 500)
+        layout = QVBoxLayout(self)
+
+        self.filter_input = QLineEdit(self)
+        self.filter_input.setPlaceholderText("Фільтр за моделлю або серійним номером...")
+        self.filter_input.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.filter_input)
+
+        # bikes – список (id, підпис)
+        self.bike_list = QListWidget(self)
+        self.bike_list.setObjectName("group_bike_list")
+        for bike_id, label in bikes:
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, bike_id)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.bike_list.addItem(item)
+        self.bike_list.itemChanged.connect(self.update_count)
+        layout.addWidget(self.bike_list)
+
+        self.count_label = QLabel("Вибрано: 0", self)
+        layout.addWidget(self.count_label)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+    def apply_filter(self, text):
+        text = text.strip().lower()
+        for i in range(self.bike_list.count()):
+            item = self.bike_list.item(i)
+            item.setHidden(bool(text) and text not in item.text().lower())
+
+    def update_count(self, item=None):
+        self.count_label.setText(f"Вибрано: {len(self.selected_bike_ids())}")
+
+    def selected_bike_ids(self):
+        return [self.bike_list.item(i).data(Qt.UserRole) for i in range(self.bike_list.count())
+                if self.bike_list.item(i).checkState() == Qt.Checked]
+
+
 class AddClientDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -304,17 +596,38 @@ class MainWindow(QMainWindow):
         stats_group.setLayout(stats_layout)
         layout.addWidget(stats_group)
 
+        utilization_group = QGroupBox("Завантаженість парку за останні 4 тижні")
+        utilization_layout = QVBoxLayout()
+        self.utilization_heatmap = UtilizationHeatmap()
+        self.utilization_heatmap.setObjectName("utilization_heatmap")
+        utilization_layout.addWidget(self.utilization_heatmap)
+        utilization_group.setLayout(utilization_layout)
+        layout.addWidget(utilization_group)
+
         recent_group = QGroupBox("Останні оренди")
         recent_layout = QVBoxLayout()
         recent_table = QTableWidget(0, 4)
         recent_table.setObjectName("recent_table")
-        recent_table.setHorizontalHeaderLabels(["Клієнт", "Велосипед", "Початок", "Статус"])
+        recent_table.setHorizontalHeaderLabels(["Клієнт", "Велосипед", "Час", "Подія"])
+        recent_table.setEditTriggers(QTableWidget.NoEditTriggers)
         recent_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         recent_table.verticalHeader().setVisible(False)
         recent_layout.addWidget(recent_table)
         recent_group.setLayout(recent_layout)
         layout.addWidget(recent_group)
 
+        self.service_group = QGroupBox("Потребують обслуговування")
+        service_layout = QVBoxLayout()
+        service_table = QTableWidget(0, 5)
+        service_table.setObjectName("service_table")
+        service_table.setHorizontalHeaderLabels(["Велосипед", "Серійний номер", "Тип", "Годин від ТО", "Оренд від ТО"])
+        service_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        service_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        service_table.verticalHeader().setVisible(False)
+        service_layout.addWidget(service_table)
+        self.service_group.setLayout(service_layout)
+        layout.addWidget(self.service_group)
+
         tab.setLayout(layout)
         return tab
 
@@ -431,40 +744,15 @@ class MainWindow(QMainWindow):
         rental_form_group.setObjectName("rental_form_group")
         form_layout = QFormLayout()
 
-        # Замінюємо QComboBox на QLineEdit з пошуком
-        client_search = QLineEdit()
-        client_search.setObjectName("client_search")
-        client_search.setPlaceholderText("Введіть ім'я або прізвище клієнта...")
-
-        # Додаємо прихований QComboBox для збереження вибраного ID клієнта
-        client_combo = QComboBox()
-        client_combo.setObjectName("client_combo")
-        client_combo.setVisible(False)
-        client_combo.addItem("Виберіть клієнта...", None)
-
-        # Додаємо випадаючий список результатів пошуку
-        client_results = QTableWidget(0, 3)
-        client_results.setObjectName("client_results")
-        client_results.setHorizontalHeaderLabels(["ID", "ПІБ", "Телефон"])
-        client_results.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        client_results.setColumnHidden(0, True)
-        client_results.setSelectionBehavior(QTableWidget.SelectRows)
-        client_results.setSelectionMode(QTableWidget.SingleSelection)
-        client_results.setMaximumHeight(150)
-        client_results.setVisible(False)
-
-        # Об’єднуємо поле пошуку та результати в один контейнер
-        client_layout = QVBoxLayout()
-        client_layout.addWidget(client_search)
-        client_layout.addWidget(client_results)
-        client_layout.addWidget(client_combo)  # прихований
-
-        form_layout.addRow("Клієнт:", client_layout)
-
-        bike_combo = QComboBox()
-        bike_combo.setObjectName("bike_combo")
-        bike_combo.addItem("Виберіть велосипед...", None)
-        form_layout.addRow("Велосипед:", bike_combo)
+        # Клієнт і велосипед вибираються полями з автодоповненням,
+        # варіанти для яких контролер підвантажує запитом за префіксом
+        client_picker = LookupPicker("Введіть ім'я, прізвище або телефон клієнта...", min_chars=2)
+        client_picker.setObjectName("client_picker")
+        form_layout.addRow("Клієнт:", client_picker)
+
+        bike_picker = LookupPicker("Введіть модель або серійний номер...", min_chars=1)
+        bike_picker.setObjectName("bike_picker")
+        form_layout.addRow("Велосипед:", bike_picker)
 
         start_time = QDateTimeEdit(QDateTime.currentDateTime())
         start_time.setObjectName("start_time")
@@ -495,8 +783,14 @@ class MainWindow(QMainWindow):
         calculate_btn.setObjectName("calculate_btn")
         create_rental_btn = QPushButton("Оформити оренду")
         create_rental_btn.setObjectName("create_rental_btn")
+        reserve_btn = QPushButton("Забронювати")
+        reserve_btn.setObjectName("reserve_btn")
+        group_rental_btn = QPushButton("Групова оренда")
+        group_rental_btn.setObjectName("group_rental_btn")
         form_buttons.addWidget(calculate_btn)
         form_buttons.addWidget(create_rental_btn)
+        form_buttons.addWidget(reserve_btn)
+        form_buttons.addWidget(group_rental_btn)
         form_layout.addRow("", form_buttons)
 
         rental_form_group.setLayout(form_layout)
@@ -513,6 +807,9 @@ class MainWindow(QMainWindow):
         active_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         active_table.setColumnHidden(0, True)
         active_table.verticalHeader().setVisible(False)
+        # Кілька оренд (наприклад, групу) можна вибрати й продовжити або завершити разом
+        active_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        active_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         button_layout = QHBoxLayout()
         return_bike_btn = QPushButton("Завершити оренду")
         return_bike_btn.setObjectName("return_bike_btn")
@@ -548,7 +845,8 @@ class MainWindow(QMainWindow):
         report_type_combo = QComboBox()
         report_type_combo.setObjectName("report_type_combo")
         report_type_combo.addItems(["Оренди за період", "Аналіз використання велосипедів",
-                                    "Дохід за періодами", "Аналіз клієнтської бази", "Популярність типів велосипедів"])
+                                    "Дохід за періодами", "Аналіз клієнтської бази", "Популярність типів велосипедів",
+                                    "Завантаженість за годинами тижня", "Прогноз попиту за типами"])
         start_date = QDateTimeEdit(QDateTime.currentDateTime().addDays(-30))
         start_date.setObjectName("start_date")
         start_date.setDisplayFormat("dd.MM.yyyy")
@@ -562,18 +860,38 @@ class MainWindow(QMainWindow):
         params_layout.addRow("Дата початку:", start_date)
         params_layout.addRow("Дата кінця:", end_date)
         params_layout.addRow("Формат:", format_combo)
+        report_buttons = QHBoxLayout()
+        preview_btn = QPushButton("Попередній перегляд")
+        preview_btn.setObjectName("preview_btn")
         report_btn = QPushButton("Сформувати звіт")
         report_btn.setObjectName("report_btn")
-        params_layout.addRow("", report_btn)
+        invoices_btn = QPushButton("Друк рахунків")
+        invoices_btn.setObjectName("invoices_btn")
+        backup_btn = QPushButton("Резервна копія бази")
+        backup_btn.setObjectName("backup_btn")
+        diagnostics_btn = QPushButton("Діагностика інтерфейсу")
+        diagnostics_btn.setObjectName("diagnostics_btn")
+        report_buttons.addWidget(preview_btn)
+        report_buttons.addWidget(report_btn)
+        report_buttons.addWidget(invoices_btn)
+        report_buttons.addWidget(backup_btn)
+        report_buttons.addWidget(diagnostics_btn)
+        params_layout.addRow("", report_buttons)
         params_group.setLayout(params_layout)
         layout.addWidget(params_group)
 
         preview_group = QGroupBox("Попередній перегляд")
         preview_layout = QVBoxLayout()
         preview_label = QLabel("Тут буде відображено попередній перегляд звіту")
+        preview_label.setObjectName("preview_label")
         preview_label.setAlignment(Qt.AlignCenter)
-        preview_label.setStyleSheet("background-color: #ffffff; padding: 50px; border: 1px dashed #cccccc;")
         preview_layout.addWidget(preview_label)
+        preview_table = QTableView()
+        preview_table.setObjectName("preview_table")
+        preview_table.setModel(ReportPreviewModel(preview_table))
+        preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        preview_table.verticalHeader().setVisible(False)
+        preview_layout.addWidget(preview_table)
         preview_group.setLayout(preview_layout)
         layout.addWidget(preview_group)
 